@@ -3,7 +3,7 @@ package com.linkedin.feathr.offline.generation.outputProcessor
 import com.linkedin.feathr.common.Header
 import com.linkedin.feathr.common.configObj.generation.OutputProcessorConfig
 import com.linkedin.feathr.offline.generation.FeatureGenUtils
-import com.linkedin.feathr.offline.generation.outputProcessor.PushToRedisOutputProcessor.TABLE_PARAM_CONFIG_NAME
+import com.linkedin.feathr.offline.generation.outputProcessor.PushToRedisOutputProcessor.{TABLE_PARAM_CONFIG_NAME, getEncoding, isPacked}
 import org.apache.spark.sql.{DataFrame, SaveMode, SparkSession}
 
 /**
@@ -26,7 +26,7 @@ private[offline] class PushToRedisOutputProcessor(config: OutputProcessorConfig,
 
     val tableName = config.getParams.getString(TABLE_PARAM_CONFIG_NAME)
     val allFeatureCols = header.featureInfoMap.map(x => (x._2.columnName)).toSet
-    RedisOutputUtils.writeToRedis(ss, df, tableName, keyColumns, allFeatureCols, SaveMode.Overwrite)
+    RedisOutputUtils.writeToRedis(ss, df, tableName, keyColumns, allFeatureCols, SaveMode.Overwrite, getEncoding(config), isPacked(config))
     (df, header)
   }
 }
@@ -34,4 +34,21 @@ private[offline] class PushToRedisOutputProcessor(config: OutputProcessorConfig,
 object PushToRedisOutputProcessor {
   // Parameter name in Redis output processor config for table name
   val TABLE_PARAM_CONFIG_NAME = "table_name"
+  // Parameter name in Redis output processor config for the encoding of feature values, base64 or binary
+  val ENCODING_PARAM_CONFIG_NAME = "encoding"
+
+  // Parameter name in Redis output processor config for whether to pack all the features of a key into one hash field
+  val PACKED_PARAM_CONFIG_NAME = "packed"
+
+  def isPacked(config: OutputProcessorConfig): Boolean = {
+    config.getParams.hasPath(PACKED_PARAM_CONFIG_NAME) && config.getParams.getBoolean(PACKED_PARAM_CONFIG_NAME)
+  }
+
+  def getEncoding(config: OutputProcessorConfig): String = {
+    if (config.getParams.hasPath(ENCODING_PARAM_CONFIG_NAME)) {
+      config.getParams.getString(ENCODING_PARAM_CONFIG_NAME)
+    } else {
+      RedisOutputUtils.BASE64_ENCODING
+    }
+  }
 }
\ No newline at end of file
@@ -1,29 +1,51 @@
 package com.linkedin.feathr.offline.generation.outputProcessor
 
 import com.linkedin.feathr.common.types.protobuf.FeatureValueOuterClass
+import com.linkedin.feathr.common.types.protobuf.FeatureValueOuterClass.FeatureValue.FeatureValueOneOfCase
+import com.redislabs.provider.redis.{RedisConfig, RedisEndpoint}
 import org.apache.spark.sql.catalyst.encoders.RowEncoder
 import org.apache.spark.sql.catalyst.expressions.GenericRowWithSchema
 import org.apache.spark.sql.functions.{concat_ws, expr, when}
 import org.apache.spark.sql.types._
 import org.apache.spark.sql.{DataFrame, Row, SaveMode, SparkSession}
+import redis.clients.jedis.{Jedis, ScanParams}
 
+import java.nio.{ByteBuffer, ByteOrder}
+import java.nio.charset.StandardCharsets
 import java.util.Base64
 import scala.collection.JavaConverters._
 import scala.collection.mutable
 
 object RedisOutputUtils {
-  def writeToRedis(ss: SparkSession, df: DataFrame, tableName: String, keyColumns: Seq[String], allFeatureCols: Set[String], saveMode: SaveMode): Unit = {
+  // Feature values are stored as base64 encoded FeatureValue protobufs
+  val BASE64_ENCODING = "base64"
+  // Feature values are stored as raw bytes, prefixed by an encoding version byte (see toBinary)
+  val BINARY_ENCODING = "binary"
+  private val BINARY_PROTOBUF_VERSION: Byte = 0x01
+  private val BINARY_PACKED_VERSION: Byte = 0x02
+  // Number of rows per Redis pipeline when writing binary values
+  private val BINARY_WRITE_BATCH_SIZE = 1000
+  // Hash field which holds all the features of a key in the packed layout, and the version byte of a packed row
+  val PACKED_FIELD = "__feathr_packed__"
+  private val PACKED_ROW_VERSION: Byte = 0x03
+
+  def writeToRedis(ss: SparkSession, df: DataFrame, tableName: String, keyColumns: Seq[String], allFeatureCols: Set[String],
+                   saveMode: SaveMode, encoding: String = BASE64_ENCODING, packed: Boolean = false): Unit = {
     val nullElementGuardString = "_null_"
     val newColExpr = concat_ws("#", keyColumns.map(c => {
       val casted = expr(s"CAST (${c} as string)")
       // If any key in the keys is null, replace with special value and remove the row later
       when(casted.isNull, nullElementGuardString).otherwise(casted)
     }): _*)
-    val encodedDf = encodeDataFrame(allFeatureCols, df)
+    val encodedDf = encodeDataFrame(allFeatureCols, df, encoding)
 
     val outputKeyColumnName = "feature_key"
     val decoratedDf = encodedDf.withColumn(outputKeyColumnName, newColExpr)
       .drop(keyColumns: _*)
+    if (encoding == BINARY_ENCODING || packed) {
+      writeBinaryToRedis(ss, decoratedDf, tableName, outputKeyColumnName, saveMode, packed)
+      return
+    }
     // set the host/post/auth/ssl configs in Redis again in the output directly
     // otherwise, in some environment (like databricks), the configs from the active spark session is not passed here.
     decoratedDf.write
@@ -38,12 +60,174 @@ object RedisOutputUtils {
       .save()
   }
 
-  private[feathr] def encodeDataFrame(allFeatureCols: Set[String], df: DataFrame): DataFrame = {
+  /**
+   * The spark-redis data source only writes string values into one hash field per column, so binary values and packed
+   * rows are written by pipelined HSETs of the Redis client directly. Each row is upserted into the hash
+   * `<table name>:<key>`, the same as the data source does. In the packed layout, all the features of the row are
+   * packed into the single field PACKED_FIELD (see packRow).
+   *
+   * The save mode has the same semantics as in the data source: Overwrite first deletes all the keys of the table,
+   * ErrorIfExists fails and Ignore writes nothing if the table has any key.
+   */
+  private def writeBinaryToRedis(ss: SparkSession, df: DataFrame, tableName: String, keyColumnName: String,
+                                 saveMode: SaveMode, packed: Boolean): Unit = {
+    val host = ss.conf.get("spark.redis.host")
+    val port = ss.conf.get("spark.redis.port").toInt
+    val auth = ss.conf.get("spark.redis.auth")
+    val ssl = ss.conf.get("spark.redis.ssl").toBoolean
+    val driverRedisConfig = new RedisConfig(RedisEndpoint(host = host, port = port, auth = auth, ssl = ssl))
+    saveMode match {
+      case SaveMode.Overwrite => deleteTableKeys(driverRedisConfig, tableName)
+      case SaveMode.ErrorIfExists if tableExists(driverRedisConfig, tableName) =>
+        throw new IllegalStateException(s"Table ${tableName} already exists in Redis, and the save mode is ${saveMode}.")
+      case SaveMode.Ignore if tableExists(driverRedisConfig, tableName) => return
+      case _ =>
+    }
+    val featureColumns = df.columns.filter(_ != keyColumnName).map(c => (c, df.schema.fieldIndex(c)))
+    val keyIndex = df.schema.fieldIndex(keyColumnName)
+    df.foreachPartition { (rows: Iterator[Row]) =>
+      val redisConfig = new RedisConfig(RedisEndpoint(host = host, port = port, auth = auth, ssl = ssl))
+      rows.grouped(BINARY_WRITE_BATCH_SIZE).foreach { batch =>
+        // send one pipeline per Redis node, so that it also works with Redis Cluster
+        batch.groupBy(row => redisConfig.getHost(tableName + ":" + row.getString(keyIndex)).endpoint).foreach { case (endpoint, nodeRows) =>
+          val conn = endpoint.connect()
+          try {
+            val pipeline = conn.pipelined()
+            nodeRows.foreach { row =>
+              val fields = featureColumns.toSeq.collect {
+                case (name, i) if !row.isNullAt(i) =>
+                  val value = row.get(i) match {
+                    case bytes: Array[Byte] => bytes
+                    case string: String => string.getBytes(StandardCharsets.UTF_8)
+                  }
+                  name.getBytes(StandardCharsets.UTF_8) -> value
+              }
+              val redisKey = (tableName + ":" + row.getString(keyIndex)).getBytes(StandardCharsets.UTF_8)
+              if (packed) {
+                pipeline.hset(redisKey, PACKED_FIELD.getBytes(StandardCharsets.UTF_8), packRow(fields))
+              } else if (fields.nonEmpty) {
+                pipeline.hset(redisKey, fields.toMap.asJava)
+              }
+            }
+            pipeline.sync()
+          } finally {
+            conn.close()
+          }
+        }
+      }
+    }
+  }
+
+  /**
+   * Deletes all the keys of a table on every Redis node. Keys are deleted one by one in a pipeline, since a multi-key
+   * DEL fails in Redis Cluster when the keys are in different hash slots.
+   */
+  private def deleteTableKeys(redisConfig: RedisConfig, tableName: String): Unit = {
+    redisConfig.hosts.foreach { node =>
+      val conn = node.connect()
+      try {
+        scanTableKeys(conn, tableName).foreach { keys =>
+          val pipeline = conn.pipelined()
+          keys.foreach(key => pipeline.del(key))
+          pipeline.sync()
+        }
+      } finally {
+        conn.close()
+      }
+    }
+  }
+
+  private def tableExists(redisConfig: RedisConfig, tableName: String): Boolean = {
+    redisConfig.hosts.exists { node =>
+      val conn = node.connect()
+      try {
+        scanTableKeys(conn, tableName).exists(_.nonEmpty)
+      } finally {
+        conn.close()
+      }
+    }
+  }
+
+  /**
+   * Lazily scans the keys `<table name>:*` of a Redis node, one page of keys at a time.
+   */
+  private def scanTableKeys(conn: Jedis, tableName: String): Iterator[Seq[String]] = {
+    val params = new ScanParams().`match`(tableName + ":*").count(BINARY_WRITE_BATCH_SIZE)
+    new Iterator[Seq[String]] {
+      private var cursor: String = ScanParams.SCAN_POINTER_START
+      private var started = false
+
+      override def hasNext: Boolean = !started || cursor != ScanParams.SCAN_POINTER_START
+
+      override def next(): Seq[String] = {
+        val page = conn.scan(cursor, params)
+        started = true
+        cursor = page.getCursor
+        page.getResult.asScala.toSeq
+      }
+    }
+  }
+
+  /**
+   * Packs the encoded features of a row: the version byte 0x03 followed by, for each feature, the varint length and
+   * bytes of the feature name and the varint length and bytes of the encoded feature.
+   */
+  private[feathr] def packRow(fields: Seq[(Array[Byte], Array[Byte])]): Array[Byte] = {
+    val out = new java.io.ByteArrayOutputStream()
+    def writeVarint(value: Int): Unit = {
+      var remaining = value
+      while (remaining >= 0x80) {
+        out.write((remaining & 0x7f) | 0x80)
+        remaining >>>= 7
+      }
+      out.write(remaining)
+    }
+    out.write(PACKED_ROW_VERSION)
+    fields.foreach { case (name, value) =>
+      writeVarint(name.length)
+      out.write(name)
+      writeVarint(value.length)
+      out.write(value)
+    }
+    out.toByteArray
+  }
+
+  /**
+   * Encodes a FeatureValue in the binary encoding. Dense numeric vectors are stored as the version byte 0x02, a type
+   * code ('f', 'd', 'i' or 'q') and the packed little-endian items. Other values are stored as the version byte 0x01
+   * followed by the serialized protobuf.
+   */
+  private[feathr] def toBinary(featureValue: FeatureValueOuterClass.FeatureValue): Array[Byte] = {
+    def packed(typeCode: Char, itemSize: Int, size: Int)(put: ByteBuffer => Unit): Array[Byte] = {
+      val buffer = ByteBuffer.allocate(2 + itemSize * size).order(ByteOrder.LITTLE_ENDIAN)
+      buffer.put(BINARY_PACKED_VERSION).put(typeCode.toByte)
+      put(buffer)
+      buffer.array()
+    }
+    featureValue.getFeatureValueOneOfCase match {
+      case FeatureValueOneOfCase.FLOAT_ARRAY =>
+        val items = featureValue.getFloatArray.getFloatsList.asScala
+        packed('f', 4, items.size)(buffer => items.foreach(item => buffer.putFloat(item)))
+      case FeatureValueOneOfCase.DOUBLE_ARRAY =>
+        val items = featureValue.getDoubleArray.getDoublesList.asScala
+        packed('d', 8, items.size)(buffer => items.foreach(item => buffer.putDouble(item)))
+      case FeatureValueOneOfCase.INT_ARRAY =>
+        val items = featureValue.getIntArray.getIntegersList.asScala
+        packed('i', 4, items.size)(buffer => items.foreach(item => buffer.putInt(item)))
+      case FeatureValueOneOfCase.LONG_ARRAY =>
+        val items = featureValue.getLongArray.getLongsList.asScala
+        packed('q', 8, items.size)(buffer => items.foreach(item => buffer.putLong(item)))
+      case _ =>
+        BINARY_PROTOBUF_VERSION +: featureValue.toByteArray
+    }
+  }
+
+  private[feathr] def encodeDataFrame(allFeatureCols: Set[String], df: DataFrame, encoding: String = BASE64_ENCODING): DataFrame = {
     val schema = df.schema
-    val newStructType = getRedisSparkSchema(allFeatureCols, schema)
+    val newStructType = getRedisSparkSchema(allFeatureCols, schema, encoding)
     val encoder = RowEncoder(newStructType)
 
-    val mappingFunc = getConversionFunction(schema, allFeatureCols)
+    val mappingFunc = getConversionFunction(schema, allFeatureCols, encoding)
     val encodedDf = df.map(row => {
       Row.fromSeq(schema.indices.map { i =>
       {
@@ -61,14 +245,17 @@ object RedisOutputUtils {
    */
   private[feathr] def getRedisSparkSchema(
                                            allFeatureCols: Set[String] = Set(), // feature column name to feature type
-                                           dfSchema: StructType
+                                           dfSchema: StructType,
+                                           encoding: String = BASE64_ENCODING
                                          ): StructType = {
     val newDfSchemaFields: Array[StructField] = dfSchema.indices.map {
       i => {
         val structField = dfSchema.fields(i)
         if (allFeatureCols.contains(structField.name)) {
-          // we use protobuf byte string representation, so for feature, it's always StringType
-          StructField(structField.name, StringType, structField.nullable, structField.metadata)
+          // we use protobuf byte string representation, so for feature, it's always StringType, or BinaryType with
+          // the binary encoding
+          val featureType = if (encoding == BINARY_ENCODING) BinaryType else StringType
+          StructField(structField.name, featureType, structField.nullable, structField.metadata)
         } else {
           structField
         }
@@ -86,7 +273,13 @@ object RedisOutputUtils {
    * 3. sparse 1-dimension tensor from integer to various types. Mostly support embedding use cases.
    * (more types can be added if there are actual popular use cases)
    */
-  private[feathr] def getConversionFunction(dfSchema: StructType, allFeatureCols: Set[String] = Set()): Map[Int, Any => Any] = {
+  private[feathr] def getConversionFunction(dfSchema: StructType, allFeatureCols: Set[String] = Set(),
+                                            encoding: String = BASE64_ENCODING): Map[Int, Any => Any] = {
+    val serialize: FeatureValueOuterClass.FeatureValue => Any = encoding match {
+      case BASE64_ENCODING => featureValue => Base64.getEncoder.encodeToString(featureValue.toByteArray)
+      case BINARY_ENCODING => featureValue => toBinary(featureValue)
+      case _ => throw new IllegalArgumentException(s"Unsupported Redis encoding ${encoding}, must be one of ${BASE64_ENCODING}, ${BINARY_ENCODING}.")
+    }
     dfSchema.indices.map(index => {
       val field = dfSchema.fields(index)
       val fieldName = field.name
@@ -96,37 +289,37 @@ object RedisOutputUtils {
             (rowData: Any) => {
               val stringFeature = rowData.asInstanceOf[Float]
               val res = FeatureValueOuterClass.FeatureValue.newBuilder().setFloatValue(stringFeature).build()
-              Base64.getEncoder.encodeToString(res.toByteArray)
+              serialize(res)
             }
           case DoubleType =>
             (rowData: Any) => {
               val stringFeature = rowData.asInstanceOf[Double]
               val res = FeatureValueOuterClass.FeatureValue.newBuilder().setDoubleValue(stringFeature).build()
-              Base64.getEncoder.encodeToString(res.toByteArray)
+              serialize(res)
             }
           case StringType =>
             (rowData: Any) => {
               val stringFeature = rowData.asInstanceOf[String]
               val res = FeatureValueOuterClass.FeatureValue.newBuilder().setStringValue(stringFeature).build()
-              Base64.getEncoder.encodeToString(res.toByteArray)
+              serialize(res)
             }
           case BooleanType =>
             (rowData: Any) => {
               val stringFeature = rowData.asInstanceOf[Boolean]
               val res = FeatureValueOuterClass.FeatureValue.newBuilder().setBooleanValue(stringFeature).build()
-              Base64.getEncoder.encodeToString(res.toByteArray)
+              serialize(res)
             }
           case IntegerType =>
             (rowData: Any) => {
               val stringFeature = rowData.asInstanceOf[Integer]
               val res = FeatureValueOuterClass.FeatureValue.newBuilder().setIntValue(stringFeature).build()
-              Base64.getEncoder.encodeToString(res.toByteArray)
+              serialize(res)
             }
           case LongType =>
             (rowData: Any) => {
               val stringFeature = rowData.asInstanceOf[Long]
               val res = FeatureValueOuterClass.FeatureValue.newBuilder().setLongValue(stringFeature).build()
-              Base64.getEncoder.encodeToString(res.toByteArray)
+              serialize(res)
             }
           case ArrayType(IntegerType, _) =>
             (rowData: Any) => {
@@ -134,7 +327,7 @@ object RedisOutputUtils {
               val allElements = genericRow.asJava
               val protoStringArray = FeatureValueOuterClass.IntegerArray.newBuilder().addAllIntegers(allElements)
               val res = FeatureValueOuterClass.FeatureValue.newBuilder().setIntArray(protoStringArray).build()
-              Base64.getEncoder.encodeToString(res.toByteArray)
+              serialize(res)
             }
           case ArrayType(FloatType, _) =>
             (rowData: Any) => {
@@ -142,7 +335,7 @@ object RedisOutputUtils {
               val allElements = genericRow.asJava
               val protoStringArray = FeatureValueOuterClass.FloatArray.newBuilder().addAllFloats(allElements)
               val res = FeatureValueOuterClass.FeatureValue.newBuilder().setFloatArray(protoStringArray).build()
-              Base64.getEncoder.encodeToString(res.toByteArray)
+              serialize(res)
             }
           case ArrayType(DoubleType, _) =>
             (rowData: Any) => {
@@ -150,7 +343,7 @@ object RedisOutputUtils {
               val allElements = genericRow.asJava
               val protoStringArray = FeatureValueOuterClass.DoubleArray.newBuilder().addAllDoubles(allElements)
               val res = FeatureValueOuterClass.FeatureValue.newBuilder().setDoubleArray(protoStringArray).build()
-              Base64.getEncoder.encodeToString(res.toByteArray)
+              serialize(res)
             }
           case ArrayType(StringType, _) =>
             (rowData: Any) => {
@@ -158,7 +351,7 @@ object RedisOutputUtils {
               val allElements = genericRow.asJava
               val protoStringArray = FeatureValueOuterClass.StringArray.newBuilder().addAllStrings(allElements)
               val res = FeatureValueOuterClass.FeatureValue.newBuilder().setStringArray(protoStringArray).build()
-              Base64.getEncoder.encodeToString(res.toByteArray)
+              serialize(res)
             }
           case ArrayType(BooleanType, _) =>
             (rowData: Any) => {
@@ -166,7 +359,7 @@ object RedisOutputUtils {
               val allElements = genericRow.asJava
               val protoStringArray = FeatureValueOuterClass.BooleanArray.newBuilder().addAllBooleans(allElements)
               val res = FeatureValueOuterClass.FeatureValue.newBuilder().setBooleanArray(protoStringArray).build()
-              Base64.getEncoder.encodeToString(res.toByteArray)
+              serialize(res)
             }
           case StructType(Array(StructField("indices0", ArrayType(IntegerType, _), _, _), StructField("values", ArrayType(StringType, _), _, _)))=>
             (rowData: Any) => {
@@ -178,7 +371,7 @@ object RedisOutputUtils {
                 .addAllValueStrings(valueArray.asJava).build()
               val proto = FeatureValueOuterClass.FeatureValue.newBuilder()
                 .setSparseStringArray(protoStringArray).build()
-              Base64.getEncoder.encodeToString(proto.toByteArray)
+              serialize(proto)
             }
           case StructType(Array(StructField("indices0", ArrayType(IntegerType, _), _, _), StructField("values", ArrayType(BooleanType, _), _, _)))=>
             (rowData: Any) => {
@@ -190,7 +383,7 @@ object RedisOutputUtils {
                 .addAllValueBooleans(valueArray.asJava).build()
               val proto = FeatureValueOuterClass.FeatureValue.newBuilder()
                 .setSparseBoolArray(protoBoolArray).build()
-              Base64.getEncoder.encodeToString(proto.toByteArray)
+              serialize(proto)
             }
           case StructType(Array(StructField("indices0", ArrayType(IntegerType, _), _, _), StructField("values", ArrayType(DoubleType, _), _, _)))=>
             (rowData: Any) => {
@@ -202,7 +395,7 @@ object RedisOutputUtils {
                 .addAllValueDoubles(valueArray.asJava).build()
               val proto = FeatureValueOuterClass.FeatureValue.newBuilder()
                 .setSparseDoubleArray(protoArray).build()
-              Base64.getEncoder.encodeToString(proto.toByteArray)
+              serialize(proto)
             }
           case StructType(Array(StructField("indices0", ArrayType(IntegerType, _), _, _), StructField("values", ArrayType(FloatType, _), _, _)))=>
             (rowData: Any) => {
@@ -214,7 +407,7 @@ object RedisOutputUtils {
                 .addAllValueFloats(valueArray.asJava).build()
               val proto = FeatureValueOuterClass.FeatureValue.newBuilder()
                 .setSparseFloatArray(protoArray).build()
-              Base64.getEncoder.encodeToString(proto.toByteArray)
+              serialize(proto)
             }
           case StructType(Array(StructField("indices0", ArrayType(IntegerType, _), _, _), StructField("values", ArrayType(IntegerType, _), _, _)))=>
             (rowData: Any) => {
@@ -226,7 +419,7 @@ object RedisOutputUtils {
                 .addAllValueIntegers(valueArray.asJava).build()
               val proto = FeatureValueOuterClass.FeatureValue.newBuilder()
                 .setSparseIntegerArray(protoArray).build()
-              Base64.getEncoder.encodeToString(proto.toByteArray)
+              serialize(proto)
             }
           case StructType(Array(StructField("indices0", ArrayType(IntegerType, _), _, _), StructField("values", ArrayType(LongType, _), _, _)))=>
             (rowData: Any) => {
@@ -238,7 +431,7 @@ object RedisOutputUtils {
                 .addAllValueLongs(valueArray.asJava).build()
               val proto = FeatureValueOuterClass.FeatureValue.newBuilder()
                 .setSparseLongArray(protoArray).build()
-              Base64.getEncoder.encodeToString(proto.toByteArray)
+              serialize(proto)
             }
           case _ =>
             (rowData: Any) => {
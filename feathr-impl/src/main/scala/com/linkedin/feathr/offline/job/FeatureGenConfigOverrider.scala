@@ -1,7 +1,7 @@
 package com.linkedin.feathr.offline.job
 
 import com.linkedin.feathr.offline.config.FeathrConfigLoader
-import com.typesafe.config.{ConfigFactory, ConfigRenderOptions}
+import com.typesafe.config.{ConfigFactory, ConfigRenderOptions, ConfigValueFactory}
 
 import scala.collection.JavaConverters._
 
@@ -11,6 +11,7 @@ import scala.collection.JavaConverters._
 private[offline] object FeatureGenConfigOverrider {
 
   private val feathrConfigLoader = FeathrConfigLoader()
+  private val END_TIME_PATH = "operational.endTime"
 
   /**
    * Construct feature gen config string by considering the override params string
@@ -48,6 +49,22 @@ private[offline] object FeatureGenConfigOverrider {
     withParamsOverrideConfig.root().render()
   }
 
+  /**
+   * Split a feature gen config into one config per backfill cutoff time, in the same order, with operational.endTime
+   * set to the cutoff time.
+   * @param featureGenConfigStr The passed in featureGenConfig string
+   * @param endTimes  The backfill cutoff times, in the endTimeFormat of the config
+   * @return  The feature gen config strings of the cutoff times, or the passed in config if there are no end times
+   */
+  def splitByEndTimes(featureGenConfigStr: String, endTimes: Seq[String]): Seq[String] = {
+    if (endTimes.isEmpty) {
+      Seq(featureGenConfigStr)
+    } else {
+      val fullConfig = ConfigFactory.parseString(featureGenConfigStr)
+      endTimes.map(endTime => fullConfig.withValue(END_TIME_PATH, ConfigValueFactory.fromAnyRef(endTime)).root().render())
+    }
+  }
+
   /**
    * Override feature def configs with a local feature def config. The local config will override the feature def configs if
    * provided.
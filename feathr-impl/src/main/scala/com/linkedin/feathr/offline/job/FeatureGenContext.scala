@@ -17,12 +17,14 @@ class FeatureDefinitionsInput(
  * @param workDir   work directory, used to store temporary results.
  * @param paramsOverride    parameter to override in feature generation config
  * @param featureConfOverride   parameter to override in feature definition config
+ * @param backfillEndTimes   backfill cutoff times, features are generated for each of them in turn if not empty
  */
 
 class FeatureGenJobContext(
     val workDir: String,
     val paramsOverride: Option[String] = None,
-    val featureConfOverride: Option[String] = None) {
+    val featureConfOverride: Option[String] = None,
+    val backfillEndTimes: Seq[String] = Seq()) {
 }
 
 object FeatureGenJobContext {
@@ -39,14 +41,21 @@ object FeatureGenJobContext {
             // option long name, short name, description, arg name (null means not argument), default value (null means required)
             "work-dir" -> OptionParam("wd", "work directory, used to store temporary results, etc.", "WORK_DIR", ""),
             "params-override" -> OptionParam("ac", "parameter to override in feature generation config", "PARAM_OVERRIDE", "[]"),
-            "feature-conf-override" -> OptionParam("fco", "parameter to override in feature definition config", "FEATURE_CONF_OVERRIDE", "[]"))
+            "feature-conf-override" -> OptionParam("fco", "parameter to override in feature definition config", "FEATURE_CONF_OVERRIDE", "[]"),
+            "backfill-end-times" -> OptionParam("bet", "comma separated backfill cutoff times to generate features for", "BACKFILL_END_TIMES", ""))
 
         val cmdParser = new CmdLineParser(args, params)
 
         val paramsOverride = cmdParser.extractOptionalValue("params-override")
         val featureConfOverride = cmdParser.extractOptionalValue("feature-conf-override").map(convertToHoconConfig)
         val workDir = cmdParser.extractRequiredValue("work-dir")
-        new FeatureGenJobContext(workDir, paramsOverride, featureConfOverride)
+        val backfillEndTimes = cmdParser.extractOptionalValue("backfill-end-times").map(parseBackfillEndTimes).getOrElse(Seq())
+        new FeatureGenJobContext(workDir, paramsOverride, featureConfOverride, backfillEndTimes)
+    }
+
+    // Split the comma separated backfill cutoff times
+    private[feathr] def parseBackfillEndTimes(endTimes: String): Seq[String] = {
+        endTimes.split(",").map(_.trim).filter(_.nonEmpty).toSeq
     }
 
     // Convert parameters passed from hadoop template into global vars section for feature conf
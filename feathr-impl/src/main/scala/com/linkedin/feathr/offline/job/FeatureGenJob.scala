@@ -44,6 +44,7 @@ object FeatureGenJob {
       "generation-config" -> OptionParam("gc", "Path of the feature generation config file", "JCONF", null),
       "params-override" -> OptionParam("ac", "parameter to override in feature generation config", "PARAM_OVERRIDE", "[]"),
       "feature-conf-override" -> OptionParam("fco", "parameter to override in feature definition config", "FEATURE_CONF_OVERRIDE", "[]"),
+      "backfill-end-times" -> OptionParam("bet", "comma separated backfill cutoff times to generate features for", "BACKFILL_END_TIMES", ""),
       "redis-config" -> OptionParam("ac", "Authentication config for Redis", "REDIS_CONFIG", ""),
       "s3-config" -> OptionParam("sc", "Authentication config for S3", "S3_CONFIG", ""),
       "adls-config" -> OptionParam("adlc", "Authentication config for ADLS (abfs)", "ADLS_CONFIG", ""),
@@ -71,9 +72,11 @@ object FeatureGenJob {
     val paramsOverride = cmdParser.extractOptionalValue("params-override")
     val featureConfOverride = cmdParser.extractOptionalValue("feature-conf-override").map(convertToHoconConfig)
     val workDir = cmdParser.extractRequiredValue("work-dir")
+    val backfillEndTimes = cmdParser.extractOptionalValue("backfill-end-times")
+      .map(FeatureGenJobContext.parseBackfillEndTimes).getOrElse(Seq())
 
     val dataSourceConfigs = DataSourceConfigUtils.getConfigs(cmdParser)
-    val featureGenJobContext = new FeatureGenJobContext(workDir, paramsOverride, featureConfOverride)
+    val featureGenJobContext = new FeatureGenJobContext(workDir, paramsOverride, featureConfOverride, backfillEndTimes)
 
     (applicationConfigPath, featureDefinitionsInput, featureGenJobContext, dataSourceConfigs)
   }
@@ -120,12 +123,14 @@ object FeatureGenJob {
 
   /**
    * generate Feathr features according to config file contents and jobContext
+   * If the job context has backfill cutoff times, passed by --backfill-end-times, the features are generated for each
+   * of them in turn, with the same spark session and feature definitions.
    * @param ss spark session
    * @param featureGenConfig feature generation config as a string
    * @param featureDefConfig feature definition config, comes from feature repo
    * @param localFeatureConfig feature definition config, comes from local feature definition files
    * @param jobContext job context
-   * @return generated feature data
+   * @return generated feature data, of the last cutoff time if there are several
    */
   private[feathr] def run(
       ss: SparkSession,
@@ -143,8 +148,13 @@ object FeatureGenJob {
           .addLocalOverrideDef(localFeatureConfig)
           .addDataPathHandlers(dataPathHandlers)
           .build()
-    val featureGenSpec = parseFeatureGenApplicationConfig(featureGenConfig, jobContext, dataPathHandlers)
-    feathrClient.generateFeatures(featureGenSpec)
+    val featureGenSpecs = FeatureGenConfigOverrider.splitByEndTimes(featureGenConfig, jobContext.backfillEndTimes)
+      .map(config => parseFeatureGenApplicationConfig(config, jobContext, dataPathHandlers))
+    // cutoff times are processed in order, so that incremental aggregation can start from the previous cutoff's snapshot
+    featureGenSpecs.map(featureGenSpec => {
+      logger.info(s"Generating features for end time ${featureGenSpec.endTimeStr}")
+      feathrClient.generateFeatures(featureGenSpec)
+    }).last
   }
 
   /**
@@ -144,4 +144,39 @@ class TestPushToRedisOutputProcessor extends TestFeathr with MockitoSugar {
     val encoded = RedisOutputUtils.encodeDataFrame(allFeatureCols, rawDf)
     encoded.show()
   }
+
+  /**
+   * Test the binary encoding packs dense numeric vectors and prefixes other values by the encoding version.
+   */
+  @Test
+  def testToBinary(): Unit = {
+    val floatArray = FeatureValueOuterClass.FeatureValue.newBuilder()
+      .setFloatArray(FeatureValueOuterClass.FloatArray.newBuilder().addFloats(1.0f).addFloats(-2.5f)).build()
+    val packed = RedisOutputUtils.toBinary(floatArray)
+    assert(packed.length == 10)
+    assert(packed(0) == 0x02 && packed(1) == 'f'.toByte)
+    val buffer = java.nio.ByteBuffer.wrap(packed, 2, 8).order(java.nio.ByteOrder.LITTLE_ENDIAN)
+    assert(buffer.getFloat == 1.0f && buffer.getFloat == -2.5f)
+
+    val longValue = FeatureValueOuterClass.FeatureValue.newBuilder().setLongValue(3L).build()
+    val binary = RedisOutputUtils.toBinary(longValue)
+    assert(binary(0) == 0x01)
+    assert(FeatureValueOuterClass.FeatureValue.parseFrom(binary.drop(1)) == longValue)
+  }
+
+  /**
+   * Test the packed row layout, which must match pack_row and unpack_row of the Python client.
+   */
+  @Test
+  def testPackRow(): Unit = {
+    val longName = "n" * 200
+    val packed = RedisOutputUtils.packRow(Seq(
+      "f1".getBytes -> Array[Byte](1, 2),
+      longName.getBytes -> Array.fill[Byte](3)(7),
+      "e".getBytes -> Array[Byte]()))
+    val expected = Array[Byte](0x03, 2, 'f', '1', 2, 1, 2) ++
+      Array[Byte](0xc8.toByte, 0x01) ++ longName.getBytes ++ Array[Byte](3, 7, 7, 7) ++
+      Array[Byte](1, 'e', 0)
+    assert(packed.sameElements(expected))
+  }
 }
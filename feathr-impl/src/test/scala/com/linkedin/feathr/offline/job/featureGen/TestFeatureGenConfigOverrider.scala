@@ -2,6 +2,7 @@ package com.linkedin.feathr.offline.job.featureGen
 
 import com.linkedin.feathr.offline.config.FeathrConfigLoader
 import com.linkedin.feathr.offline.job.{FeatureGenConfigOverrider, FeatureGenJobContext}
+import com.typesafe.config.ConfigFactory
 import org.scalatest.testng.TestNGSuite
 import org.testng.Assert.{assertEquals, assertTrue}
 import org.testng.annotations.Test
@@ -140,4 +141,26 @@ class TestFeatureGenConfigOverrider extends TestNGSuite{
     val res = FeatureGenConfigOverrider.applyOverride(featureGenConfigStr, overrideString)
     assertTrue(res.contains(overwrittenPath))
   }
+
+  @Test(description = "test splitByEndTimes method by checking each split config gets one of the end times")
+  def splitByEndTimesTest(): Unit = {
+    val featureGenConfigStr =
+      s"""
+         |operational: {
+         |  name: generateWithDefaultParams
+         |  endTime: "2022-03-03"
+         |  endTimeFormat: "yyyy-MM-dd"
+         |  resolution: DAILY
+         |  output:[]
+         |}
+         |features: [f1, f2]
+      """.stripMargin
+    val endTimes = FeatureGenJobContext.parseBackfillEndTimes("2022-03-01, 2022-03-02,2022-03-03")
+    val res = FeatureGenConfigOverrider.splitByEndTimes(featureGenConfigStr, endTimes).map(ConfigFactory.parseString)
+    assertEquals(res.map(_.getString("operational.endTime")), Seq("2022-03-01", "2022-03-02", "2022-03-03"))
+    assertTrue(res.forall(config => config.getStringList("features").size() == 2))
+
+    // Without end times, the config is kept as is
+    assertEquals(FeatureGenConfigOverrider.splitByEndTimes(featureGenConfigStr, Seq()), Seq(featureGenConfigStr))
+  }
 }
@@ -33,4 +33,17 @@ class TestFeatureGenJobParser extends TestNGSuite{
     val jobContext = FeatureGenJobContext.parse(params)
     assertEquals(jobContext.featureConfOverride.get, s"sources.swaSource.location.path: ${overwrittenPath}")
   }
+
+  @Test(description = "test backfill-end-times parameter parsing for feature-gen job")
+  def featureGenJobBackfillEndTimesTest(): Unit = {
+    val params = Array(
+      "--work-dir",
+      "/user/feathr-starter-kit/feathr-config",
+      "--backfill-end-times",
+      "2022-03-01 00:00:00,2022-03-02 00:00:00")
+    val jobContext = FeatureGenJobContext.parse(params)
+    assertEquals(jobContext.backfillEndTimes, Seq("2022-03-01 00:00:00", "2022-03-02 00:00:00"))
+    // no backfill cutoff times by default
+    assertEquals(FeatureGenJobContext.parse(params.take(2)).backfillEndTimes, Seq())
+  }
 }
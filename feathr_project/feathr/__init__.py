@@ -1,5 +1,6 @@
 from .client import FeathrClient
 from .spark_provider.feathr_configurations import SparkExecutionConfiguration
+from .spark_provider._job_handle import SparkJobHandle, as_completed, wait_all
 from .definition.feature_derivations import *
 from .definition.anchor import *
 from .definition.feature import *
@@ -17,6 +18,7 @@ from .definition.aggregation import *
 from .definition.settings import *
 from .utils.job_utils import *
 from .utils.feature_printer import *
+from .online_store import *
 from .version import __version__
 
 # skipped class as they are internal methods:
@@ -52,6 +54,8 @@ __all__ = [
     'LookupFeature',
     'Aggregation',
     'get_result_df',
+    'iter_result_batches',
+    'clear_result_cache',
     'AvroJsonSchema',
     'Source',
     'InputContext',
@@ -75,5 +79,16 @@ __all__ = [
     'ObservationSettings',
     'FeaturePrinter',
     'SparkExecutionConfiguration',
+    'SparkJobHandle',
+    'wait_all',
+    'as_completed',
+    'OnlineStore',
+    'RedisOnlineStore',
+    'InMemoryOnlineStore',
+    'CoalescingOnlineStore',
+    'SnapshotOnlineStore',
+    'OnlineSnapshot',
+    'OnlineReadEvent',
+    'OnlineReadMetrics',
     __version__,
  ]
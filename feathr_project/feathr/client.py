@@ -1,21 +1,28 @@
-import base64
 import copy
 import json
 import logging
 import os
 import tempfile
-from typing import Any, Dict, List, Tuple, Union, Set
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union, Set
 
 from azure.identity import DefaultAzureCredential
 from jinja2 import Template
 from loguru import logger
 from pyhocon import ConfigFactory
+from tqdm import tqdm
 import redis
+import redis.asyncio
+import redis.asyncio.cluster
+import redis.cluster
 
 from feathr.constants import *
 from feathr.definition._materialization_utils import _to_materialization_config
 from feathr.definition.anchor import FeatureAnchor
 from feathr.definition.config_helper import FeathrConfigHelper
+from feathr.definition.dtype import FeatureType
 from feathr.definition.feature import FeatureBase
 from feathr.definition.feature_derivations import DerivedFeature
 from feathr.definition.materialization_settings import MaterializationSettings
@@ -26,16 +33,23 @@ from feathr.definition.sink import HdfsSink, Sink
 from feathr.definition.source import InputContext
 from feathr.definition.transformation import WindowAggTransformation
 from feathr.definition.typed_key import TypedKey
+from feathr.online_store import (CoalescingOnlineStore, OnlineReadEvent, OnlineReadMetrics, OnlineSnapshot, OnlineStore,
+                                 RedisOnlineStore, SnapshotOnlineStore, write_snapshot)
 from feathr.protobuf.featureValue_pb2 import FeatureValue
 from feathr.registry._feathr_registry_client import _FeatureRegistry, derived_feature_to_def, feature_to_def
 from feathr.registry._feature_registry_purview import _PurviewRegistry
 from feathr.spark_provider._databricks_submission import _FeathrDatabricksJobLauncher
+from feathr.spark_provider._job_handle import SparkJobHandle, wait_all
 from feathr.spark_provider._localspark_submission import _FeathrLocalSparkJobLauncher
 from feathr.spark_provider._synapse_submission import _FeathrSynapseJobLauncher
 from feathr.spark_provider.feathr_configurations import SparkExecutionConfiguration
 from feathr.udf._preprocessing_pyudf_manager import _PreprocessingPyudfManager
 from feathr.utils._env_config_reader import EnvConfigReader
+from feathr.utils._feature_value_decoder import decode_flat, decode_rows, decode_rows_with_decoders, feature_type_to_value_type, strip_types, typed_decoder
+from feathr.utils._online_arrays import rows_to_arrow, rows_to_numpy
 from feathr.utils._file_utils import write_to_file
+from feathr.utils._materialization_watermark import _MaterializationWatermarks
+from feathr.utils._online_cache import CACHE_MISS, OnlineFeatureCache
 from feathr.utils.feature_printer import FeaturePrinter
 from feathr.utils.spark_job_params import FeatureGenerationJobParams, FeatureJoinJobParams
 from feathr.version import get_version
@@ -51,9 +65,10 @@ class FeathrClient(object):
 
     For offline storage and compute engine, Azure ADLS, AWS S3 and Azure Synapse are supported.
 
-    For online storage, currently only Redis is supported.
-    The users of this client is responsible for set up all the necessary information needed to start a Redis client via
-    environment variable or a Spark cluster. Host address, port and password are needed to start the Redis client.
+    For online storage, Redis is supported out of the box, and other online stores can be plugged in by implementing
+    `OnlineStore`. The users of this client is responsible for set up all the necessary information needed to start a
+    Redis client via environment variable or a Spark cluster. Host address, port and password are needed to start the
+    Redis client.
 
     Raises:
         RuntimeError: Fail to create the client since necessary environment variables are not set for Redis
@@ -65,6 +80,7 @@ class FeathrClient(object):
         local_workspace_dir: str = None,
         credential: Any = None,
         project_registry_tag: Dict[str, str] = None,
+        online_store: OnlineStore = None,
     ):
         """Initialize Feathr Client.
         Configuration values used by the Feathr are evaluated in the following precedence, with items higher on the list taking priority.
@@ -77,6 +93,7 @@ class FeathrClient(object):
             local_workspace_dir (optional): Set where is the local work space dir. If not set, Feathr will create a temporary folder to store local workspace related files.
             credential (optional): Azure credential to access cloud resources, most likely to be the returned result of DefaultAzureCredential(). If not set, Feathr will initialize DefaultAzureCredential() inside the __init__ function to get credentials.
             project_registry_tag (optional): Adding tags for project in Feathr registry. This might be useful if you want to tag your project as deprecated, or allow certain customizations on project level. Default is empty
+            online_store (optional): Online store to read online features from, for example `InMemoryOnlineStore` for tests. If not set, a Redis online store is created if Redis host is configured.
         """
         self.logger = logging.getLogger(__name__)
         # Redis key separator
@@ -99,6 +116,15 @@ class FeathrClient(object):
             'project_config__project_name')
 
         # Redis configs. This is optional unless users have configured Redis host.
+        self.redis_host = None
+        # online store which online features are read from, Redis unless another online store is passed in
+        self.online_store = online_store
+        # in-process cache for online reads, disabled by default. See `enable_online_cache`.
+        self.online_cache = None
+        # feature name to the decoder specialized for its feature type. See `enable_typed_online_reads`.
+        self._online_decoders = {}
+        # callbacks called after each online read. See `add_online_read_listener`.
+        self._online_read_listeners = []
         if self.env_config.get('online_store__redis__host'):
             # For illustrative purposes.
             spec = importlib.util.find_spec("redis")
@@ -110,7 +136,21 @@ class FeathrClient(object):
                 'online_store__redis__port')
             self.redis_ssl_enabled = self.env_config.get(
                 'online_store__redis__ssl_enabled')
+            # Redis Cluster and read replica configs; reads go to the primary of a single node by default
+            self.redis_cluster_enabled = self._str_to_bool(self.env_config.get(
+                'online_store__redis__cluster_enabled') or False, "cluster_enabled")
+            self.redis_read_from_replicas = self._str_to_bool(self.env_config.get(
+                'online_store__redis__read_from_replicas') or False, "read_from_replicas")
+            self.redis_replica_host = self.env_config.get(
+                'online_store__redis__replica_host')
             self._construct_redis_client()
+            if self.online_store is None:
+                self.online_store = self._construct_redis_online_store()
+        snapshot_paths = self.env_config.get('online_store__snapshot_paths')
+        if snapshot_paths:
+            for path in snapshot_paths.split(','):
+                if path.strip():
+                    self.load_online_snapshot(path.strip())
 
         # Offline store enabled configs; false by default
         self.s3_enabled = self.env_config.get(
@@ -338,12 +378,12 @@ class FeathrClient(object):
             If a feature doesn't exist, then a None is returned for that feature. For example:
             [None, b'4.0', b'31.0', b'23.0'].
             """
-        redis_key = self._construct_redis_key(feature_table, key)
-        res = self.redis_client.hmget(redis_key, *feature_names)
-        return self._decode_proto(res)
+        return strip_types(self._read_online_rows(feature_table, [key], feature_names)[0])
 
-    def multi_get_online_features(self, feature_table: str, keys: List[Any], feature_names: List[str]):
+    def multi_get_online_features(self, feature_table: str, keys: List[Any], feature_names: List[str], output_format: str = "dict"):
         """Fetches feature value for a list of keys from a online feature table. This is the batch version of the get API.
+        Large batches are split into Redis pipelines of `online_store__redis__pipeline_chunk_size` keys, which are
+        sent concurrently.
 
         Args:
             feature_table: the name of the feature table.
@@ -351,6 +391,14 @@ class FeathrClient(object):
                   for composite keys, please make sure each order of them is consistent with the one in feature's definition;
                   the order can be found by 'get_features_from_registry'.
             feature_names: list of feature names to fetch
+            output_format (optional): "dict" (default) returns a dict of key to the list of feature values.
+                "columnar" returns a dict of feature name to the list of values of that feature, ordered by the
+                requested keys, which is decoded in one pass over the whole batch.
+                "numpy" returns a dict of feature name to a NumPy masked array typed from the stored value type, with
+                one row per requested key and the missing features masked. Dense arrays become 2-D arrays, and sparse
+                arrays become `SparseFeatureBatch` in CSR layout, which can be converted by its `to_scipy()` method.
+                "arrow" returns a pyarrow RecordBatch with a "key" column and one column per feature, where missing
+                features are null.
 
         Return:
             A list of feature values for the requested entities. It's ordered by the requested feature names. For
@@ -360,73 +408,357 @@ class FeathrClient(object):
             are returned. For example, {'12': [None, None, None, None], '24': [None, None, None, None]} If a feature
             doesn't exist, then a None is returned for that feature. For example: {'12': [None, b'4.0', b'31.0',
             b'23.0'], '24': [b'true', b'4.0', b'31.0', b'23.0']}.
+            For "columnar" output format, the same example returns: {'f_is_medium_trip_distance': [b'false', b'true'],
+            'f_day_of_week': [b'5.0', b'4.0'], 'f_day_of_month': [b'1.0', b'31.0'], 'f_hour_of_day': [b'0.0', b'23.0']}.
+        """
+        self._check_output_format(output_format)
+        rows = self._read_online_rows(feature_table, keys, feature_names)
+        return self._construct_multi_get_result(keys, feature_names, rows, output_format)
+
+    async def aget_online_features(self, feature_table: str, key: Any, feature_names: List[str]):
+        """Asynchronous version of `get_online_features`. The lookup is sent through an asyncio Redis connection pool
+        so it doesn't block the event loop, and many lookups can be in flight from a single worker.
+
+        Note that the asyncio connection pool is bound to the event loop where it is first used.
+
+        Args:
+            feature_table: the name of the feature table.
+            key: the key/key list of the entity;
+                 for key list, please make sure the order is consistent with the one in feature's definition;
+                 the order can be found by 'get_features_from_registry'.
+            feature_names: list of feature names to fetch
+
+        Return:
+            A list of feature values for this entity. See `get_online_features` for more details.
+        """
+        return strip_types((await self._aread_online_rows(feature_table, [key], feature_names))[0])
+
+    async def amulti_get_online_features(self, feature_table: str, keys: List[Any], feature_names: List[str], output_format: str = "dict"):
+        """Asynchronous version of `multi_get_online_features`. All the lookups are sent in one pipeline through an
+        asyncio Redis connection pool so it doesn't block the event loop.
+
+        Args:
+            feature_table: the name of the feature table.
+            keys: list of keys/composite keys for the entities;
+                  for composite keys, please make sure each order of them is consistent with the one in feature's definition;
+                  the order can be found by 'get_features_from_registry'.
+            feature_names: list of feature names to fetch
+            output_format (optional): "dict" (default), "columnar", "numpy" or "arrow". See `multi_get_online_features`
+                for more details.
+
+        Return:
+            A dict of key to the list of feature values. See `multi_get_online_features` for more details.
+        """
+        self._check_output_format(output_format)
+        rows = await self._aread_online_rows(feature_table, keys, feature_names)
+        return self._construct_multi_get_result(keys, feature_names, rows, output_format)
+
+    def _read_online_rows(self, feature_table: str, keys: List[Any], feature_names: List[str]) -> List[List[Any]]:
+        """Reads the typed features of each key, from the online cache first and then from the online store, and
+        reports the measurements of the read to the online read listeners.
+        """
+        start = time.perf_counter()
+        rows, missing = self._lookup_online_cache(feature_table, keys, feature_names)
+        pipeline_result = []
+        network_sec = decode_sec = 0.0
+        if missing:
+            fetch_start = time.perf_counter()
+            pipeline_result = self._get_online_store().multi_get(feature_table, self._construct_online_requests(keys, missing))
+            decode_start = time.perf_counter()
+            self._fill_online_rows(feature_table, keys, rows, missing, pipeline_result)
+            network_sec, decode_sec = decode_start - fetch_start, time.perf_counter() - decode_start
+        if self._online_read_listeners:
+            self._report_online_read(feature_table, keys, feature_names, pipeline_result, network_sec, decode_sec, time.perf_counter() - start)
+        return rows
+
+    async def _aread_online_rows(self, feature_table: str, keys: List[Any], feature_names: List[str]) -> List[List[Any]]:
+        """Asynchronous version of `_read_online_rows`."""
+        start = time.perf_counter()
+        rows, missing = self._lookup_online_cache(feature_table, keys, feature_names)
+        pipeline_result = []
+        network_sec = decode_sec = 0.0
+        if missing:
+            fetch_start = time.perf_counter()
+            pipeline_result = await self._get_online_store().amulti_get(feature_table, self._construct_online_requests(keys, missing))
+            decode_start = time.perf_counter()
+            self._fill_online_rows(feature_table, keys, rows, missing, pipeline_result)
+            network_sec, decode_sec = decode_start - fetch_start, time.perf_counter() - decode_start
+        if self._online_read_listeners:
+            self._report_online_read(feature_table, keys, feature_names, pipeline_result, network_sec, decode_sec, time.perf_counter() - start)
+        return rows
+
+    def _report_online_read(self, feature_table: str, keys: List[Any], feature_names: List[str], pipeline_result: List[List[Any]],
+                            network_sec: float, decode_sec: float, total_sec: float):
+        fetched_count = sum(len(row) for row in pipeline_result)
+        event = OnlineReadEvent(
+            feature_table=feature_table,
+            key_count=len(keys),
+            feature_count=len(keys) * len(feature_names),
+            cache_hits=len(keys) * len(feature_names) - fetched_count,
+            fetched_count=fetched_count,
+            null_count=sum(1 for row in pipeline_result for raw in row if not raw),
+            payload_bytes=sum(len(raw) for row in pipeline_result for raw in row if raw),
+            network_sec=network_sec,
+            decode_sec=decode_sec,
+            total_sec=total_sec)
+        for listener in self._online_read_listeners:
+            try:
+                listener(event)
+            except Exception as e:
+                # instrumentation should never fail the reads
+                self.logger.warning(f"Online read listener {listener} failed: {e}")
+
+    def add_online_read_listener(self, listener: Callable[[OnlineReadEvent], None] = None) -> Callable[[OnlineReadEvent], None]:
+        """Registers a callback which is called with an `OnlineReadEvent` after each online read, with the feature
+        table, the number of keys and features, cache hits, null count, payload size, and the time spent in the online
+        store round trips and in decoding. The callbacks are called in the reading thread, so they should be cheap.
+
+        Args:
+            listener (optional): the callback. If not set, an `OnlineReadMetrics` is registered, which aggregates the
+                events into per feature table counters and latency histograms.
+
+        Return:
+            The registered listener.
+        """
+        if listener is None:
+            listener = OnlineReadMetrics()
+        self._online_read_listeners.append(listener)
+        return listener
+
+    def remove_online_read_listener(self, listener: Callable[[OnlineReadEvent], None]):
+        """Unregisters a callback registered by `add_online_read_listener`."""
+        self._online_read_listeners.remove(listener)
+
+    def _get_online_store(self) -> OnlineStore:
+        if self.online_store is None:
+            raise RuntimeError("Online store is not configured. Please set `online_store__redis__host` or pass an online store to the client.")
+        return self.online_store
+
+    def _construct_online_requests(self, keys: List[Any], missing: List[Tuple[int, List[str]]]) -> List[Tuple[str, List[str]]]:
+        """Constructs the (entity key, feature names) requests to the online store from the missing features."""
+        return [(self._construct_entity_key(keys[key_index]), missing_feature_names) for key_index, missing_feature_names in missing]
+
+    def _check_output_format(self, output_format: str):
+        if output_format not in ONLINE_OUTPUT_FORMATS:
+            raise ValueError(f"{output_format} is not a supported output format. Supported formats are: {ONLINE_OUTPUT_FORMATS}")
+
+    def _construct_multi_get_result(self, keys: List[Any], feature_names: List[str], rows: List[List[Any]], output_format: str = "dict"):
+        """Constructs the result from the decoded features of each key. For "dict" output format, the rows are zipped
+        with the requested keys, where composite keys are joined by the composite key separator. For "columnar"
+        output format, the decoded features are grouped by feature name. For "numpy" and "arrow" output formats, the
+        features are assembled into typed arrays.
         """
-        with self.redis_client.pipeline() as redis_pipeline:
-            for key in keys:
-                redis_key = self._construct_redis_key(feature_table, key)
-                redis_pipeline.hmget(redis_key, *feature_names)
-            pipeline_result = redis_pipeline.execute()
-
-        decoded_pipeline_result = []
-        for feature_list in pipeline_result:
-            decoded_pipeline_result.append(self._decode_proto(feature_list))
+        if output_format == "numpy":
+            return rows_to_numpy(feature_names, rows)
+        if output_format == "columnar":
+            return {feature_name: strip_types([row[i] for row in rows]) for i, feature_name in enumerate(feature_names)}
+
         for i in range(len(keys)):
             if isinstance(keys[i], List):
                 keys[i] = self._COMPOSITE_KEY_SEPARATOR.join(keys[i])
-        return dict(zip(keys, decoded_pipeline_result))
+        if output_format == "arrow":
+            return rows_to_arrow(keys, feature_names, rows)
+        return dict(zip(keys, [strip_types(row) for row in rows]))
+
+    def enable_online_cache(self, max_entries: int = 100000, max_bytes: int = None, ttl_sec: float = 60, table_ttl_sec: Dict[str, float] = None) -> OnlineFeatureCache:
+        """Enables the in-process cache for online feature reads. Hot keys are then served from the cache instead of
+        the online store. Features written by `delete_feature_from_redis` are invalidated in the cache.
+
+        Args:
+            max_entries: maximum number of cached feature values. The least recently used ones are evicted first.
+            max_bytes (optional): maximum estimated size of the cached feature values in bytes. No limit if not set.
+            ttl_sec (optional): time to live of the cached feature values in seconds. Defaults to 60 seconds. Set to
+                None so that the cached values never expire.
+            table_ttl_sec (optional): time to live in seconds per feature table, which overrides `ttl_sec`.
+
+        Return:
+            The cache. Hit/miss counters can be read by `get_online_cache_stats()`.
+        """
+        self.online_cache = OnlineFeatureCache(max_entries=max_entries, max_bytes=max_bytes, ttl_sec=ttl_sec, table_ttl_sec=table_ttl_sec)
+        return self.online_cache
+
+    def disable_online_cache(self):
+        """Disables the in-process cache for online feature reads and drops all the cached values."""
+        self.online_cache = None
+
+    def get_online_cache_stats(self) -> Dict[str, Any]:
+        """Returns the hit/miss counters of the online cache in total and per feature table, or None if the cache is
+        not enabled.
+        """
+        return self.online_cache.stats() if self.online_cache else None
+
+    def enable_typed_online_reads(self, feature_types: Dict[str, FeatureType] = None, project_name: str = None, validate: bool = False):
+        """Enables schema-aware online reads. The feature type of each feature is resolved once, so that the values of
+        each feature are decoded by a decoder specialized for its type instead of being dispatched by the type of
+        every value.
+
+        Args:
+            feature_types (optional): feature name to its feature type, e.g. {'f_trip_distance': FLOAT}. If not set,
+                the feature types are read from the registry.
+            project_name (optional): project to read the feature types from the registry. Defaults to the project of
+                this client.
+            validate (optional): if set, reading a value whose type is not the one of its feature type raises a
+                ValueError. Otherwise, such values are decoded by their own type.
+        """
+        if feature_types is None:
+            features = self.get_features_from_registry(project_name or self.project_name)
+            feature_types = {feature_name: feature.feature_type for feature_name, feature in features.items()}
+        decoders = {}
+        for feature_name, feature_type in feature_types.items():
+            value_type = feature_type_to_value_type(feature_type)
+            if value_type is None:
+                self.logger.warning(f"Feature type of {feature_name} has no specific encoding, it will be decoded by the type of each value.")
+                continue
+            decoders[feature_name] = typed_decoder(value_type, validate)
+        self._online_decoders = decoders
+
+    def disable_typed_online_reads(self):
+        """Disables schema-aware online reads, so that values are decoded by their own type."""
+        self._online_decoders = {}
+
+    def enable_online_coalescing(self, window_ms: float = 1, max_batch_keys: int = 1000) -> CoalescingOnlineStore:
+        """Enables request coalescing for online reads. Concurrent lookups from different threads within `window_ms`
+        are merged into one batch, so that one pipelined call is sent to the online store instead of one per lookup.
+        This cuts the round trips to the online store when many threads look up features at the same time, at the
+        cost of up to `window_ms` of extra latency.
+
+        Args:
+            window_ms: time in milliseconds to collect concurrent lookups into a batch. Defaults to 1 millisecond.
+            max_batch_keys: maximum number of keys in a batch. A full batch is sent without waiting for the window.
+
+        Return:
+            The coalescing online store. Lookup and batch counters can be read by its `stats()` method.
+        """
+        self._remove_online_store_wrapper(CoalescingOnlineStore)
+        self.online_store = CoalescingOnlineStore(self._get_online_store(), window_ms=window_ms, max_batch_keys=max_batch_keys)
+        return self.online_store
+
+    def disable_online_coalescing(self):
+        """Disables request coalescing for online reads."""
+        self._remove_online_store_wrapper(CoalescingOnlineStore)
+
+    def export_online_snapshot(self, feature_table: str, path: str, keys: Optional[List[Union[str, List[str]]]] = None,
+                               feature_names: Optional[List[str]] = None, show_progress: bool = False) -> int:
+        """Exports a feature table from the online store into a local snapshot file, which can be loaded by
+        `load_online_snapshot` to warm start serving processes.
+
+        Args:
+            feature_table: the name of the feature table
+            path: path of the snapshot file, which is replaced if it exists
+            keys (optional): the keys to export, e.g. the hot keys of the feature table, where composite keys are
+                lists of key parts. All the keys of the feature table are exported if not set.
+            feature_names (optional): the features to export. All the features of each key are exported if not set.
+            show_progress (optional): whether to show a progress bar.
+
+        Returns:
+            int: number of exported keys.
+        """
+        entity_keys = None if keys is None else [self._construct_entity_key(key) for key in keys]
+        rows = self._get_online_store().iter_rows(feature_table, entity_keys)
+        with tqdm(total=None if entity_keys is None else len(entity_keys), desc=f"Exporting {feature_table}",
+                  unit="key", disable=not show_progress) as progress:
+            def tracked_rows():
+                for row in rows:
+                    progress.update(1)
+                    yield row
+            count = write_snapshot(path, feature_table, tracked_rows(), feature_names)
+        self.logger.info(f"Exported {count} keys of {feature_table} to {path}.")
+        return count
+
+    def load_online_snapshot(self, path: str) -> SnapshotOnlineStore:
+        """Loads a snapshot exported by `export_online_snapshot`, so that online reads of its feature table are served
+        from the memory-mapped snapshot first, and fall back to the online store for the keys and features which are
+        not in it. Snapshots listed in `online_store__snapshot_paths`, separated by commas, are loaded when the client
+        is created.
+
+        Loading a snapshot of a feature table replaces the previous snapshot of the same feature table. Snapshots are
+        not refreshed, so they should be exported again after the feature table is materialized.
+
+        Return:
+            The snapshot online store. Hit and miss counters can be read by its `stats()` method.
+        """
+        snapshot = OnlineSnapshot(path)
+        snapshot_store = self._find_online_store(SnapshotOnlineStore)
+        if snapshot_store is None:
+            snapshot_store = self.online_store = SnapshotOnlineStore(self._get_online_store())
+        snapshot_store.add_snapshot(snapshot)
+        if self.online_cache is not None:
+            self.online_cache.invalidate(snapshot.feature_table)
+        self.logger.info(f"Loaded {len(snapshot)} keys of {snapshot.feature_table} from {path}.")
+        return snapshot_store
+
+    def unload_online_snapshots(self):
+        """Stops serving online reads from snapshots. It must not be called while online reads are in flight."""
+        snapshot_store = self._remove_online_store_wrapper(SnapshotOnlineStore)
+        if snapshot_store is not None:
+            snapshot_store.close()
+
+    def _find_online_store(self, store_class: type) -> Optional[OnlineStore]:
+        """Finds the online store of the given class in the chain of online store wrappers."""
+        online_store = self.online_store
+        while online_store is not None and not isinstance(online_store, store_class):
+            online_store = getattr(online_store, 'online_store', None)
+        return online_store
+
+    def _remove_online_store_wrapper(self, store_class: type) -> Optional[OnlineStore]:
+        """Removes the online store wrapper of the given class from the chain of online store wrappers."""
+        parent = None
+        online_store = self.online_store
+        while online_store is not None and not isinstance(online_store, store_class):
+            parent, online_store = online_store, getattr(online_store, 'online_store', None)
+        if online_store is not None:
+            if parent is None:
+                self.online_store = online_store.online_store
+            else:
+                parent.online_store = online_store.online_store
+        return online_store
+
+    def _lookup_online_cache(self, feature_table: str, keys: List[Any], feature_names: List[str]):
+        """Looks up the requested features in the online cache.
+
+        Return:
+            A tuple of rows and missing requests. Rows contain the cached features of each key (with `CACHE_MISS` for
+            the features that are not cached), or None if nothing is cached for the key. Missing requests are the
+            list of (key index, feature names) to fetch from the online store.
+        """
+        if self.online_cache is None:
+            return [None] * len(keys), [(i, feature_names) for i in range(len(keys))]
+
+        rows = []
+        missing = []
+        for i, key in enumerate(keys):
+            row = self.online_cache.get_many(feature_table, self._construct_entity_key(key), feature_names)
+            missing_feature_names = [feature_name for feature_name, value in zip(feature_names, row) if value is CACHE_MISS]
+            if missing_feature_names:
+                missing.append((i, missing_feature_names))
+            rows.append(row)
+        return rows, missing
+
+    def _fill_online_rows(self, feature_table: str, keys: List[Any], rows: List[List[Any]], missing: List[Tuple[int, List[str]]], pipeline_result: List[List[Any]]):
+        """Decodes the features fetched from the online store in one pass, fills them into the rows and puts them into
+        the online cache. The features are kept as (oneof field name, value) tuples until the result is constructed,
+        so that typed arrays can be built from them.
+        """
+        if self._online_decoders:
+            decoded_rows = decode_rows_with_decoders(pipeline_result, [feature_names for _, feature_names in missing], self._online_decoders)
+        else:
+            decoded_rows = decode_rows(pipeline_result, with_type=True)
+        for (key_index, missing_feature_names), decoded in zip(missing, decoded_rows):
+            row = rows[key_index]
+            if row is None:
+                rows[key_index] = decoded
+            else:
+                decoded_iter = iter(decoded)
+                rows[key_index] = [next(decoded_iter) if value is CACHE_MISS else value for value in row]
+            if self.online_cache is not None:
+                self.online_cache.put_many(feature_table, self._construct_entity_key(keys[key_index]), missing_feature_names, decoded)
 
     def _decode_proto(self, feature_list):
         """Decode the bytes(in string form) via base64 decoder. For dense array, it will be returned as Python List.
         For sparse array, it will be returned as tuple of index array and value array. The order of elements in the
         arrays won't be changed.
         """
-        typed_result = []
-        for raw_feature in feature_list:
-            if raw_feature:
-                feature_value = FeatureValue()
-                decoded = base64.b64decode(raw_feature)
-                feature_value.ParseFromString(decoded)
-                if feature_value.WhichOneof('FeatureValueOneOf') == 'boolean_value':
-                    typed_result.append(feature_value.boolean_value)
-                elif feature_value.WhichOneof('FeatureValueOneOf') == 'string_value':
-                    typed_result.append(feature_value.string_value)
-                elif feature_value.WhichOneof('FeatureValueOneOf') == 'float_value':
-                    typed_result.append(feature_value.float_value)
-                elif feature_value.WhichOneof('FeatureValueOneOf') == 'double_value':
-                    typed_result.append(feature_value.double_value)
-                elif feature_value.WhichOneof('FeatureValueOneOf') == 'int_value':
-                    typed_result.append(feature_value.int_value)
-                elif feature_value.WhichOneof('FeatureValueOneOf') == 'long_value':
-                    typed_result.append(feature_value.long_value)
-                elif feature_value.WhichOneof('FeatureValueOneOf') == 'int_array':
-                    typed_result.append(feature_value.int_array.integers)
-                elif feature_value.WhichOneof('FeatureValueOneOf') == 'string_array':
-                    typed_result.append(feature_value.string_array.strings)
-                elif feature_value.WhichOneof('FeatureValueOneOf') == 'float_array':
-                    typed_result.append(feature_value.float_array.floats)
-                elif feature_value.WhichOneof('FeatureValueOneOf') == 'double_array':
-                    typed_result.append(feature_value.double_array.doubles)
-                elif feature_value.WhichOneof('FeatureValueOneOf') == 'boolean_array':
-                    typed_result.append(feature_value.boolean_array.booleans)
-                elif feature_value.WhichOneof('FeatureValueOneOf') == 'sparse_string_array':
-                    typed_result.append((feature_value.sparse_string_array.index_integers, feature_value.sparse_string_array.value_strings))
-                elif feature_value.WhichOneof('FeatureValueOneOf') == 'sparse_bool_array':
-                    typed_result.append((feature_value.sparse_bool_array.index_integers, feature_value.sparse_bool_array.value_booleans))
-                elif feature_value.WhichOneof('FeatureValueOneOf') == 'sparse_float_array':
-                    typed_result.append((feature_value.sparse_float_array.index_integers, feature_value.sparse_float_array.value_floats))
-                elif feature_value.WhichOneof('FeatureValueOneOf') == 'sparse_double_array':
-                    typed_result.append((feature_value.sparse_double_array.index_integers, feature_value.sparse_double_array.value_doubles))
-                elif feature_value.WhichOneof('FeatureValueOneOf') == 'sparse_long_array':
-                    typed_result.append((feature_value.sparse_long_array.index_integers, feature_value.sparse_long_array.value_longs))
-                else:
-                    self.logger.debug("Fail to load the feature type. Maybe a new type that is not supported by this "
-                                      "client version")
-                    self.logger.debug(f"The raw feature is {raw_feature}.")
-                    self.logger.debug(f"The loaded feature is {feature_value}")
-                    typed_result.append(None)
-            else:
-                typed_result.append(raw_feature)
-        return typed_result
+        return decode_flat(feature_list)
 
     def delete_feature_from_redis(self, feature_table, key, feature_name) -> None:
         """
@@ -441,10 +773,70 @@ class FeathrClient(object):
         redis_key = self._construct_redis_key(feature_table, key)
         if self.redis_client.hexists(redis_key, feature_name):
             self.redis_client.delete(redis_key, feature_name)
+            if self.online_cache is not None:
+                # the whole entity is deleted from Redis
+                self.online_cache.invalidate(feature_table, self._construct_entity_key(key))
             print(f'Deletion successful. {feature_name} is deleted from Redis.')
         else:
             raise RuntimeError(f'Deletion failed. {feature_name} not found in Redis.')
 
+    def delete_online_features(self, feature_table: str, keys: Optional[List[Union[str, List[str]]]] = None,
+                               feature_names: Optional[List[str]] = None, show_progress: bool = False) -> int:
+        """
+        Delete features from the online store in bulk. The deletion is sent in pipelines of
+        `online_store.redis.pipeline_chunk_size` keys, which run concurrently.
+
+        Args:
+            feature_table: the name of the feature table
+            keys (optional): the keys of the entities to delete, where composite keys are lists of key parts. All
+                the keys of the feature table are deleted if not set.
+            feature_names (optional): the features to delete. The whole entities are deleted if not set.
+            show_progress (optional): whether to show a progress bar.
+
+        Returns:
+            int: number of deleted keys, or number of deleted features if `feature_names` is set.
+        """
+        entity_keys = None if keys is None else [self._construct_entity_key(key) for key in keys]
+        deleted = self._get_online_store().delete(feature_table, entity_keys, feature_names, show_progress)
+        self._invalidate_online_cache(feature_table, entity_keys, feature_names)
+        return deleted
+
+    def expire_online_features(self, feature_table: str, ttl_sec: int, keys: Optional[List[Union[str, List[str]]]] = None,
+                               feature_names: Optional[List[str]] = None, show_progress: bool = False) -> int:
+        """
+        Set the time to live of features in the online store in bulk. Setting the time to live of single features
+        in Redis needs Redis 7.4 or above. The values cached by the online cache expire no later than in the
+        online store.
+
+        Args:
+            feature_table: the name of the feature table
+            ttl_sec: time to live in seconds
+            keys (optional): the keys of the entities to expire, where composite keys are lists of key parts. All
+                the keys of the feature table are expired if not set.
+            feature_names (optional): the features to expire. The whole entities are expired if not set.
+            show_progress (optional): whether to show a progress bar.
+
+        Returns:
+            int: number of keys, or number of features if `feature_names` is set, whose time to live is set.
+        """
+        if ttl_sec < 0:
+            raise ValueError(f"ttl_sec must be non-negative, got {ttl_sec}.")
+        entity_keys = None if keys is None else [self._construct_entity_key(key) for key in keys]
+        expired = self._get_online_store().expire(feature_table, ttl_sec, entity_keys, feature_names, show_progress)
+        # the cached values must not outlive the features in the online store
+        if self.online_cache is not None:
+            for key in (entity_keys if entity_keys is not None else [None]):
+                for feature_name in (feature_names if feature_names is not None else [None]):
+                    self.online_cache.expire(feature_table, ttl_sec, key, feature_name)
+        return expired
+
+    def _invalidate_online_cache(self, feature_table: str, keys: Optional[List[str]], feature_names: Optional[List[str]]):
+        if self.online_cache is None:
+            return
+        for key in (keys if keys is not None else [None]):
+            for feature_name in (feature_names if feature_names is not None else [None]):
+                self.online_cache.invalidate(feature_table, key, feature_name)
+
     def _clean_test_data(self, feature_table):
         """
         WARNING: THIS IS ONLY USED FOR TESTING
@@ -454,19 +846,15 @@ class FeathrClient(object):
         Args:
           feature_table: str, feature_table i.e your prefix before the separator in the Redis database.
         """
-        cursor = '0'
-        ns_keys = feature_table + '*'
-        while cursor != 0:
-            # 5000 count at a scan seems reasonable faster for our testing data
-            cursor, keys = self.redis_client.scan(
-                cursor=cursor, match=ns_keys, count=5000)
-            if keys:
-                self.redis_client.delete(*keys)
+        self.delete_online_features(feature_table)
 
     def _construct_redis_key(self, feature_table, key):
+        return feature_table + self._KEY_SEPARATOR + self._construct_entity_key(key)
+
+    def _construct_entity_key(self, key):
         if isinstance(key, List):
             key = self._COMPOSITE_KEY_SEPARATOR.join(key)
-        return feature_table + self._KEY_SEPARATOR + key
+        return key
 
     def _str_to_bool(self, s: str, variable_name = None):
         """Define a function to detect convert string to bool, since Redis client sometimes require a bool and sometimes require a str
@@ -482,17 +870,68 @@ class FeathrClient(object):
     def _construct_redis_client(self):
         """Constructs the Redis client. The host, port, credential and other parameters can be set via environment
         parameters.
+
+        If `online_store__redis__cluster_enabled` is set, a Redis Cluster client is constructed instead, which routes
+        the commands to the shard owning the key, and reads to the replicas of the shard if
+        `online_store__redis__read_from_replicas` is set. For a single node, reads can be sent to a read replica (or
+        a reader endpoint) by setting `online_store__redis__replica_host`.
         """
+        self.redis_client = self._new_redis_client(self.redis_host)
+        self.redis_read_client = None
+        if self.redis_replica_host and not self.redis_cluster_enabled:
+            self.redis_read_client = self._new_redis_client(self.redis_replica_host)
+        self.logger.info('Redis connection is successful and completed.')
+
+    def _new_redis_client(self, host: str, use_asyncio: bool = False, **kwargs):
+        """Creates a Redis client of the given host with the configured port, credential and topology."""
         password = self.env_config.get_from_env_or_akv(REDIS_PASSWORD)
-        host = self.redis_host
-        port = self.redis_port
-        ssl_enabled = self.redis_ssl_enabled
-        self.redis_client = redis.Redis(
+        ssl = self._str_to_bool(self.redis_ssl_enabled, "ssl_enabled")
+        if self.redis_cluster_enabled:
+            cluster_class = redis.asyncio.cluster.RedisCluster if use_asyncio else redis.cluster.RedisCluster
+            return cluster_class(
+                host=host,
+                port=int(self.redis_port),
+                password=password,
+                ssl=ssl,
+                read_from_replicas=self.redis_read_from_replicas,
+                **kwargs)
+        client_class = redis.asyncio.Redis if use_asyncio else redis.Redis
+        return client_class(
             host=host,
-            port=port,
+            port=self.redis_port,
             password=password,
-            ssl=self._str_to_bool(ssl_enabled, "ssl_enabled"))
-        self.logger.info('Redis connection is successful and completed.')
+            ssl=ssl,
+            **kwargs)
+
+    def _construct_async_redis_client(self):
+        """Constructs the asyncio Redis client used by the async online APIs. The pool size can be set via
+        `online_store__redis__max_connections`. Since the async APIs only read, the client connects to the read
+        replica if configured.
+        """
+        max_connections = self.env_config.get('online_store__redis__max_connections')
+        host = self.redis_host if self.redis_cluster_enabled else self.redis_replica_host or self.redis_host
+        return self._new_redis_client(
+            host,
+            use_asyncio=True,
+            **({"max_connections": int(max_connections)} if max_connections else {}))
+
+    def _construct_redis_online_store(self) -> RedisOnlineStore:
+        """Constructs the Redis online store. Large batches of online reads are split into pipelines of
+        `online_store__redis__pipeline_chunk_size` keys, and up to `online_store__redis__pipeline_parallelism`
+        pipelines are sent concurrently. The layout of the keys materialized by `RedisSink(packed=True)` is detected
+        on read, and feature tables listed in `online_store__redis__packed_tables`, separated by commas, are written in
+        the packed layout by the client as well.
+        """
+        packed_tables = self.env_config.get('online_store__redis__packed_tables') or []
+        if isinstance(packed_tables, str):
+            packed_tables = [table.strip() for table in packed_tables.split(',') if table.strip()]
+        return RedisOnlineStore(
+            self.redis_client,
+            read_client=self.redis_read_client,
+            async_client_factory=self._construct_async_redis_client,
+            pipeline_chunk_size=int(self.env_config.get('online_store__redis__pipeline_chunk_size') or REDIS_PIPELINE_CHUNK_SIZE),
+            pipeline_parallelism=int(self.env_config.get('online_store__redis__pipeline_parallelism') or REDIS_PIPELINE_PARALLELISM),
+            packed_feature_tables=packed_tables)
 
     def get_offline_features(self,
                              observation_settings: ObservationSettings,
@@ -512,6 +951,9 @@ class FeathrClient(object):
             execution_configurations: a dict that will be passed to spark job when the job starts up, i.e. the "spark configurations". Note that not all of the configuration will be honored since some of the configurations are managed by the Spark platform, such as Databricks or Azure Synapse. Refer to the [spark documentation](https://spark.apache.org/docs/latest/configuration.html) for a complete list of spark configurations.
             config_file_name: the name of the config file that will be passed to the spark job. The config file is used to configure the spark job. The default value is "feature_join_conf/feature_join.conf".
             dataset_column_names: column names of observation data set. Will be used to check conflicts with feature names if cannot get real column names from observation data set.
+
+        Returns:
+            SparkJobHandle: handle of the submitted job.
         """
         feature_queries = feature_query if isinstance(feature_query, List) else [feature_query]
         feature_names = []
@@ -715,13 +1157,25 @@ class FeathrClient(object):
                         return False
         return True
 
-    def materialize_features(self, settings: MaterializationSettings, execution_configurations: Union[SparkExecutionConfiguration ,Dict[str,str]] = {}, verbose: bool = False, allow_materialize_non_agg_feature: bool = False):
+    def materialize_features(self, settings: MaterializationSettings, execution_configurations: Union[SparkExecutionConfiguration ,Dict[str,str]] = {}, verbose: bool = False, allow_materialize_non_agg_feature: bool = False, submission_parallelism: int = 1, single_job_backfill: bool = False, incremental: bool = False):
         """Materialize feature data
 
         Args:
             settings: Feature materialization settings
             execution_configurations: a dict that will be passed to spark job when the job starts up, i.e. the "spark configurations". Note that not all of the configuration will be honored since some of the configurations are managed by the Spark platform, such as Databricks or Azure Synapse. Refer to the [spark documentation](https://spark.apache.org/docs/latest/configuration.html) for a complete list of spark configurations.
             allow_materialize_non_agg_feature: Materializing non-aggregated features (the features without WindowAggTransformation) doesn't output meaningful results so it's by default set to False, but if you really want to materialize non-aggregated features, set this to True.
+            submission_parallelism (optional): maximum number of backfill jobs submitted concurrently. The feature config and the UDF files are generated and uploaded once for all the jobs. Default to submit the jobs one after another.
+            single_job_backfill (optional): materialize all the backfill cutoff times in a single job, which generates the features of each cutoff time in turn, with one Spark session and feature definitions loading. The outputs are still written per cutoff time. The cutoff times are passed by the `--backfill-end-times` job argument, so a job jar which doesn't support it fails instead of materializing only the last cutoff time. Default to submit a job per cutoff time.
+            incremental (optional): only materialize the backfill cutoff times after the watermark of the settings, i.e. the latest cutoff time materialized successfully to all of its sinks by previous incremental runs of the same settings name. The jobs are waited for, then the watermark advances to the latest cutoff time up to which all the jobs succeeded.
+
+        Returns:
+            List[SparkJobHandle]: handles of the submitted jobs, one per backfill cutoff time, or a single one with
+                `single_job_backfill`. Use `wait_all` to wait for all of them. Empty if `incremental` and all the
+                cutoff times are already materialized.
+
+        Raises:
+            RuntimeError: if `incremental` and some jobs failed. The watermark still advances up to the first failed
+                cutoff time.
         """
         feature_list = settings.feature_names
         if len(feature_list) > 0:
@@ -757,24 +1211,47 @@ class FeathrClient(object):
                 # Note, for now we only cache one output path from one of HdfsSinks (if one passed multiple sinks).
                 output_path = sink.output_path
 
-        results = []
-        # produce materialization config
-        for end in settings.get_backfill_cutoff_time():
+        # make sure `FeathrClient.build_features()` is called before getting offline features/materialize features in the python SDK
+        # otherwise users will be confused on what are the available features
+        # in build_features it will assign anchor_list and derived_feature_list variable, hence we are checking if those two variables exist to make sure the above condition is met
+        if 'anchor_list' in dir(self) and 'derived_feature_list' in dir(self):
+            self.config_helper.save_to_feature_config_from_context(self.anchor_list, self.derived_feature_list, self.local_workspace_dir)
+        else:
+            raise RuntimeError("Please call FeathrClient.build_features() first in order to materialize the features")
+        udf_files = _PreprocessingPyudfManager.prepare_pyspark_udf_files(settings.feature_names, self.local_workspace_dir)
+
+        # produce materialization config of every backfill cutoff time, or of the last one for a single job, which gets
+        # all the cutoff times as a job argument
+        config_file_paths = []
+        cutoff_times = settings.get_backfill_cutoff_time()
+        if incremental:
+            watermarks = self._get_materialization_watermarks()
+            sink_watermarks = [watermarks.get(self.project_name, settings.name, sink) for sink in settings.sinks]
+            # the cutoff times after the watermark of any sink are materialized again, to all the sinks
+            watermark = None if None in sink_watermarks else min(sink_watermarks, default=None)
+            if watermark is not None:
+                cutoff_times = [end for end in cutoff_times if end > watermark]
+            if not cutoff_times:
+                logger.info("All the backfill cutoff times of {} are already materialized, up to {}.", settings.name, watermark)
+                return []
+        job_cutoff_times = cutoff_times[-1:] if single_job_backfill else cutoff_times
+        for end in job_cutoff_times:
             settings.backfill_time.end = end
             config = _to_materialization_config(settings)
             config_file_name = "feature_gen_conf/auto_gen_config_{}.conf".format(end.timestamp())
             config_file_path = os.path.join(self.local_workspace_dir, config_file_name)
             write_to_file(content=config, full_file_name=config_file_path)
+            config_file_paths.append(config_file_path)
 
-            # make sure `FeathrClient.build_features()` is called before getting offline features/materialize features in the python SDK
-            # otherwise users will be confused on what are the available features
-            # in build_features it will assign anchor_list and derived_feature_list variable, hence we are checking if those two variables exist to make sure the above condition is met
-            if 'anchor_list' in dir(self) and 'derived_feature_list' in dir(self):
-                self.config_helper.save_to_feature_config_from_context(self.anchor_list, self.derived_feature_list, self.local_workspace_dir)
-            else:
-                raise RuntimeError("Please call FeathrClient.build_features() first in order to materialize the features")
+        # The main jar, the feature config and the UDF files are the same for all the jobs, so they are uploaded only once
+        local_paths = udf_files + [os.path.join(self.local_workspace_dir, "feature_conf/")]
+        if self._FEATHR_JOB_JAR_PATH:
+            local_paths.append(self._FEATHR_JOB_JAR_PATH)
+        cloud_paths = {}
+        for local_path in local_paths:
+            cloud_paths[local_path] = self.feathr_spark_launcher.upload_or_get_cloud_path(local_path)
 
-            udf_files = _PreprocessingPyudfManager.prepare_pyspark_udf_files(settings.feature_names, self.local_workspace_dir)
+        def submit(config_file_path: str):
             # CLI will directly call this so the experience won't be broken
             result = self._materialize_features_with_config(
                 feature_gen_conf_path=config_file_path,
@@ -782,10 +1259,33 @@ class FeathrClient(object):
                 udf_files=udf_files,
                 secrets=secrets,
                 output_path=output_path,
+                cloud_paths=cloud_paths,
+                backfill_end_times=cutoff_times if single_job_backfill else None,
             )
             if os.path.exists(config_file_path) and self.spark_runtime != 'local':
                 os.remove(config_file_path)
-            results.append(result)
+            return result
+
+        if submission_parallelism <= 1 or len(config_file_paths) <= 1:
+            results = [submit(config_file_path) for config_file_path in config_file_paths]
+        else:
+            results = []
+            failed = []
+            with ThreadPoolExecutor(max_workers=min(submission_parallelism, len(config_file_paths))) as executor:
+                # results are kept in the order of the cutoff times
+                futures = [executor.submit(submit, config_file_path) for config_file_path in config_file_paths]
+                for end, future in zip(job_cutoff_times, futures):
+                    try:
+                        results.append(future.result())
+                    except Exception as e:
+                        logger.error("Failed to submit the materialization job of backfill cutoff time {}: {}", end, e)
+                        failed.append(end)
+            if failed:
+                raise RuntimeError(f"Failed to submit {len(failed)} of {len(job_cutoff_times)} materialization jobs, for backfill cutoff times: {', '.join(str(end) for end in failed)}")
+            logger.info("Submitted {} materialization jobs with up to {} concurrent submissions.", len(results), submission_parallelism)
+
+        if incremental:
+            self._advance_materialization_watermark(settings, job_cutoff_times, results)
 
         # Pretty print feature_names of materialized features
         if verbose and settings:
@@ -793,6 +1293,23 @@ class FeathrClient(object):
 
         return results
 
+    def _get_materialization_watermarks(self) -> _MaterializationWatermarks:
+        return _MaterializationWatermarks(
+            self.env_config.get("spark_config__materialization_watermark_path") or DEFAULT_MATERIALIZATION_WATERMARK_PATH)
+
+    def _advance_materialization_watermark(self, settings: MaterializationSettings, job_cutoff_times: List[datetime], jobs: List[SparkJobHandle]):
+        """Waits for the jobs of an incremental materialization, then advances the watermark of each sink to the latest
+        cutoff time up to which all the jobs succeeded."""
+        succeeded = wait_all(jobs)
+        num_succeeded = succeeded.index(False) if False in succeeded else len(succeeded)
+        if num_succeeded > 0:
+            watermarks = self._get_materialization_watermarks()
+            for sink in settings.sinks:
+                watermarks.set(self.project_name, settings.name, sink, job_cutoff_times[num_succeeded - 1])
+            logger.info("Materialization watermark of {} advanced to {}.", settings.name, job_cutoff_times[num_succeeded - 1])
+        if num_succeeded < len(jobs):
+            raise RuntimeError(f"Materialization job of backfill cutoff time {job_cutoff_times[num_succeeded]} failed, {succeeded.count(False)} of {len(jobs)} jobs failed.")
+
     def _materialize_features_with_config(
         self,
         feature_gen_conf_path: str = 'feature_gen_conf/feature_gen.conf',
@@ -800,6 +1317,8 @@ class FeathrClient(object):
         udf_files: List = [],
         secrets: List = [],
         output_path: str = None,
+        cloud_paths: Dict[str, str] = None,
+        backfill_end_times: List[datetime] = None,
     ):
         """Materializes feature data based on the feature generation config. The feature
         data will be materialized to the destination specified in the feature generation config.
@@ -810,8 +1329,17 @@ class FeathrClient(object):
             udf_files: UDF files.
             secrets: Secrets to access sinks.
             output_path: The output path of the materialized features when using an offline sink.
+            cloud_paths: Cloud paths of the files already uploaded, by local path. Other files are uploaded.
+            backfill_end_times: All the backfill cutoff times, when a single job materializes them in turn.
         """
-        cloud_udf_paths = [self.feathr_spark_launcher.upload_or_get_cloud_path(udf_local_path) for udf_local_path in udf_files]
+        cloud_paths = cloud_paths or {}
+
+        def get_cloud_path(local_path: str) -> str:
+            if local_path in cloud_paths:
+                return cloud_paths[local_path]
+            return self.feathr_spark_launcher.upload_or_get_cloud_path(local_path)
+
+        cloud_udf_paths = [get_cloud_path(udf_local_path) for udf_local_path in udf_files]
 
         # Read all features conf
         generation_config = FeatureGenerationJobParams(
@@ -837,12 +1365,14 @@ class FeathrClient(object):
         optional_params = []
         if self.env_config.get_from_env_or_akv('KAFKA_SASL_JAAS_CONFIG'):
             optional_params = optional_params + ['--kafka-config', self._get_kafka_config_str()]
+        if backfill_end_times:
+            # passed as an argument rather than in the generation config, so that a job jar which doesn't support it
+            # fails on the unknown argument instead of materializing only the last cutoff time
+            optional_params = optional_params + ['--backfill-end-times', ','.join(end.strftime('%Y-%m-%d %H:%M:%S') for end in backfill_end_times)]
         arguments = [
-                '--generation-config', self.feathr_spark_launcher.upload_or_get_cloud_path(
-                generation_config.generation_config_path),
+                '--generation-config', get_cloud_path(generation_config.generation_config_path),
                 # Local Config, comma seperated file names
-                '--feature-config', self.feathr_spark_launcher.upload_or_get_cloud_path(
-                generation_config.feature_config),
+                '--feature-config', get_cloud_path(generation_config.feature_config),
                 '--redis-config', self._getRedisConfigStr(),
             ] + self._get_offline_storage_arguments()+optional_params
         monitoring_config_str = self._get_monitoring_config_str()
@@ -851,7 +1381,7 @@ class FeathrClient(object):
             arguments.append(monitoring_config_str)
         return self.feathr_spark_launcher.submit_feathr_job(
             job_name=self.project_name + '_feathr_feature_materialization_job',
-            main_jar_path=self._FEATHR_JOB_JAR_PATH,
+            main_jar_path=cloud_paths.get(self._FEATHR_JOB_JAR_PATH, self._FEATHR_JOB_JAR_PATH),
             python_files=cloud_udf_paths,
             job_tags=job_tags,
             main_class_name=GEN_CLASS_NAME,
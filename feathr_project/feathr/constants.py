@@ -2,6 +2,22 @@ OUTPUT_PATH_TAG = "output_path"
 # spark config for output format setting
 OUTPUT_FORMAT = "spark.feathr.outputFormat"
 REDIS_PASSWORD = 'REDIS_PASSWORD'
+# supported output formats of multi_get_online_features
+ONLINE_OUTPUT_FORMATS = ["dict", "columnar", "numpy", "arrow"]
+# default number of keys per Redis pipeline and number of pipelines in flight for multi_get_online_features
+REDIS_PIPELINE_CHUNK_SIZE = 1000
+REDIS_PIPELINE_PARALLELISM = 4
+# default maximum number of rows per batch of iter_result_batches
+DEFAULT_RESULT_BATCH_SIZE = 65536
+# default number of result files downloaded concurrently from the storage of a Spark cluster
+DEFAULT_DOWNLOAD_MAX_WORKERS = 8
+# seconds between two reads of the log of a local Spark job
+LOCAL_SPARK_POLL_INTERVAL_SEC = 0.2
+# default directory and size limit of the local cache of downloaded job results
+DEFAULT_RESULT_CACHE_DIR = "~/.cache/feathr/results"
+DEFAULT_RESULT_CACHE_MAX_SIZE_MB = 10240
+# default file of the watermarks of incremental materialization
+DEFAULT_MATERIALIZATION_WATERMARK_PATH = "~/.feathr/materialization_watermarks.json"
 
 # 1MB = 1024*1024
 MB_BYTES = 1048576
@@ -63,11 +63,22 @@ class RedisSink(Sink):
         table_name: output table name
         streaming: whether it is used in streaming mode
         streamingTimeoutMs: maximum running time for streaming mode. It is not used in batch mode.
+        encoding: how feature values are stored. "base64" stores base64 encoded FeatureValue protobufs, which is the
+            default. "binary" stores raw bytes, where dense numeric vectors are packed little-endian, which uses less
+            Redis memory and network and is faster to decode. Online reads support both encodings.
+        packed: whether to pack all the features of a key into a single Redis hash field instead of one field per
+            feature, which cuts the per-key overhead of wide feature tables. Online reads detect the packed layout of
+            each key, so clients read packed tables without any config. Packed keys can only be deleted or expired as
+            a whole.
     """
-    def __init__(self, table_name: str, streaming: bool=False, streamingTimeoutMs: Optional[int]=None) -> None:
+    def __init__(self, table_name: str, streaming: bool=False, streamingTimeoutMs: Optional[int]=None, encoding: str="base64", packed: bool=False) -> None:
+        if encoding not in ("base64", "binary"):
+            raise ValueError(f"Unsupported encoding {encoding}, must be one of base64, binary.")
         self.table_name = table_name
         self.streaming = streaming
         self.streamingTimeoutMs = streamingTimeoutMs
+        self.encoding = encoding
+        self.packed = packed
 
     def to_feature_config(self) -> str:
         """Produce the config used in feature materialization"""
@@ -82,6 +93,12 @@ class RedisSink(Sink):
                     {% if source.streamingTimeoutMs %}
                     timeoutMs: {{source.streamingTimeoutMs}}
                     {% endif %}
+                    {% if source.encoding != "base64" %}
+                    encoding: {{source.encoding}}
+                    {% endif %}
+                    {% if source.packed %}
+                    packed: true
+                    {% endif %}
                     {% if source.aggregation_features %}
                     features: [{{','.join(source.aggregation_features)}}]
                     {% endif %}
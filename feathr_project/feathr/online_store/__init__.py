@@ -0,0 +1,18 @@
+from feathr.online_store._abc import OnlineStore
+from feathr.online_store._coalescing_store import CoalescingOnlineStore
+from feathr.online_store._in_memory_store import InMemoryOnlineStore
+from feathr.online_store._metrics import OnlineReadEvent, OnlineReadMetrics
+from feathr.online_store._redis_store import RedisOnlineStore
+from feathr.online_store._snapshot import OnlineSnapshot, SnapshotOnlineStore, write_snapshot
+
+__all__ = [
+    'OnlineStore',
+    'CoalescingOnlineStore',
+    'InMemoryOnlineStore',
+    'RedisOnlineStore',
+    'SnapshotOnlineStore',
+    'OnlineSnapshot',
+    'write_snapshot',
+    'OnlineReadEvent',
+    'OnlineReadMetrics',
+]
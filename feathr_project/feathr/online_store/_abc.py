@@ -0,0 +1,88 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+class OnlineStore(ABC):
+    """This is the abstract class for all the online stores which `FeathrClient` reads online features from. All the
+    online stores should implement those interfaces.
+
+    Online stores work on encoded features, i.e. base64 encoded FeatureValue protobufs as written by the
+    materialization jobs, so that decoding and caching are shared by all the online stores. Keys are the entity keys,
+    where composite keys are already joined.
+    """
+
+    @abstractmethod
+    def multi_get(self, feature_table: str, requests: List[Tuple[str, List[str]]]) -> List[List[Optional[bytes]]]:
+        """Gets the encoded features of a batch of keys.
+
+        Args:
+            feature_table: the name of the feature table.
+            requests: list of (key, feature names) to get.
+
+        Returns:
+            List[List[Optional[bytes]]]: one list of encoded features per request, ordered by the requested feature
+            names, where missing features are None.
+        """
+        pass
+
+    @abstractmethod
+    def multi_put(self, feature_table: str, rows: Dict[str, Dict[str, Any]]):
+        """Puts the encoded features of a batch of keys, replacing the existing values of the same features.
+
+        Args:
+            feature_table: the name of the feature table.
+            rows: dict of key to the dict of feature name to the encoded feature.
+        """
+        pass
+
+    async def amulti_get(self, feature_table: str, requests: List[Tuple[str, List[str]]]) -> List[List[Optional[bytes]]]:
+        """Asynchronous version of `multi_get`. Online stores with a non-blocking client should override it, by
+        default it calls `multi_get`.
+        """
+        return self.multi_get(feature_table, requests)
+
+    @abstractmethod
+    def delete(self, feature_table: str, keys: Optional[List[str]] = None, feature_names: Optional[List[str]] = None,
+               show_progress: bool = False) -> int:
+        """Deletes features in bulk.
+
+        Args:
+            feature_table: the name of the feature table.
+            keys (optional): the keys to delete. All the keys of the feature table are deleted if not set.
+            feature_names (optional): the features to delete. All the features of the keys are deleted if not set.
+            show_progress (optional): whether to show a progress bar.
+
+        Returns:
+            int: number of deleted keys, or number of deleted features if `feature_names` is set.
+        """
+        pass
+
+    @abstractmethod
+    def expire(self, feature_table: str, ttl_sec: int, keys: Optional[List[str]] = None,
+               feature_names: Optional[List[str]] = None, show_progress: bool = False) -> int:
+        """Sets the time to live of features in bulk.
+
+        Args:
+            feature_table: the name of the feature table.
+            ttl_sec: time to live in seconds.
+            keys (optional): the keys to expire. All the keys of the feature table are expired if not set.
+            feature_names (optional): the features to expire. The whole keys are expired if not set.
+            show_progress (optional): whether to show a progress bar.
+
+        Returns:
+            int: number of keys, or number of features if `feature_names` is set, whose time to live is set.
+        """
+        pass
+
+    @abstractmethod
+    def iter_rows(self, feature_table: str, keys: Optional[List[str]] = None) -> Iterator[Tuple[str, Dict[str, bytes]]]:
+        """Iterates over the encoded features of a feature table.
+
+        Args:
+            feature_table: the name of the feature table.
+            keys (optional): the keys to read. All the keys of the feature table are read if not set.
+
+        Returns:
+            Iterator of (key, dict of feature name to the encoded feature), where missing keys are skipped.
+        """
+        pass
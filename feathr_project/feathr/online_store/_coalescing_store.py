@@ -0,0 +1,107 @@
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from feathr.online_store._abc import OnlineStore
+
+
+class _PendingBatch(object):
+    """Lookups of one feature table collected within a coalescing window."""
+    def __init__(self):
+        self.requests: List[Tuple[str, List[str]]] = []
+        # set when the batch is full, so that the leader doesn't wait for the whole window
+        self.full = threading.Event()
+        # set when the result of the batch is available
+        self.done = threading.Event()
+        self.result: Optional[List[List[Any]]] = None
+        self.error: Optional[BaseException] = None
+
+
+class CoalescingOnlineStore(OnlineStore):
+    """Online store which coalesces concurrent lookups of another online store.
+
+    The first lookup of a feature table opens a batch and waits for `window_ms`, during which the lookups from other
+    threads are added to the same batch. Then one `multi_get` of the deduplicated keys and features is sent to the
+    underlying online store, and the result is handed back to every waiter. A batch is sent early once it has
+    `max_batch_keys` keys.
+
+    Async lookups are not coalesced, they go to the underlying online store directly since they don't block a thread
+    per lookup.
+
+    Attributes:
+        online_store: the underlying online store.
+        window_ms: time in milliseconds to collect the lookups of a batch.
+        max_batch_keys: maximum number of requested keys in a batch.
+    """
+    def __init__(self, online_store: OnlineStore, window_ms: float = 1, max_batch_keys: int = 1000):
+        self.online_store = online_store
+        self.window_ms = window_ms
+        self.max_batch_keys = max_batch_keys
+        self._pending: Dict[str, _PendingBatch] = {}
+        self._lock = threading.Lock()
+        self._lookups = 0
+        self._batches = 0
+
+    def multi_get(self, feature_table: str, requests: List[Tuple[str, List[str]]]) -> List[List[Optional[bytes]]]:
+        with self._lock:
+            self._lookups += 1
+            batch = self._pending.get(feature_table)
+            is_leader = batch is None
+            if is_leader:
+                batch = _PendingBatch()
+                self._pending[feature_table] = batch
+            offset = len(batch.requests)
+            batch.requests.extend(requests)
+            if len(batch.requests) >= self.max_batch_keys:
+                # close the batch so that the following lookups open a new one
+                self._pending.pop(feature_table, None)
+                batch.full.set()
+
+        if is_leader:
+            batch.full.wait(self.window_ms / 1000)
+            with self._lock:
+                if self._pending.get(feature_table) is batch:
+                    self._pending.pop(feature_table)
+                self._batches += 1
+            try:
+                batch.result = self._get_batch(feature_table, batch.requests)
+            except BaseException as e:
+                batch.error = e
+            finally:
+                batch.done.set()
+        else:
+            batch.done.wait()
+
+        if batch.error is not None:
+            raise batch.error
+        return batch.result[offset:offset + len(requests)]
+
+    async def amulti_get(self, feature_table: str, requests: List[Tuple[str, List[str]]]) -> List[List[Optional[bytes]]]:
+        return await self.online_store.amulti_get(feature_table, requests)
+
+    def multi_put(self, feature_table: str, rows: Dict[str, Dict[str, Any]]):
+        self.online_store.multi_put(feature_table, rows)
+
+    def delete(self, feature_table: str, keys: Optional[List[str]] = None, feature_names: Optional[List[str]] = None,
+               show_progress: bool = False) -> int:
+        return self.online_store.delete(feature_table, keys, feature_names, show_progress)
+
+    def expire(self, feature_table: str, ttl_sec: int, keys: Optional[List[str]] = None,
+               feature_names: Optional[List[str]] = None, show_progress: bool = False) -> int:
+        return self.online_store.expire(feature_table, ttl_sec, keys, feature_names, show_progress)
+
+    def iter_rows(self, feature_table: str, keys: Optional[List[str]] = None) -> Iterator[Tuple[str, Dict[str, bytes]]]:
+        return self.online_store.iter_rows(feature_table, keys)
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the number of lookups and the number of batches sent to the underlying online store."""
+        with self._lock:
+            return {"lookups": self._lookups, "batches": self._batches}
+
+    def _get_batch(self, feature_table: str, requests: List[Tuple[str, List[str]]]) -> List[List[Optional[bytes]]]:
+        # union of the requested features per key, in the order they are requested
+        merged: Dict[str, Dict[str, None]] = {}
+        for key, feature_names in requests:
+            merged.setdefault(key, {}).update(dict.fromkeys(feature_names))
+        rows = self.online_store.multi_get(feature_table, [(key, list(feature_names)) for key, feature_names in merged.items()])
+        features = {key: dict(zip(feature_names, row)) for (key, feature_names), row in zip(merged.items(), rows)}
+        return [[features[key][feature_name] for feature_name in feature_names] for key, feature_names in requests]
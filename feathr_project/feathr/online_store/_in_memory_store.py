@@ -0,0 +1,132 @@
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from feathr.online_store._abc import OnlineStore
+
+
+class InMemoryOnlineStore(OnlineStore):
+    """Online store which keeps the encoded features in process memory. It has the same semantics as the Redis online
+    store without any network round trip, so it can be used for integration tests and to benchmark the client side of
+    online reads.
+
+    Reads don't take any lock since they only do dict lookups, writes of a batch are serialized by a lock. Expired keys
+    and features are hidden from reads and removed by the next write of the same key.
+    """
+    def __init__(self):
+        # feature table -> key -> feature name -> encoded feature
+        self._tables: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        # (feature table, key, feature name) -> monotonic expire time, where the feature name is None for whole keys
+        self._expire_times: Dict[Tuple[str, str, Optional[str]], float] = {}
+        self._lock = threading.Lock()
+
+    def multi_get(self, feature_table: str, requests: List[Tuple[str, List[str]]]) -> List[List[Optional[bytes]]]:
+        table = self._tables.get(feature_table, {})
+        result = []
+        for key, feature_names in requests:
+            features = self._live_features(feature_table, key, table.get(key))
+            if features is None:
+                result.append([None] * len(feature_names))
+            else:
+                result.append([features.get(feature_name) for feature_name in feature_names])
+        return result
+
+    def multi_put(self, feature_table: str, rows: Dict[str, Dict[str, Any]]):
+        with self._lock:
+            table = self._tables.setdefault(feature_table, {})
+            for key, features in rows.items():
+                self._purge_expired(feature_table, key)
+                # same as HSET, writing a feature clears its own time to live
+                for feature_name in features:
+                    self._expire_times.pop((feature_table, key, feature_name), None)
+                # copy on write, so that concurrent reads never see a partially updated key
+                table[key] = {**table.get(key, {}), **features}
+
+    def delete(self, feature_table: str, keys: Optional[List[str]] = None, feature_names: Optional[List[str]] = None,
+               show_progress: bool = False) -> int:
+        with self._lock:
+            table = self._tables.get(feature_table, {})
+            for key in (list(table) if keys is None else keys):
+                self._purge_expired(feature_table, key)
+            keys = list(table) if keys is None else [key for key in keys if key in table]
+            if feature_names is None:
+                for key in keys:
+                    self._remove_key(feature_table, key)
+                return len(keys)
+            deleted = 0
+            for key in keys:
+                features = {feature_name: value for feature_name, value in table[key].items() if feature_name not in feature_names}
+                deleted += len(table[key]) - len(features)
+                for feature_name in feature_names:
+                    self._expire_times.pop((feature_table, key, feature_name), None)
+                if features:
+                    table[key] = features
+                else:
+                    # same as Redis, a hash without fields doesn't exist
+                    self._remove_key(feature_table, key)
+            return deleted
+
+    def expire(self, feature_table: str, ttl_sec: int, keys: Optional[List[str]] = None,
+               feature_names: Optional[List[str]] = None, show_progress: bool = False) -> int:
+        expire_time = time.monotonic() + ttl_sec
+        with self._lock:
+            table = self._tables.get(feature_table, {})
+            for key in (list(table) if keys is None else keys):
+                self._purge_expired(feature_table, key)
+            keys = list(table) if keys is None else [key for key in keys if key in table]
+            if feature_names is None:
+                for key in keys:
+                    self._expire_times[(feature_table, key, None)] = expire_time
+                return len(keys)
+            expired = 0
+            for key in keys:
+                for feature_name in feature_names:
+                    if feature_name in table[key]:
+                        self._expire_times[(feature_table, key, feature_name)] = expire_time
+                        expired += 1
+            return expired
+
+    def iter_rows(self, feature_table: str, keys: Optional[List[str]] = None) -> Iterator[Tuple[str, Dict[str, bytes]]]:
+        table = self._tables.get(feature_table, {})
+        for key in (list(table) if keys is None else keys):
+            features = self._live_features(feature_table, key, table.get(key))
+            if features:
+                yield key, features
+
+    def delete_table(self, feature_table: str):
+        """Removes all the keys of a feature table."""
+        with self._lock:
+            self._tables.pop(feature_table, None)
+            self._expire_times = {expire_key: expire_time for expire_key, expire_time in self._expire_times.items()
+                                  if expire_key[0] != feature_table}
+
+    def _live_features(self, feature_table: str, key: str, features: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Returns the features of a key without the expired ones, or None if the whole key has expired."""
+        if features is None or not self._expire_times:
+            return features
+        now = time.monotonic()
+        if self._expire_times.get((feature_table, key, None), now + 1) <= now:
+            return None
+        live_features = {feature_name: value for feature_name, value in features.items()
+                         if self._expire_times.get((feature_table, key, feature_name), now + 1) > now}
+        return features if len(live_features) == len(features) else live_features
+
+    def _purge_expired(self, feature_table: str, key: str):
+        """Removes the expired features of a key. Must be called with the lock held."""
+        table = self._tables.get(feature_table, {})
+        features = table.get(key)
+        live_features = self._live_features(feature_table, key, features)
+        if live_features is features:
+            return
+        if not live_features:
+            self._remove_key(feature_table, key)
+            return
+        for feature_name in features.keys() - live_features.keys():
+            del self._expire_times[(feature_table, key, feature_name)]
+        table[key] = live_features
+
+    def _remove_key(self, feature_table: str, key: str):
+        features = self._tables[feature_table].pop(key)
+        self._expire_times.pop((feature_table, key, None), None)
+        for feature_name in features:
+            self._expire_times.pop((feature_table, key, feature_name), None)
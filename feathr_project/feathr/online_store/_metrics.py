@@ -0,0 +1,168 @@
+import threading
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+# Upper bounds in milliseconds of the latency histogram buckets, the last bucket is unbounded
+DEFAULT_LATENCY_BUCKETS_MS: Tuple[float, ...] = (0.5, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, float("inf"))
+
+
+class OnlineReadEvent(NamedTuple):
+    """Measurements of one online read, i.e. one call of `get_online_features`, `multi_get_online_features` or their
+    async versions.
+
+    Attributes:
+        feature_table: the name of the feature table.
+        key_count: number of requested keys.
+        feature_count: number of requested features, i.e. keys times feature names.
+        cache_hits: number of features served from the online cache.
+        fetched_count: number of features fetched from the online store.
+        null_count: number of fetched features which are missing in the online store.
+        payload_bytes: size of the encoded features returned by the online store.
+        network_sec: time spent in the online store round trips.
+        decode_sec: time spent decoding the fetched features.
+        total_sec: total time of the read, including the online cache lookups.
+    """
+    feature_table: str
+    key_count: int
+    feature_count: int
+    cache_hits: int
+    fetched_count: int
+    null_count: int
+    payload_bytes: int
+    network_sec: float
+    decode_sec: float
+    total_sec: float
+
+
+class _Histogram(object):
+    def __init__(self, buckets_ms: Tuple[float, ...]):
+        self.buckets_ms = buckets_ms
+        self.counts = [0] * len(buckets_ms)
+        self.count = 0
+        self.sum_ms = 0.0
+
+    def observe(self, value_ms: float):
+        for i, upper_bound in enumerate(self.buckets_ms):
+            if value_ms <= upper_bound:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.sum_ms += value_ms
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimates the quantile by the upper bound of the bucket it falls into."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        for upper_bound, count in zip(self.buckets_ms, self.counts):
+            cumulative += count
+            if cumulative >= rank:
+                return upper_bound
+        return self.buckets_ms[-1]
+
+    def to_dict(self) -> Dict[str, Any]:
+        cumulative = 0
+        buckets = {}
+        for upper_bound, count in zip(self.buckets_ms, self.counts):
+            cumulative += count
+            buckets[str(upper_bound)] = cumulative
+        return {
+            "count": self.count,
+            "sum_ms": self.sum_ms,
+            "p50_ms": self.quantile(0.5),
+            "p99_ms": self.quantile(0.99),
+            "buckets": buckets,
+        }
+
+
+class _TableMetrics(object):
+    def __init__(self, buckets_ms: Tuple[float, ...]):
+        self.reads = 0
+        self.keys = 0
+        self.features = 0
+        self.cache_hits = 0
+        self.fetched = 0
+        self.nulls = 0
+        self.payload_bytes = 0
+        self.network = _Histogram(buckets_ms)
+        self.decode = _Histogram(buckets_ms)
+        self.total = _Histogram(buckets_ms)
+
+    def record(self, event: OnlineReadEvent):
+        self.reads += 1
+        self.keys += event.key_count
+        self.features += event.feature_count
+        self.cache_hits += event.cache_hits
+        self.fetched += event.fetched_count
+        self.nulls += event.null_count
+        self.payload_bytes += event.payload_bytes
+        if event.fetched_count:
+            self.network.observe(event.network_sec * 1000)
+            self.decode.observe(event.decode_sec * 1000)
+        self.total.observe(event.total_sec * 1000)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "reads": self.reads,
+            "keys": self.keys,
+            "features": self.features,
+            "cache_hits": self.cache_hits,
+            "fetched": self.fetched,
+            "nulls": self.nulls,
+            "null_rate": self.nulls / self.fetched if self.fetched else 0.0,
+            "payload_bytes": self.payload_bytes,
+            "avg_payload_bytes_per_key": self.payload_bytes / self.keys if self.keys else 0.0,
+            "network_latency": self.network.to_dict(),
+            "decode_latency": self.decode.to_dict(),
+            "total_latency": self.total.to_dict(),
+        }
+
+
+class OnlineReadMetrics(object):
+    """Aggregates `OnlineReadEvent`s per feature table, i.e. read/key/feature counters, null rate, payload size, and
+    latency histograms of the online store round trips, the decoding and the whole read. It can be registered by
+    `FeathrClient.add_online_read_listener`.
+
+    Attributes:
+        buckets_ms: upper bounds in milliseconds of the latency histogram buckets.
+    """
+    def __init__(self, buckets_ms: Tuple[float, ...] = DEFAULT_LATENCY_BUCKETS_MS):
+        self.buckets_ms = tuple(buckets_ms)
+        self._tables: Dict[str, _TableMetrics] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, event: OnlineReadEvent):
+        with self._lock:
+            table_metrics = self._tables.get(event.feature_table)
+            if table_metrics is None:
+                table_metrics = self._tables[event.feature_table] = _TableMetrics(self.buckets_ms)
+            table_metrics.record(event)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Returns the metrics of each feature table."""
+        with self._lock:
+            return {feature_table: table_metrics.to_dict() for feature_table, table_metrics in self._tables.items()}
+
+    def reset(self):
+        """Drops all the recorded metrics."""
+        with self._lock:
+            self._tables.clear()
+
+    def to_prometheus(self, prefix: str = "feathr_online_read") -> str:
+        """Returns the metrics in the Prometheus text exposition format, labeled by feature table."""
+        lines: List[str] = []
+        with self._lock:
+            for feature_table, table_metrics in sorted(self._tables.items()):
+                label = f'feature_table="{feature_table}"'
+                for name in ("reads", "keys", "features", "cache_hits", "fetched", "nulls", "payload_bytes"):
+                    lines.append(f"{prefix}_{name}_total{{{label}}} {getattr(table_metrics, name)}")
+                for name in ("network", "decode", "total"):
+                    histogram: _Histogram = getattr(table_metrics, name)
+                    cumulative = 0
+                    for upper_bound, count in zip(histogram.buckets_ms, histogram.counts):
+                        cumulative += count
+                        le = "+Inf" if upper_bound == float("inf") else str(upper_bound)
+                        lines.append(f'{prefix}_{name}_latency_ms_bucket{{{label},le="{le}"}} {cumulative}')
+                    lines.append(f"{prefix}_{name}_latency_ms_sum{{{label}}} {histogram.sum_ms}")
+                    lines.append(f"{prefix}_{name}_latency_ms_count{{{label}}} {histogram.count}")
+        return "\n".join(lines) + "\n" if lines else ""
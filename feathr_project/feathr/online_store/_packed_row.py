@@ -0,0 +1,72 @@
+from typing import Dict, List, Optional
+
+from feathr.utils._feature_value_decoder import _read_varint
+
+# Hash field which holds all the features of a key in the packed layout
+PACKED_FIELD = '__feathr_packed__'
+# Version byte of a packed row, so that the layout can evolve
+PACKED_ROW_VERSION = 0x03
+
+
+def _write_varint(value: int, out: bytearray):
+    while value >= 0x80:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def pack_row(features: Dict[str, bytes]) -> bytes:
+    """Packs the encoded features of a key into one value. It's the version byte followed by, for each feature, the
+    varint length and UTF-8 bytes of the feature name and the varint length and bytes of the encoded feature.
+    """
+    out = bytearray([PACKED_ROW_VERSION])
+    for feature_name, value in features.items():
+        if value is None:
+            continue
+        name = feature_name.encode('utf-8')
+        if isinstance(value, str):
+            value = value.encode('utf-8')
+        _write_varint(len(name), out)
+        out += name
+        _write_varint(len(value), out)
+        out += value
+    return bytes(out)
+
+
+def unpack_all(packed: bytes) -> Dict[str, bytes]:
+    """Returns all the encoded features of a packed row."""
+    if packed[0] != PACKED_ROW_VERSION:
+        raise ValueError(f"Unsupported packed row version {packed[0]}.")
+    result = {}
+    pos = 1
+    while pos < len(packed):
+        name_size, pos = _read_varint(packed, pos)
+        name = packed[pos:pos + name_size].decode('utf-8')
+        value_size, pos = _read_varint(packed, pos + name_size)
+        result[name] = packed[pos:pos + value_size]
+        pos += value_size
+    return result
+
+
+def unpack_row(packed: Optional[bytes], feature_names: List[str]) -> List[Optional[bytes]]:
+    """Selects the encoded features of a packed row, ordered by `feature_names`, where missing features are None."""
+    if not packed:
+        return [None] * len(feature_names)
+    if packed[0] != PACKED_ROW_VERSION:
+        raise ValueError(f"Unsupported packed row version {packed[0]}.")
+    wanted = {feature_name.encode('utf-8'): i for i, feature_name in enumerate(feature_names)}
+    result: List[Optional[bytes]] = [None] * len(feature_names)
+    remaining = len(wanted)
+    pos = 1
+    size = len(packed)
+    # names are compared as bytes, and values are only sliced for the selected features
+    while pos < size and remaining:
+        name_size, pos = _read_varint(packed, pos)
+        name = packed[pos:pos + name_size]
+        value_size, pos = _read_varint(packed, pos + name_size)
+        i = wanted.get(name)
+        if i is not None:
+            result[i] = packed[pos:pos + value_size]
+            remaining -= 1
+        pos += value_size
+    return result
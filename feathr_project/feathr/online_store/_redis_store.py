@@ -0,0 +1,253 @@
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from tqdm import tqdm
+
+from feathr.constants import REDIS_PIPELINE_CHUNK_SIZE, REDIS_PIPELINE_PARALLELISM
+from feathr.online_store._abc import OnlineStore
+from feathr.online_store._packed_row import PACKED_FIELD, pack_row, unpack_all, unpack_row
+
+
+class RedisOnlineStore(OnlineStore):
+    """Online store backed by Redis, where each key of a feature table is a Redis hash named `<feature table>:<key>`
+    with one field per feature.
+
+    Batches are split into Redis pipelines of `pipeline_chunk_size` keys, so that each pipeline has a bounded command
+    buffer and response. The pipelines are sent concurrently and merged back in the order of the requests.
+
+    Wide feature tables can be stored in the packed layout, where all the features of a key are packed into a single
+    hash field (see `pack_row`). Reads request that field along with the features in the same HMGET, so the layout of
+    each key is detected on read: if the packed field is set, the requested features are selected from it on the
+    client side, otherwise the feature fields are used.
+
+    Bulk deletion and expiration go through the same pipelines. The keys of a whole feature table are found by SCAN, which
+    covers all the primary nodes of a Redis Cluster. Single features of packed keys can't be deleted or expired, so
+    before deleting or expiring features, each chunk of keys is checked for the packed field, whatever the configured
+    layout.
+
+    Attributes:
+        redis_client: the Redis client, which can be a single node or a Redis Cluster client.
+        read_client: the Redis client of a read replica. Reads go to `redis_client` if None.
+        async_client_factory: function which creates the asyncio Redis client used by `amulti_get`. It's called
+            lazily so the connection pool is created in the event loop that uses it.
+        pipeline_chunk_size: number of keys per Redis pipeline.
+        pipeline_parallelism: maximum number of Redis pipelines in flight at the same time.
+        packed_feature_tables: names of the feature tables written in the packed layout by `multi_put`. Like the
+            Redis sink, a packed write replaces the whole packed row of a key.
+    """
+    # Redis key separator
+    _KEY_SEPARATOR = ':'
+    # characters which have a special meaning in SCAN MATCH patterns
+    _GLOB_SPECIAL_CHARS = '\\*?[]'
+
+    def __init__(self, redis_client, read_client=None, async_client_factory: Callable[[], Any] = None,
+                 pipeline_chunk_size: int = REDIS_PIPELINE_CHUNK_SIZE, pipeline_parallelism: int = REDIS_PIPELINE_PARALLELISM,
+                 packed_feature_tables: Optional[Iterable[str]] = None):
+        self.redis_client = redis_client
+        self.read_client = read_client
+        self.async_client_factory = async_client_factory
+        self.pipeline_chunk_size = pipeline_chunk_size
+        self.pipeline_parallelism = pipeline_parallelism
+        self.packed_feature_tables: Set[str] = set(packed_feature_tables or [])
+        self._async_client = None
+        # thread pool to send the pipelines, created on first use
+        self._executor = None
+
+    def multi_get(self, feature_table: str, requests: List[Tuple[str, List[str]]]) -> List[List[Optional[bytes]]]:
+        if len(requests) == 1:
+            key, feature_names = requests[0]
+            redis_key = self._construct_redis_key(feature_table, key)
+            return [self._select(self._get_read_client().hmget(redis_key, PACKED_FIELD, *feature_names), feature_names)]
+        chunks = self._split(requests)
+        if len(chunks) == 1:
+            return self._get_chunk(feature_table, chunks[0])
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.pipeline_parallelism, thread_name_prefix="feathr-online")
+        chunk_results = self._executor.map(lambda chunk: self._get_chunk(feature_table, chunk), chunks)
+        return [row for chunk_result in chunk_results for row in chunk_result]
+
+    async def amulti_get(self, feature_table: str, requests: List[Tuple[str, List[str]]]) -> List[List[Optional[bytes]]]:
+        if len(requests) == 1:
+            key, feature_names = requests[0]
+            redis_key = self._construct_redis_key(feature_table, key)
+            return [self._select(await self.get_async_client().hmget(redis_key, PACKED_FIELD, *feature_names), feature_names)]
+        semaphore = asyncio.Semaphore(max(self.pipeline_parallelism, 1))
+        chunk_results = await asyncio.gather(*[self._aget_chunk(feature_table, chunk, semaphore) for chunk in self._split(requests)])
+        return [row for chunk_result in chunk_results for row in chunk_result]
+
+    def multi_put(self, feature_table: str, rows: Dict[str, Dict[str, Any]]):
+        packed = feature_table in self.packed_feature_tables
+        for chunk in self._split(list(rows.items())):
+            with self.redis_client.pipeline(transaction=False) as redis_pipeline:
+                for key, features in chunk:
+                    redis_key = self._construct_redis_key(feature_table, key)
+                    if packed:
+                        # same as the Redis sink, the packed row is replaced as a whole, so each write is one HSET
+                        redis_pipeline.hset(redis_key, PACKED_FIELD, pack_row(features))
+                    else:
+                        redis_pipeline.hset(redis_key, mapping=features)
+                redis_pipeline.execute()
+
+    def delete(self, feature_table: str, keys: Optional[List[str]] = None, feature_names: Optional[List[str]] = None,
+               show_progress: bool = False) -> int:
+        """Deletes the keys by UNLINK, which frees the memory in the background, or only the given features by HDEL.
+
+        Raises:
+            ValueError: if `feature_names` are given and some of the keys are packed.
+        """
+        self._check_not_packed(feature_table, feature_names)
+        if feature_names is None:
+            def command(redis_pipeline, redis_key):
+                redis_pipeline.unlink(redis_key)
+        else:
+            def command(redis_pipeline, redis_key):
+                redis_pipeline.hdel(redis_key, *feature_names)
+        return self._run_bulk(feature_table, keys, command, sum, "Deleting", show_progress, check_packed=feature_names is not None)
+
+    def expire(self, feature_table: str, ttl_sec: int, keys: Optional[List[str]] = None,
+               feature_names: Optional[List[str]] = None, show_progress: bool = False) -> int:
+        """Sets the time to live of the keys by EXPIRE, or of the given features by HEXPIRE, which needs Redis 7.4 or
+        above.
+
+        Raises:
+            ValueError: if `feature_names` are given and some of the keys are packed.
+        """
+        self._check_not_packed(feature_table, feature_names)
+        if feature_names is None:
+            def command(redis_pipeline, redis_key):
+                redis_pipeline.expire(redis_key, ttl_sec)
+            count = sum
+        else:
+            def command(redis_pipeline, redis_key):
+                redis_pipeline.execute_command("HEXPIRE", redis_key, ttl_sec, "FIELDS", len(feature_names), *feature_names)
+            # HEXPIRE returns one code per field, 1 when the time to live is set and 2 when the field is deleted
+            # right away because of a zero time to live
+            def count(results):
+                return sum(1 for codes in results for code in (codes or []) if code in (1, 2))
+        return self._run_bulk(feature_table, keys, command, count, "Expiring", show_progress, check_packed=feature_names is not None)
+
+    def iter_rows(self, feature_table: str, keys: Optional[List[str]] = None) -> Iterator[Tuple[str, Dict[str, bytes]]]:
+        """Reads the keys by pipelined HGETALLs of `pipeline_chunk_size` keys, where the keys of a whole feature table
+        are found by SCAN. Keys in the packed layout are unpacked.
+        """
+        prefix_size = len(feature_table) + len(self._KEY_SEPARATOR)
+        if keys is None:
+            redis_keys = (redis_key.decode('utf-8') if isinstance(redis_key, bytes) else redis_key
+                          for redis_key in self._scan_redis_keys(feature_table))
+        else:
+            redis_keys = (self._construct_redis_key(feature_table, key) for key in keys)
+        while True:
+            chunk = list(islice(redis_keys, max(self.pipeline_chunk_size, 1)))
+            if not chunk:
+                return
+            with self._get_read_client().pipeline(transaction=False) as redis_pipeline:
+                for redis_key in chunk:
+                    redis_pipeline.hgetall(redis_key)
+                results = redis_pipeline.execute()
+            for redis_key, result in zip(chunk, results):
+                if not result:
+                    continue
+                features = {(name.decode('utf-8') if isinstance(name, bytes) else name): value for name, value in result.items()}
+                if PACKED_FIELD in features:
+                    features = unpack_all(features[PACKED_FIELD])
+                yield redis_key[prefix_size:], features
+
+    def get_async_client(self):
+        """Gets the asyncio Redis client, which is created on first use."""
+        if self._async_client is None:
+            if self.async_client_factory is None:
+                raise RuntimeError("Asyncio Redis client is not configured for this online store.")
+            self._async_client = self.async_client_factory()
+        return self._async_client
+
+    def _get_read_client(self):
+        return self.read_client or self.redis_client
+
+    def _construct_redis_key(self, feature_table: str, key: str) -> str:
+        return feature_table + self._KEY_SEPARATOR + key
+
+    def _check_not_packed(self, feature_table: str, feature_names: Optional[List[str]]):
+        if feature_names is not None and feature_table in self.packed_feature_tables:
+            raise ValueError(f"Features of {feature_table} are packed, so they can only be deleted or expired by whole keys.")
+
+    def _scan_redis_keys(self, feature_table: str) -> Iterator[str]:
+        pattern = ''.join('\\' + c if c in self._GLOB_SPECIAL_CHARS else c for c in feature_table)
+        return self.redis_client.scan_iter(match=pattern + self._KEY_SEPARATOR + '*', count=max(self.pipeline_chunk_size, 1))
+
+    def _run_bulk(self, feature_table: str, keys: Optional[Iterable[str]], command: Callable[[Any, str], None],
+                  count: Callable[[List[Any]], int], description: str, show_progress: bool, check_packed: bool = False) -> int:
+        if keys is None:
+            redis_keys = self._scan_redis_keys(feature_table)
+            total = None
+        else:
+            redis_keys = (self._construct_redis_key(feature_table, key) for key in keys)
+            total = len(keys) if hasattr(keys, '__len__') else None
+
+        def run_chunk(chunk: List[str]) -> int:
+            with self.redis_client.pipeline(transaction=False) as redis_pipeline:
+                if check_packed:
+                    # the commands on features would silently miss the features of packed keys
+                    for redis_key in chunk:
+                        redis_pipeline.hexists(redis_key, PACKED_FIELD)
+                    packed_keys = [redis_key for redis_key, exists in zip(chunk, redis_pipeline.execute()) if exists]
+                    if packed_keys:
+                        raise ValueError(f"Keys {', '.join(map(str, packed_keys[:3]))} of {feature_table} are packed, so their features can only be deleted or expired by whole keys.")
+                for redis_key in chunk:
+                    command(redis_pipeline, redis_key)
+                return count(redis_pipeline.execute())
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.pipeline_parallelism, thread_name_prefix="feathr-online")
+        chunk_size = max(self.pipeline_chunk_size, 1)
+        affected = 0
+        # bound the pipelines in flight, so that scanning a large feature table doesn't buffer all of its keys
+        in_flight = deque()
+        with tqdm(total=total, desc=f"{description} {feature_table}", unit="key", disable=not show_progress) as progress:
+            def wait_first():
+                chunk_len, future = in_flight.popleft()
+                progress.update(chunk_len)
+                return future.result()
+
+            while True:
+                chunk = list(islice(redis_keys, chunk_size))
+                if not chunk:
+                    break
+                in_flight.append((len(chunk), self._executor.submit(run_chunk, chunk)))
+                if len(in_flight) >= max(self.pipeline_parallelism, 1):
+                    affected += wait_first()
+            while in_flight:
+                affected += wait_first()
+        return affected
+
+    def _split(self, requests: List[Any]) -> List[List[Any]]:
+        chunk_size = max(self.pipeline_chunk_size, 1)
+        return [requests[i:i + chunk_size] for i in range(0, len(requests), chunk_size)]
+
+    def _get_chunk(self, feature_table: str, chunk: List[Tuple[str, List[str]]]) -> List[List[Optional[bytes]]]:
+        # no MULTI/EXEC is needed for reads, so the pipeline is not wrapped in a transaction
+        with self._get_read_client().pipeline(transaction=False) as redis_pipeline:
+            self._queue_gets(redis_pipeline, feature_table, chunk)
+            return self._project(chunk, redis_pipeline.execute())
+
+    async def _aget_chunk(self, feature_table: str, chunk: List[Tuple[str, List[str]]], semaphore: asyncio.Semaphore) -> List[List[Optional[bytes]]]:
+        async with semaphore:
+            async with self.get_async_client().pipeline(transaction=False) as redis_pipeline:
+                self._queue_gets(redis_pipeline, feature_table, chunk)
+                return self._project(chunk, await redis_pipeline.execute())
+
+    def _queue_gets(self, redis_pipeline, feature_table: str, chunk: List[Tuple[str, List[str]]]):
+        for key, feature_names in chunk:
+            redis_pipeline.hmget(self._construct_redis_key(feature_table, key), PACKED_FIELD, *feature_names)
+
+    def _project(self, chunk: List[Tuple[str, List[str]]], pipeline_result: List[Any]) -> List[List[Optional[bytes]]]:
+        return [self._select(values, feature_names) for (_, feature_names), values in zip(chunk, pipeline_result)]
+
+    @staticmethod
+    def _select(values: List[Optional[bytes]], feature_names: List[str]) -> List[Optional[bytes]]:
+        """Selects the requested features out of the result of an HMGET of the packed field and the features."""
+        if values[0]:
+            return unpack_row(values[0], feature_names)
+        return list(values[1:])
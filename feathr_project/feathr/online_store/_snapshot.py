@@ -0,0 +1,258 @@
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from feathr.online_store._abc import OnlineStore
+from feathr.online_store._packed_row import _write_varint, pack_row, unpack_row
+from feathr.utils._feature_value_decoder import _read_varint
+
+# Magic bytes at the start of a snapshot file, including the format version
+_SNAPSHOT_MAGIC = b'FTHRSNP\x01'
+# Trailer at the end of a snapshot file: offset and size of the key index
+_TRAILER = struct.Struct('<QQ')
+
+
+def write_snapshot(path: str, feature_table: str, rows: Iterable[Tuple[str, Dict[str, bytes]]],
+                   feature_names: Optional[List[str]] = None) -> int:
+    """Writes the encoded features of a feature table into a snapshot file, which can be served by `OnlineSnapshot`.
+
+    The file has a JSON header, the packed rows (see `pack_row`) and an index of the keys to their packed row. It's
+    written to a temporary file first and moved into place, so that readers never see a partial snapshot.
+
+    Args:
+        path: path of the snapshot file.
+        feature_table: the name of the feature table.
+        rows: (key, dict of feature name to the encoded feature) to write.
+        feature_names (optional): the features in the snapshot. Only these features are written if set, otherwise
+            all the features of each key are.
+
+    Returns:
+        int: number of keys written.
+    """
+    header = json.dumps({
+        "feature_table": feature_table,
+        "feature_names": feature_names,
+        "created_at": time.time(),
+    }).encode('utf-8')
+    index = bytearray()
+    count = 0
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(_SNAPSHOT_MAGIC)
+        f.write(struct.pack('<I', len(header)))
+        f.write(header)
+        offset = f.tell()
+        for key, features in rows:
+            if feature_names is not None:
+                features = {feature_name: features[feature_name] for feature_name in feature_names if features.get(feature_name) is not None}
+            packed = pack_row(features)
+            f.write(packed)
+            encoded_key = key.encode('utf-8')
+            _write_varint(len(encoded_key), index)
+            index += encoded_key
+            _write_varint(offset, index)
+            _write_varint(len(packed), index)
+            offset += len(packed)
+            count += 1
+        f.write(index)
+        f.write(_TRAILER.pack(offset, len(index)))
+    os.replace(tmp_path, path)
+    return count
+
+
+class OnlineSnapshot(object):
+    """Read-only snapshot of a feature table written by `write_snapshot`. The file is memory-mapped, so the packed rows
+    are paged in by the OS on demand and shared by the processes serving the same snapshot. Only the key index is
+    loaded into memory.
+
+    Attributes:
+        path: path of the snapshot file.
+        feature_table: the name of the feature table.
+        feature_names: the features in the snapshot, or None if it has all the features of each key.
+        created_at: time the snapshot was written, in seconds since the epoch.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"{path} is not a Feathr online snapshot.")
+        if self._mmap[:len(_SNAPSHOT_MAGIC)] != _SNAPSHOT_MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a Feathr online snapshot.")
+        pos = len(_SNAPSHOT_MAGIC)
+        (header_size,) = struct.unpack_from('<I', self._mmap, pos)
+        header = json.loads(self._mmap[pos + 4:pos + 4 + header_size].decode('utf-8'))
+        self.feature_table: str = header["feature_table"]
+        self.feature_names: Optional[List[str]] = header["feature_names"]
+        self.created_at: float = header["created_at"]
+        self._feature_name_set = None if self.feature_names is None else set(self.feature_names)
+
+        index_offset, index_size = _TRAILER.unpack_from(self._mmap, len(self._mmap) - _TRAILER.size)
+        index = self._mmap[index_offset:index_offset + index_size]
+        self._index: Dict[str, Tuple[int, int]] = {}
+        pos = 0
+        while pos < index_size:
+            key_size, pos = _read_varint(index, pos)
+            key = index[pos:pos + key_size].decode('utf-8')
+            offset, pos = _read_varint(index, pos + key_size)
+            size, pos = _read_varint(index, pos)
+            self._index[key] = (offset, size)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._index
+
+    def covers(self, feature_names: List[str]) -> bool:
+        """Whether the snapshot has all the given features."""
+        return self._feature_name_set is None or self._feature_name_set.issuperset(feature_names)
+
+    def get(self, key: str, feature_names: List[str]) -> Optional[List[Optional[bytes]]]:
+        """Gets the encoded features of a key, ordered by `feature_names`. Returns None if the key is not in the
+        snapshot.
+        """
+        location = self._index.get(key)
+        if location is None:
+            return None
+        offset, size = location
+        return unpack_row(self._mmap[offset:offset + size], feature_names)
+
+    def close(self):
+        self._mmap.close()
+        self._file.close()
+
+
+class SnapshotOnlineStore(OnlineStore):
+    """Online store which serves online reads from local snapshots first, and falls back to another online store for
+    the keys and features which are not in the snapshots. It's meant to warm start serving processes with the hot keys
+    of their feature tables, so that they don't send a burst of lookups to the online store right after a deploy.
+
+    Snapshots are point in time copies. Keys written, deleted or expired through this online store are read from the
+    underlying online store afterwards, but changes made by other writers, e.g. materialization jobs, are not seen
+    until a new snapshot is loaded.
+
+    Attributes:
+        online_store: the underlying online store.
+    """
+    def __init__(self, online_store: OnlineStore, snapshots: Optional[List[OnlineSnapshot]] = None):
+        self.online_store = online_store
+        self._snapshots: Dict[str, OnlineSnapshot] = {}
+        # keys changed since the snapshots were loaded, per feature table
+        self._stale_keys: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        for snapshot in snapshots or []:
+            self.add_snapshot(snapshot)
+
+    def add_snapshot(self, snapshot: OnlineSnapshot):
+        """Serves the feature table of the snapshot from it, replacing the previous snapshot of the feature table.
+
+        A replaced snapshot is not closed, since concurrent lookups may still read it. Its file is unmapped once it's
+        no longer referenced.
+        """
+        with self._lock:
+            self._snapshots[snapshot.feature_table] = snapshot
+            self._stale_keys[snapshot.feature_table] = set()
+
+    def remove_snapshot(self, feature_table: str):
+        """Stops serving the feature table from its snapshot, if any."""
+        with self._lock:
+            self._snapshots.pop(feature_table, None)
+            self._stale_keys.pop(feature_table, None)
+
+    def snapshots(self) -> List[OnlineSnapshot]:
+        """Returns the loaded snapshots."""
+        with self._lock:
+            return list(self._snapshots.values())
+
+    def close(self):
+        """Closes all the snapshots. It must not be called while lookups are in flight."""
+        with self._lock:
+            snapshots = list(self._snapshots.values())
+            self._snapshots.clear()
+            self._stale_keys.clear()
+        for snapshot in snapshots:
+            snapshot.close()
+
+    def multi_get(self, feature_table: str, requests: List[Tuple[str, List[str]]]) -> List[List[Optional[bytes]]]:
+        result, missing = self._get_from_snapshot(feature_table, requests)
+        if missing:
+            rows = self.online_store.multi_get(feature_table, [requests[i] for i in missing])
+            for i, row in zip(missing, rows):
+                result[i] = row
+        return result
+
+    async def amulti_get(self, feature_table: str, requests: List[Tuple[str, List[str]]]) -> List[List[Optional[bytes]]]:
+        result, missing = self._get_from_snapshot(feature_table, requests)
+        if missing:
+            rows = await self.online_store.amulti_get(feature_table, [requests[i] for i in missing])
+            for i, row in zip(missing, rows):
+                result[i] = row
+        return result
+
+    def multi_put(self, feature_table: str, rows: Dict[str, Dict[str, Any]]):
+        self.online_store.multi_put(feature_table, rows)
+        self._mark_stale(feature_table, rows.keys())
+
+    def delete(self, feature_table: str, keys: Optional[List[str]] = None, feature_names: Optional[List[str]] = None,
+               show_progress: bool = False) -> int:
+        deleted = self.online_store.delete(feature_table, keys, feature_names, show_progress)
+        if keys is None:
+            self.remove_snapshot(feature_table)
+        else:
+            self._mark_stale(feature_table, keys)
+        return deleted
+
+    def expire(self, feature_table: str, ttl_sec: int, keys: Optional[List[str]] = None,
+               feature_names: Optional[List[str]] = None, show_progress: bool = False) -> int:
+        expired = self.online_store.expire(feature_table, ttl_sec, keys, feature_names, show_progress)
+        if keys is None:
+            self.remove_snapshot(feature_table)
+        else:
+            self._mark_stale(feature_table, keys)
+        return expired
+
+    def iter_rows(self, feature_table: str, keys: Optional[List[str]] = None) -> Iterator[Tuple[str, Dict[str, bytes]]]:
+        return self.online_store.iter_rows(feature_table, keys)
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the number of lookups served from the snapshots, and the number sent to the underlying online
+        store.
+        """
+        with self._lock:
+            return {"hits": self._hits, "misses": self._misses}
+
+    def _mark_stale(self, feature_table: str, keys: Iterable[str]):
+        with self._lock:
+            stale_keys = self._stale_keys.get(feature_table)
+            if stale_keys is not None:
+                stale_keys.update(keys)
+
+    def _get_from_snapshot(self, feature_table: str, requests: List[Tuple[str, List[str]]]) -> Tuple[List[Any], List[int]]:
+        snapshot = self._snapshots.get(feature_table)
+        if snapshot is None:
+            return [None] * len(requests), list(range(len(requests)))
+        stale_keys = self._stale_keys.get(feature_table, ())
+        result: List[Any] = [None] * len(requests)
+        missing = []
+        for i, (key, feature_names) in enumerate(requests):
+            row = None
+            if key not in stale_keys and snapshot.covers(feature_names):
+                row = snapshot.get(key, feature_names)
+            if row is None:
+                missing.append(i)
+            else:
+                result[i] = row
+        with self._lock:
+            self._hits += len(requests) - len(missing)
+            self._misses += len(missing)
+        return result, missing
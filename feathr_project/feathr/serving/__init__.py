@@ -0,0 +1,7 @@
+from feathr.serving._http_server import OnlineFeatureServer, OnlineServingMetrics, serve
+
+__all__ = [
+    'OnlineFeatureServer',
+    'OnlineServingMetrics',
+    'serve',
+]
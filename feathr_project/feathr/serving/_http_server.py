@@ -0,0 +1,169 @@
+import base64
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import math
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from feathr.client import FeathrClient
+
+# Number of most recent requests the latency percentiles are computed from
+DEFAULT_METRICS_WINDOW = 10000
+
+
+def _to_json_value(value: Any) -> Any:
+    """Converts a decoded feature value to a JSON serializable value. Dense arrays become lists, sparse arrays lists of
+    index list and value list, and bytes base64 strings. NaN and infinite floats, which JSON can't represent, become
+    null.
+    """
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, bytes):
+        return base64.b64encode(value).decode()
+    return [_to_json_value(v) for v in value]
+
+
+class OnlineServingMetrics(object):
+    """Request counters and latency percentiles of the online serving process. Percentiles are computed over the
+    latencies of the most recent requests.
+    """
+    def __init__(self, window: int = DEFAULT_METRICS_WINDOW):
+        self._latencies: deque = deque(maxlen=window)
+        self._requests = 0
+        self._errors = 0
+        self._keys = 0
+        self._lock = threading.Lock()
+
+    def record(self, latency_sec: float, key_count: int = 0, error: bool = False):
+        with self._lock:
+            self._latencies.append(latency_sec)
+            self._requests += 1
+            self._keys += key_count
+            if error:
+                self._errors += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            latencies = sorted(self._latencies)
+            requests, errors, keys = self._requests, self._errors, self._keys
+
+        def percentile(p: float) -> Optional[float]:
+            if not latencies:
+                return None
+            return latencies[min(int(p * len(latencies)), len(latencies) - 1)] * 1000
+
+        return {
+            "requests": requests,
+            "errors": errors,
+            "keys": keys,
+            "latency_ms": {"p50": percentile(0.5), "p99": percentile(0.99)},
+        }
+
+
+class _OnlineFeatureRequestHandler(BaseHTTPRequestHandler):
+    server: "OnlineFeatureServer"
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok"})
+        elif self.path == "/metrics":
+            self._send_json(200, {**self.server.metrics.snapshot(), "tables": self.server.read_metrics.snapshot()})
+        else:
+            self._send_json(404, {"error": f"{self.path} is not found"})
+
+    def do_POST(self):
+        if self.path != "/v1/online_features":
+            self._send_json(404, {"error": f"{self.path} is not found"})
+            return
+        start = time.perf_counter()
+        key_count = 0
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            feature_table, keys, feature_names = self._parse_request(request)
+            key_count = len(keys)
+            result = self.server.client.multi_get_online_features(feature_table, keys, feature_names)
+        except ValueError as e:
+            self.server.metrics.record(time.perf_counter() - start, key_count, error=True)
+            self._send_json(400, {"error": str(e)})
+            return
+        except Exception as e:
+            logger.exception("Fail to read online features.")
+            self.server.metrics.record(time.perf_counter() - start, key_count, error=True)
+            self._send_json(500, {"error": str(e)})
+            return
+        features = {key: [_to_json_value(value) for value in values] for key, values in result.items()}
+        self.server.metrics.record(time.perf_counter() - start, key_count)
+        self._send_json(200, {"features": features})
+
+    def _parse_request(self, request: Dict[str, Any]) -> Tuple[str, List[Any], List[str]]:
+        for field in ("feature_table", "keys", "feature_names"):
+            if field not in request:
+                raise ValueError(f"{field} is required in the request.")
+        if not isinstance(request["feature_table"], str):
+            raise ValueError("feature_table should be a string.")
+        if not isinstance(request["keys"], list) or not isinstance(request["feature_names"], list):
+            raise ValueError("keys and feature_names should be lists.")
+        if not all(isinstance(feature_name, str) for feature_name in request["feature_names"]):
+            raise ValueError("feature_names should be strings.")
+        for key in request["keys"]:
+            if not isinstance(key, str) and not (isinstance(key, list) and key and all(isinstance(part, str) for part in key)):
+                raise ValueError(f"Invalid key {json.dumps(key)}, keys should be strings, or non-empty lists of strings for composite keys.")
+        # composite keys are lists, which should be consistent with the order in the feature definition
+        return request["feature_table"], request["keys"], request["feature_names"]
+
+    def _send_json(self, status: int, body: Dict[str, Any]):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format: str, *args):
+        logger.debug(format % args)
+
+
+class OnlineFeatureServer(ThreadingHTTPServer):
+    """Standalone HTTP server for batched online feature reads, so that many thin callers can share one client with
+    pooled online store connections.
+
+    Endpoints:
+        POST /v1/online_features: body `{"feature_table": ..., "keys": [...], "feature_names": [...]}`, returns
+            `{"features": {key: [values]}}` as `multi_get_online_features` does.
+        GET /metrics: request and error counters, and p50/p99 latency in milliseconds, along with the online read
+            metrics per feature table (see `OnlineReadMetrics`).
+        GET /health: liveness check.
+
+    Attributes:
+        client: the Feathr client to read online features from.
+        metrics: the request metrics of the server.
+        read_metrics: the online read metrics of the client per feature table.
+    """
+    daemon_threads = True
+
+    def __init__(self, client: FeathrClient, host: str = "0.0.0.0", port: int = 8000, metrics_window: int = DEFAULT_METRICS_WINDOW):
+        super().__init__((host, port), _OnlineFeatureRequestHandler)
+        self.client = client
+        self.metrics = OnlineServingMetrics(metrics_window)
+        self.read_metrics = client.add_online_read_listener()
+
+
+def serve(config_path: str = "./feathr_config.yaml", host: str = "0.0.0.0", port: int = 8000):
+    """Starts the online feature server with the online store of the given Feathr config, and blocks until it's
+    interrupted.
+    """
+    server = OnlineFeatureServer(FeathrClient(config_path=config_path), host=host, port=port)
+    logger.info(f"Feathr online feature server is listening on {host}:{server.server_address[1]}.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -30,6 +30,9 @@ class SparkJobLauncher(ABC):
             job_tags (str): tags of the job, for example you might want to put your user ID, or a tag with a certain information
             configuration (Dict[str, str]): Additional configs for the spark job
             properties (Dict[str, str]): Additional System Properties for the spark job
+
+        Returns:
+            SparkJobHandle: handle of the submitted job, to track it along with the other submitted jobs
         """
         pass
 
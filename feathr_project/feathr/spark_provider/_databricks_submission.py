@@ -1,3 +1,4 @@
+from base64 import b64decode
 from collections import namedtuple
 import copy
 import json
@@ -9,7 +10,7 @@ from typing import Dict, List, Optional, Union
 from urllib.parse import urlparse
 from urllib.request import urlopen
 
-from databricks_cli.dbfs.api import DbfsApi
+from databricks_cli.dbfs.api import BUFFER_SIZE_BYTES, DbfsApi, FileInfo
 from databricks_cli.runs.api import RunsApi
 from databricks_cli.dbfs.dbfs_path import DbfsPath
 from databricks_cli.sdk.api_client import ApiClient
@@ -20,6 +21,86 @@ from requests.structures import CaseInsensitiveDict
 from feathr.constants import *
 from feathr.version import get_maven_artifact_fullname
 from feathr.spark_provider._abc import SparkJobLauncher
+from feathr.spark_provider._job_handle import SparkJobHandle
+from feathr.spark_provider._result_downloader import _RemoteFile, download_files
+
+
+class _DbfsFile(_RemoteFile):
+    """Result file in DBFS. DBFS doesn't keep checksums, so downloaded files are compared by size and modification
+    time only.
+    """
+    def __init__(self, local_path: str, dbfs_api: DbfsApi, file_info: FileInfo):
+        super().__init__(local_path)
+        self.dbfs_api = dbfs_api
+        self.file_info = file_info
+
+    def stat(self):
+        modification_time = self.file_info.modification_time
+        return self.file_info.file_size, None, modification_time / 1000 if modification_time is not None else None
+
+    def write_to(self, f):
+        offset = 0
+        while offset < self.file_info.file_size:
+            response = self.dbfs_api.client.read(self.file_info.dbfs_path.absolute_path, offset, BUFFER_SIZE_BYTES)
+            if response["bytes_read"] == 0:
+                raise RuntimeError(f"{self.file_info.dbfs_path.absolute_path} is truncated at {offset} bytes.")
+            offset += response["bytes_read"]
+            f.write(b64decode(response["data"]))
+
+
+class _DatabricksJobHandle(SparkJobHandle):
+    """Handle of a Databricks job run. Its status is the result state of the run, or its life cycle state until the
+    run is finished.
+    """
+    def __init__(self, api_client: ApiClient, run_id: int, job_name: str = None, job_url: str = None):
+        super().__init__(run_id, job_name)
+        self.api_client = api_client
+        self.job_url = job_url
+
+    def get_status(self) -> str:
+        result = RunsApi(self.api_client).get_run(self.job_id)
+        # first try to get result state. it might not be available, and if that's the case, try to get life_cycle_state
+        # see result structure: https://docs.microsoft.com/en-us/azure/databricks/dev-tools/api/2.0/jobs#--response-structure-6
+        res_state = result["state"].get(
+            "result_state") or result["state"]["life_cycle_state"]
+        assert res_state is not None
+        return res_state
+
+    def get_job_tags(self) -> Dict[str, str]:
+        # For result structure, see https://docs.microsoft.com/en-us/azure/databricks/dev-tools/api/2.0/jobs#--response-structure-6
+        result = RunsApi(self.api_client).get_run(self.job_id)
+
+        if "new_cluster" in result["cluster_spec"]:
+            custom_tags = result["cluster_spec"]["new_cluster"].get(
+                "custom_tags")
+            return custom_tags
+        else:
+            # this is not a new cluster; it's an existing cluster.
+            logger.warning(
+                "Job tags are not available since you are using an existing Databricks cluster. Consider using 'new_cluster' in databricks configuration."
+            )
+            return None
+
+    def _poll(self) -> Optional[bool]:
+        status = self.get_status()
+        logger.debug("Current Spark job status: {}", status)
+        # see all the status here:
+        # https://docs.microsoft.com/en-us/azure/databricks/dev-tools/api/2.0/jobs#--runlifecyclestate
+        # https://docs.microsoft.com/en-us/azure/databricks/dev-tools/api/2.0/jobs#--runresultstate
+        if status in {"SUCCESS"}:
+            return True
+        elif status in {"INTERNAL_ERROR", "FAILED", "TIMEDOUT", "CANCELED"}:
+            result = RunsApi(self.api_client).get_run_output(self.job_id)
+            # See here for the returned fields: https://docs.microsoft.com/en-us/azure/databricks/dev-tools/api/2.0/jobs#--response-structure-8
+            # print out logs and stack trace if the job has failed
+            logger.error(
+                "Feathr job has failed. Please visit this page to view error message: {}", self.job_url)
+            if "error" in result:
+                logger.error("Error Code: {}", result["error"])
+            if "error_trace" in result:
+                logger.error("{}", result["error_trace"])
+            return False
+        return None
 
 
 class _FeathrDatabricksJobLauncher(SparkJobLauncher):
@@ -162,7 +243,7 @@ class _FeathrDatabricksJobLauncher(SparkJobLauncher):
         job_tags: Dict[str, str] = None,
         configuration: Dict[str, str] = {},
         properties: Dict[str, str] = {},
-    ):
+    ) -> SparkJobHandle:
         """
         submit the feathr job to databricks
         Refer to the databricks doc for more details on the meaning of the parameters:
@@ -174,6 +255,9 @@ class _FeathrDatabricksJobLauncher(SparkJobLauncher):
             job_tags (str): tags of the job, for example you might want to put your user ID, or a tag with a certain information
             configuration (Dict[str, str]): Additional configs for the spark job
             properties (Dict[str, str]): Additional System Properties for the spark job
+
+        Returns:
+            SparkJobHandle: handle of the submitted job
         """
 
         if properties:
@@ -259,58 +343,31 @@ class _FeathrDatabricksJobLauncher(SparkJobLauncher):
 
         try:
             # see if we can parse the returned result
-            self.res_job_id = result["run_id"]
+            run_id = result["run_id"]
         except:
             logger.error(
                 "Submitting Feathr job to Databricks cluster failed. Message returned from Databricks: {}", result
             )
             exit(1)
 
-        result = RunsApi(self.api_client).get_run(self.res_job_id)
-        self.job_url = result["run_page_url"]
+        result = RunsApi(self.api_client).get_run(run_id)
+        job_url = result["run_page_url"]
         logger.info(
-            "Feathr job Submitted Successfully. View more details here: {}", self.job_url)
+            "Feathr job Submitted Successfully. View more details here: {}", job_url)
 
-        # return ID as the submission result
-        return self.res_job_id
+        # the latest job is tracked by the launcher, and other jobs may be submitted concurrently
+        self.res_job_id, self.job_url = run_id, job_url
+        return _DatabricksJobHandle(self.api_client, run_id, job_name, job_url)
 
     def wait_for_completion(self, timeout_seconds: Optional[int] = 600) -> bool:
         """Returns true if the job completed successfully"""
-        start_time = time.time()
-        while (timeout_seconds is None) or (time.time() - start_time < timeout_seconds):
-            status = self.get_status()
-            logger.debug("Current Spark job status: {}", status)
-            # see all the status here:
-            # https://docs.microsoft.com/en-us/azure/databricks/dev-tools/api/2.0/jobs#--runlifecyclestate
-            # https://docs.microsoft.com/en-us/azure/databricks/dev-tools/api/2.0/jobs#--runresultstate
-            if status in {"SUCCESS"}:
-                return True
-            elif status in {"INTERNAL_ERROR", "FAILED", "TIMEDOUT", "CANCELED"}:
-                result = RunsApi(self.api_client).get_run_output(
-                    self.res_job_id)
-                # See here for the returned fields: https://docs.microsoft.com/en-us/azure/databricks/dev-tools/api/2.0/jobs#--response-structure-8
-                # print out logs and stack trace if the job has failed
-                logger.error(
-                    "Feathr job has failed. Please visit this page to view error message: {}", self.job_url)
-                if "error" in result:
-                    logger.error("Error Code: {}", result["error"])
-                if "error_trace" in result:
-                    logger.error("{}", result["error_trace"])
-                return False
-            else:
-                time.sleep(30)
-        else:
+        try:
+            return self._current_job().wait(timeout_seconds)
+        except TimeoutError:
             raise TimeoutError("Timeout waiting for Feathr job to complete")
 
     def get_status(self) -> str:
-        assert self.res_job_id is not None
-        result = RunsApi(self.api_client).get_run(self.res_job_id)
-        # first try to get result state. it might not be available, and if that's the case, try to get life_cycle_state
-        # see result structure: https://docs.microsoft.com/en-us/azure/databricks/dev-tools/api/2.0/jobs#--response-structure-6
-        res_state = result["state"].get(
-            "result_state") or result["state"]["life_cycle_state"]
-        assert res_state is not None
-        return res_state
+        return self._current_job().get_status()
 
     def get_job_result_uri(self) -> str:
         """Get job output uri
@@ -318,9 +375,7 @@ class _FeathrDatabricksJobLauncher(SparkJobLauncher):
         Returns:
             str: `output_path` field in the job tags
         """
-        custom_tags = self.get_job_tags()
-        # in case users call this API even when there's no tags available
-        return None if custom_tags is None else custom_tags[OUTPUT_PATH_TAG]
+        return self._current_job().get_job_result_uri()
 
     def get_job_tags(self) -> Dict[str, str]:
         """Get job tags
@@ -328,32 +383,45 @@ class _FeathrDatabricksJobLauncher(SparkJobLauncher):
         Returns:
             Dict[str, str]: a dict of job tags
         """
-        assert self.res_job_id is not None
-        # For result structure, see https://docs.microsoft.com/en-us/azure/databricks/dev-tools/api/2.0/jobs#--response-structure-6
-        result = RunsApi(self.api_client).get_run(self.res_job_id)
+        return self._current_job().get_job_tags()
 
-        if "new_cluster" in result["cluster_spec"]:
-            custom_tags = result["cluster_spec"]["new_cluster"].get(
-                "custom_tags")
-            return custom_tags
-        else:
-            # this is not a new cluster; it's an existing cluster.
-            logger.warning(
-                "Job tags are not available since you are using an existing Databricks cluster. Consider using 'new_cluster' in databricks configuration."
-            )
-            return None
+    def _current_job(self) -> "_DatabricksJobHandle":
+        assert self.res_job_id is not None
+        return _DatabricksJobHandle(self.api_client, self.res_job_id, job_url=getattr(self, "job_url", None))
 
-    def download_result(self, result_path: str, local_folder: str, is_file_path: bool = False):
+    def download_result(self, result_path: str, local_folder: str, is_file_path: bool = False, prune: bool = False):
         """
-        Supports downloading files from the result folder. Only support paths starts with `dbfs:/` and only support downloading files in one folder (per Spark's design, everything will be in the result folder in a flat manner)
+        Supports downloading files from the result folder. Only support paths starts with `dbfs:/`. If `prune` is True, the files in the local folder which are not in the result are removed.
         """
         if not result_path.startswith("dbfs"):
             raise RuntimeError(
                 'Currently only paths starting with dbfs is supported for downloading results from a databricks cluster. The path should start with "dbfs:" .'
             )
 
-        recursive = True if not is_file_path else False
-        DbfsApi(self.api_client).cp(recursive=recursive, overwrite=True, src=result_path, dst=local_folder)
+        dbfs_api = DbfsApi(self.api_client)
+        src = DbfsPath(result_path)
+        if is_file_path:
+            file_info = dbfs_api.get_status(src)
+            dst = os.path.join(local_folder, src.basename) if os.path.isdir(local_folder) else local_folder
+            files = [_DbfsFile(dst, dbfs_api, file_info)]
+        else:
+            files = [
+                _DbfsFile(os.path.join(local_folder, file_info.dbfs_path.relpath(src)), dbfs_api, file_info)
+                for file_info in self._list_dbfs_files(dbfs_api, src)
+            ]
+        download_files(files, prune_dir=local_folder if prune else None)
+
+    def _list_dbfs_files(self, dbfs_api: DbfsApi, dbfs_path: DbfsPath) -> List[FileInfo]:
+        """
+        Lists the files under a DBFS folder and its sub folders
+        """
+        files = []
+        for file_info in dbfs_api.list_files(dbfs_path):
+            if file_info.is_dir:
+                files.extend(self._list_dbfs_files(dbfs_api, file_info.dbfs_path))
+            else:
+                files.append(file_info)
+        return files
         
     def cloud_dir_exists(self, dir_path: str):
         """
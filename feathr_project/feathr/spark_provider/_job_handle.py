@@ -0,0 +1,130 @@
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from loguru import logger
+
+from feathr.constants import OUTPUT_PATH_TAG
+
+# Maximum number of job statuses requested concurrently by `as_completed`
+_MAX_POLL_WORKERS = 16
+
+
+class SparkJobHandle(ABC):
+    """Handle of a submitted Spark job, returned by `submit_feathr_job` of the Spark launchers.
+
+    A launcher only tracks its latest job, while each handle tracks its own job, so several jobs, e.g. the jobs of a
+    backfill, can be monitored together with `wait_all` and `as_completed`.
+
+    Attributes:
+        job_id: ID of the job in the Spark platform.
+        job_name: name of the job.
+    """
+    # seconds between two status checks of the job
+    poll_interval_sec: float = 30
+
+    def __init__(self, job_id: Any, job_name: str = None):
+        self.job_id = job_id
+        self.job_name = job_name
+        self._result: Optional[bool] = None
+
+    @abstractmethod
+    def get_status(self) -> str:
+        """Returns the current status of the job, as reported by the Spark platform."""
+        pass
+
+    @abstractmethod
+    def get_job_tags(self) -> Optional[Dict[str, str]]:
+        """Returns the tags of the job."""
+        pass
+
+    @abstractmethod
+    def _poll(self) -> Optional[bool]:
+        """Checks the status of the job once. Returns None if it's still running, otherwise whether it succeeded."""
+        pass
+
+    def poll(self) -> Optional[bool]:
+        """Returns None if the job is still running, otherwise whether it succeeded. Once the job is finished, its
+        status is not requested anymore.
+        """
+        if self._result is None:
+            self._result = self._poll()
+        return self._result
+
+    def done(self) -> bool:
+        """Whether the job is finished."""
+        return self.poll() is not None
+
+    def wait(self, timeout_seconds: Optional[float] = None) -> bool:
+        """Waits for the job to finish. Returns True if it succeeded, otherwise False.
+
+        Raises:
+            TimeoutError: if the job is not finished after `timeout_seconds`.
+        """
+        return wait_all([self], timeout_seconds)[0]
+
+    def get_job_result_uri(self) -> Optional[str]:
+        """Returns the `output_path` field in the job tags."""
+        tags = self.get_job_tags()
+        return None if tags is None else tags.get(OUTPUT_PATH_TAG)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(job_id={self.job_id!r}, job_name={self.job_name!r})"
+
+
+def as_completed(jobs: Iterable[SparkJobHandle], timeout_seconds: Optional[float] = None) -> Iterator[SparkJobHandle]:
+    """Yields the jobs as they finish, successfully or not.
+
+    The statuses of all the unfinished jobs are requested concurrently, every `poll_interval_sec` of the job which
+    is checked most often.
+
+    Args:
+        jobs: handles of the jobs.
+        timeout_seconds (optional): maximum time to wait for all the jobs. Default to wait without a time limit.
+
+    Raises:
+        TimeoutError: if some jobs are not finished after `timeout_seconds`.
+    """
+    pending = list(jobs)
+    if not pending:
+        return
+    start_time = time.time()
+    poll_interval_sec = min(job.poll_interval_sec for job in pending)
+    with ThreadPoolExecutor(max_workers=min(len(pending), _MAX_POLL_WORKERS)) as executor:
+        while True:
+            results = list(executor.map(lambda job: job.poll(), pending))
+            running = []
+            for job, result in zip(pending, results):
+                if result is None:
+                    running.append(job)
+                else:
+                    yield job
+            pending = running
+            if not pending:
+                return
+            elapsed = time.time() - start_time
+            if timeout_seconds is not None and elapsed >= timeout_seconds:
+                raise TimeoutError(f"Timeout waiting for {len(pending)} Feathr job(s) to complete: {pending}")
+            sleep_sec = poll_interval_sec if timeout_seconds is None else min(poll_interval_sec, timeout_seconds - elapsed)
+            time.sleep(sleep_sec)
+
+
+def wait_all(jobs: Iterable[SparkJobHandle], timeout_seconds: Optional[float] = None) -> List[bool]:
+    """Waits for all the jobs to finish, checking them concurrently.
+
+    Args:
+        jobs: handles of the jobs.
+        timeout_seconds (optional): maximum time to wait for all the jobs. Default to wait without a time limit.
+
+    Returns:
+        List[bool]: whether each job succeeded, in the order of `jobs`.
+
+    Raises:
+        TimeoutError: if some jobs are not finished after `timeout_seconds`.
+    """
+    jobs = list(jobs)
+    for job in as_completed(jobs, timeout_seconds):
+        if not job.poll():
+            logger.error("Feathr job {} has failed.", job)
+    return [job.poll() for job in jobs]
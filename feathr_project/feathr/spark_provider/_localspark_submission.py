@@ -4,16 +4,137 @@ import json
 import os
 from pathlib import Path
 from shlex import split
-from subprocess import STDOUT, Popen
+from subprocess import STDOUT, Popen, TimeoutExpired
+import threading
 import time
-from typing import Any, Dict, List, Optional
+from typing import Callable, Dict, List, NamedTuple, Optional
 
 from loguru import logger
 from pyspark import *
 
-from feathr.constants import OUTPUT_PATH_TAG
+from feathr.constants import LOCAL_SPARK_POLL_INTERVAL_SEC, OUTPUT_PATH_TAG
 from feathr.version import get_maven_artifact_fullname
 from feathr.spark_provider._abc import SparkJobLauncher
+from feathr.spark_provider._job_handle import SparkJobHandle
+
+
+class LocalSparkJobProgress(NamedTuple):
+    """Progress of a local Spark job.
+
+    Attributes:
+        pid: process ID of the job.
+        elapsed_sec: seconds since the job was submitted.
+        log_lines: number of lines logged by the job so far.
+        last_line: the latest line logged by the job.
+    """
+    pid: int
+    elapsed_sec: float
+    log_lines: int
+    last_line: Optional[str]
+
+
+class _LogTailer(object):
+    """Follows a log file which is being written. Each call reads only what was appended since the previous one."""
+    def __init__(self, path: str):
+        self.path = path
+        self.num_lines = 0
+        self.last_line: Optional[str] = None
+        self._file = None
+        # the last line until it's terminated by a newline
+        self._partial = ""
+
+    def read_lines(self) -> List[str]:
+        """Returns the complete lines appended since the last call."""
+        if self._file is None:
+            if not os.path.exists(self.path):
+                return []
+            self._file = open(self.path, "r")
+        data = self._file.read()
+        if not data:
+            return []
+        lines = (self._partial + data).split("\n")
+        self._partial = lines.pop()
+        if lines:
+            self.num_lines += len(lines)
+            self.last_line = lines[-1]
+        return lines
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+class _LocalSparkJobHandle(SparkJobHandle):
+    """Handle of a local Spark job. Its status is the return code of the spark-submit process, or None if it's
+    still running.
+
+    The log of the job is followed from the last read offset, so each line is read only once.
+
+    Attributes:
+        progress_callback: called with the progress of the job whenever there is new log output.
+        last_output_time: the last time the job logged something, or its submission time.
+    """
+    poll_interval_sec = LOCAL_SPARK_POLL_INTERVAL_SEC
+
+    def __init__(self, proc: Popen, job_name: str, log_path: str, job_tags: Optional[Dict[str, str]],
+                 progress_callback: Optional[Callable[[LocalSparkJobProgress], None]] = None):
+        super().__init__(proc.pid, job_name)
+        self.proc = proc
+        self.job_tags = job_tags
+        self.progress_callback = progress_callback
+        self.start_time = time.time()
+        self.last_output_time = self.start_time
+        self._log_tailer = _LogTailer(log_path)
+
+    @property
+    def log_path(self) -> str:
+        return self._log_tailer.path
+
+    @property
+    def last_line(self) -> Optional[str]:
+        return self._log_tailer.last_line
+
+    def get_status(self) -> Optional[int]:
+        return self.proc.poll()
+
+    def get_job_tags(self) -> Optional[Dict[str, str]]:
+        return self.job_tags
+
+    def wait_for_exit(self, timeout_seconds: float) -> bool:
+        """Waits up to `timeout_seconds` for the spark-submit process to exit, and returns whether it exited."""
+        try:
+            self.proc.wait(timeout_seconds)
+            return True
+        except TimeoutExpired:
+            return False
+
+    def _poll(self) -> Optional[bool]:
+        lines = self._log_tailer.read_lines()
+        if lines:
+            self.last_output_time = time.time()
+            if self.progress_callback is not None:
+                self.progress_callback(LocalSparkJobProgress(
+                    pid=self.proc.pid,
+                    elapsed_sec=self.last_output_time - self.start_time,
+                    log_lines=self._log_tailer.num_lines,
+                    last_line=self._log_tailer.last_line,
+                ))
+        if self.proc.poll() is None and any("Feathr Pyspark job completed" in line for line in lines):
+            # Normally the process exits once the job is finished. However spark-submit may not exit after a PySpark
+            # job and hang there forever, so the job is terminated once its log gives out that it's finished. The
+            # return code is 143 then, which is still a successful run.
+            logger.info(f"Pyspark job Completed")
+            self.proc.terminate()
+            self.proc.wait()
+        returncode = self.proc.poll()
+        if returncode is None:
+            return None
+        self._log_tailer.close()
+        if returncode == 1:
+            logger.error(f"Spark job with pid {self.proc.pid} is not successful. Please check {self.log_path}")
+            return False
+        logger.info(f"Spark job with pid {self.proc.pid} finished in {int(time.time() - self.start_time)} seconds with returncode {returncode}")
+        return True
 
 
 class _FeathrLocalSparkJobLauncher(SparkJobLauncher):
@@ -43,6 +164,8 @@ class _FeathrLocalSparkJobLauncher(SparkJobLauncher):
         self.packages = self._get_default_package()
         self.master = master or "local[*]"
         self.job_tags = None
+        self.latest_job: Optional[_LocalSparkJobHandle] = None
+        self._submit_lock = threading.Lock()
 
     def upload_or_get_cloud_path(self, local_path_or_http_path: str):
         """For Local Spark Case, no need to upload to cloud workspace."""
@@ -59,7 +182,7 @@ class _FeathrLocalSparkJobLauncher(SparkJobLauncher):
         configuration: Dict[str, str] = {},
         properties: Dict[str, str] = {},
         **_,
-    ) -> Any:
+    ) -> SparkJobHandle:
         """Submits the Feathr job to local spark, using subprocess args.
         Note that the Spark application will automatically run on YARN cluster mode. You cannot change it if
         you are running with Azure Synapse.
@@ -74,158 +197,139 @@ class _FeathrLocalSparkJobLauncher(SparkJobLauncher):
             configuration: Additional configs for the spark job
             properties: System properties configuration
             **_: Not used arguments in local spark mode, such as reference_files_path
+
+        Returns:
+            SparkJobHandle: handle of the submitted job.
         """
         logger.warning(
             f"Local Spark Mode only support basic params right now and should be used only for testing purpose."
         )
-        self.cmd_file, self.log_path = self._get_debug_file_name(self.debug_folder, prefix=job_name)
-
-        # Get conf and package arguments
-        cfg = configuration.copy() if configuration else {}
-        maven_dependency_without_feathr = f"{cfg.pop('spark.jars.packages', self.packages)}"
-        maven_dependency = f"{cfg.pop('spark.jars.packages', self.packages)},{get_maven_artifact_fullname()}"
-        spark_args = self._init_args(job_name=job_name, confs=cfg)
-        # Add additional repositories
-        spark_args.extend(["--repositories", "https://repository.mulesoft.org/nexus/content/repositories/public/,https://linkedin.jfrog.io/artifactory/open-source/"])
-
-        if not main_jar_path:
-            # We don't have the main jar, use Maven
-            if not python_files:
-                # This is a JAR job
-                # Azure Synapse/Livy doesn't allow JAR job starts from Maven directly, we must have a jar file uploaded.
-                # so we have to use a dummy jar as the main file.
-                logger.info(f"Main JAR file is not set, using default package '{get_maven_artifact_fullname()}' from Maven")
-                # Use the no-op jar as the main file
-                # This is a dummy jar which contains only one `org.example.Noop` class with one empty `main` function
-                # which does nothing
-                current_dir = Path(__file__).parent.resolve()
-                main_jar_path = os.path.join(current_dir, "noop-1.0.jar")
-                spark_args.extend(["--packages", maven_dependency, "--class", main_class_name, main_jar_path])
-            else:
-                spark_args.extend(["--packages", maven_dependency])
-                # This is a PySpark job, no more things to
-                if python_files.__len__() > 1:
-                    spark_args.extend(["--py-files", ",".join(python_files[1:])])
-                logger.info(f"Creating python files in {python_files}")
-                spark_args.append(python_files[0])
-        else:
-            if not python_files:
-                # This is a JAR job
-                spark_args.extend(["--class", main_class_name, main_jar_path])
+        # the debug files and the job number are shared by the jobs submitted concurrently
+        with self._submit_lock:
+            self.cmd_file, self.log_path = self._get_debug_file_name(self.debug_folder, prefix=job_name)
+
+            # Get conf and package arguments
+            cfg = configuration.copy() if configuration else {}
+            maven_dependency_without_feathr = f"{cfg.pop('spark.jars.packages', self.packages)}"
+            maven_dependency = f"{cfg.pop('spark.jars.packages', self.packages)},{get_maven_artifact_fullname()}"
+            spark_args = self._init_args(job_name=job_name, confs=cfg)
+            # Add additional repositories
+            spark_args.extend(["--repositories", "https://repository.mulesoft.org/nexus/content/repositories/public/,https://linkedin.jfrog.io/artifactory/open-source/"])
+
+            if not main_jar_path:
+                # We don't have the main jar, use Maven
+                if not python_files:
+                    # This is a JAR job
+                    # Azure Synapse/Livy doesn't allow JAR job starts from Maven directly, we must have a jar file uploaded.
+                    # so we have to use a dummy jar as the main file.
+                    logger.info(f"Main JAR file is not set, using default package '{get_maven_artifact_fullname()}' from Maven")
+                    # Use the no-op jar as the main file
+                    # This is a dummy jar which contains only one `org.example.Noop` class with one empty `main` function
+                    # which does nothing
+                    current_dir = Path(__file__).parent.resolve()
+                    main_jar_path = os.path.join(current_dir, "noop-1.0.jar")
+                    spark_args.extend(["--packages", maven_dependency, "--class", main_class_name, main_jar_path])
+                else:
+                    spark_args.extend(["--packages", maven_dependency])
+                    # This is a PySpark job, no more things to
+                    if python_files.__len__() > 1:
+                        spark_args.extend(["--py-files", ",".join(python_files[1:])])
+                    logger.info(f"Creating python files in {python_files}")
+                    spark_args.append(python_files[0])
             else:
-                spark_args.extend(["--jars", main_jar_path])
-                spark_args.extend(["--packages", maven_dependency_without_feathr])
-                # This is a PySpark job, no more things to
-                if python_files.__len__() > 1:
-                    spark_args.extend(["--py-files", ",".join(python_files[1:])])
-                spark_args.append(python_files[0])
+                if not python_files:
+                    # This is a JAR job
+                    spark_args.extend(["--class", main_class_name, main_jar_path])
+                else:
+                    spark_args.extend(["--jars", main_jar_path])
+                    spark_args.extend(["--packages", maven_dependency_without_feathr])
+                    # This is a PySpark job, no more things to
+                    if python_files.__len__() > 1:
+                        spark_args.extend(["--py-files", ",".join(python_files[1:])])
+                    spark_args.append(python_files[0])
 
 
-        if arguments:
-            spark_args.extend(arguments)
+            if arguments:
+                spark_args.extend(arguments)
 
-        if properties:
-            spark_args.extend(["--system-properties", json.dumps(properties)])
+            if properties:
+                spark_args.extend(["--system-properties", json.dumps(properties)])
 
-        cmd = " ".join(spark_args)
+            cmd = " ".join(spark_args)
 
-        log_append = open(f"{self.log_path}_{self.spark_job_num}.txt", "a")
-        # remove stderr=STDOUT per https://stackoverflow.com/a/40046887
-        # reference code: https://github.com/lyft/airflow/blob/main/airflow/providers/apache/spark/hooks/spark_submit.py#L391
-        proc = Popen(split(cmd), shell=False, stdout=log_append)
-        logger.info(f"Detail job stdout and stderr are in {self.log_path}.")
+            log_append = open(f"{self.log_path}_{self.spark_job_num}.txt", "a")
+            # remove stderr=STDOUT per https://stackoverflow.com/a/40046887
+            # reference code: https://github.com/lyft/airflow/blob/main/airflow/providers/apache/spark/hooks/spark_submit.py#L391
+            proc = Popen(split(cmd), shell=False, stdout=log_append)
+            logger.info(f"Detail job stdout and stderr are in {self.log_path}.")
 
-        self.spark_job_num += 1
+            self.spark_job_num += 1
 
-        with open(self.cmd_file, "a") as c:
-            c.write(" ".join(proc.args))
-            c.write("\n")
+            with open(self.cmd_file, "a") as c:
+                c.write(" ".join(proc.args))
+                c.write("\n")
 
-        self.latest_spark_proc = proc
+            self.latest_spark_proc = proc
 
-        logger.info(f"Local Spark job submit with pid: {proc.pid}.")
+            logger.info(f"Local Spark job submit with pid: {proc.pid}.")
 
-        self.job_tags = deepcopy(job_tags)
+            self.job_tags = deepcopy(job_tags)
 
-        return proc
+            self.latest_job = _LocalSparkJobHandle(proc, job_name, log_append.name, self.job_tags)
+            return self.latest_job
 
-    def wait_for_completion(self, timeout_seconds: Optional[float] = 500) -> bool:
+    def wait_for_completion(
+        self,
+        timeout_seconds: Optional[float] = 500,
+        progress_callback: Optional[Callable[[LocalSparkJobProgress], None]] = None,
+    ) -> bool:
         """This function track local spark job commands and process status.
         Files will be write into `debug` folder under your workspace.
+
+        The latest job is checked by its handle, which is woken up as soon as the process exits. A job which doesn't
+        log anything for `retry * retry_sec` seconds is considered to hang and is terminated if `clean_up` is set.
+
+        Args:
+            timeout_seconds: maximum time to wait for the job.
+            progress_callback (optional): called with the progress of the job whenever there is new log output.
         """
         logger.info(f"{self.spark_job_num} local spark job(s) in this Launcher, only the latest will be monitored.")
         logger.info(f"Please check auto generated spark command in {self.cmd_file} and detail logs in {self.log_path}.")
 
-        proc = self.latest_spark_proc
+        job = self.latest_job
+        job.progress_callback = progress_callback
         start_time = time.time()
-        retry = self.retry
-
-        log_read = open(f"{self.log_path}_{self.spark_job_num-1}.txt", "r")
-        while proc.poll() is None and (((timeout_seconds is None) or (time.time() - start_time < timeout_seconds))):
-            time.sleep(1)
-            try:
-                last_line = log_read.readlines()[-1]
-                if retry < 1:
-                    logger.warning(
-                        f"Spark job has hang for {self.retry * self.retry_sec} seconds. latest msg is {last_line}. \
-                            Please check {log_read.name}"
-                    )
-                    if self.clean_up:
-                        self._clean_up()
-                        proc.wait()
-                    break
-                retry = self.retry
-                if last_line == []:
-                    print("_", end="")
-                else:
-                    print(">", end="")
-                    if last_line.__contains__("Feathr Pyspark job completed"):
-                        logger.info(f"Pyspark job Completed")
-                        proc.terminate()
-            except IndexError as e:
-                print("x", end="")
-                time.sleep(self.retry_sec)
-                retry -= 1
-
-        job_duration = time.time() - start_time
-        log_read.close()
-
-        if proc.returncode == None:
-            logger.warning(
-                f"Spark job with pid {self.latest_spark_proc.pid} not completed after {timeout_seconds} sec \
-                    time out setting. Spark Logs:"
-            )
-            with open(log_read.name) as f:
-                contents = f.read()
-                logger.error(contents)
-            if self.clean_up:
-                self._clean_up()
-                proc.wait()
-                return True
-        elif proc.returncode == 1:
-            logger.warning(f"Spark job with pid {self.latest_spark_proc.pid} is not successful. Spark Logs:")
-            with open(log_read.name) as f:
-                contents = f.read()
-                logger.error(contents)
-            return False
-        elif proc.returncode == 143:
-            # Handle the return code 143 separately.
-            # Normally, the Popen method will return a handle that we can poll, and the poll result will be "None" if it's still running, and will be other values if the subprocess is finished.
-            # However when calling `Popen` with `spark-submit`, for some reason, the poll result will always return "None", and the process will hang there forever
-            # due to this issue, additional handling is needed where we detect the output logs and see if the job is finished.
-            # If the logs gives out hint that the job is finished, even the poll result is None (indicating the process is still running) we will still terminate it.
-            # by calling `proc.terminate()`
-            # if the process is terminated with this way, the return code will be 143. We assume this will still be a successful run.
-            logger.info(
-                f"Spark job with pid {self.latest_spark_proc.pid} finished in: {int(job_duration)} seconds."
-            )
-            return True
-        else:
-            logger.info(
-                f"Spark job with pid {self.latest_spark_proc.pid} finished in: {int(job_duration)} seconds \
-                    with returncode {proc.returncode}"
-            )
-            return True
+        # the job is considered to hang if it doesn't log anything for this long
+        hang_timeout_sec = self.retry * self.retry_sec
+
+        while True:
+            job.wait_for_exit(job.poll_interval_sec)
+            result = job.poll()
+            if result is not None:
+                return result
+            now = time.time()
+            if timeout_seconds is not None and now - start_time >= timeout_seconds:
+                logger.warning(
+                    f"Spark job with pid {job.proc.pid} not completed after {timeout_seconds} sec \
+                        time out setting. Spark Logs:"
+                )
+                with open(job.log_path) as f:
+                    logger.error(f.read())
+                if self.clean_up:
+                    self._clean_up(job.proc)
+                    job.proc.wait()
+                    return True
+                return None
+            if now - job.last_output_time >= hang_timeout_sec:
+                logger.warning(
+                    f"Spark job has hang for {hang_timeout_sec} seconds. latest msg is {job.last_line}. \
+                        Please check {job.log_path}"
+                )
+                if self.clean_up:
+                    self._clean_up(job.proc)
+                    job.proc.wait()
+                    return job.poll()
+                return None
 
     def _clean_up(self, proc: Popen = None):
         logger.warning(f"Terminate the spark job due to as clean_up is set to True.")
@@ -0,0 +1,116 @@
+import hashlib
+import os
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import BinaryIO, List, Optional, Set, Tuple
+
+from loguru import logger
+from tqdm import tqdm
+
+from feathr.constants import DEFAULT_DOWNLOAD_MAX_WORKERS, MB_BYTES
+
+
+class _RemoteFile(ABC):
+    """A result file in the cloud storage of a Spark cluster, to be downloaded to `local_path`."""
+    def __init__(self, local_path: str):
+        self.local_path = local_path
+
+    @abstractmethod
+    def stat(self) -> Tuple[int, Optional[bytes], Optional[float]]:
+        """Returns the size of the remote file, its MD5 digest and its modification time in seconds since the epoch.
+        The digest and the modification time are None if the storage doesn't keep them.
+        """
+        pass
+
+    @abstractmethod
+    def write_to(self, f: BinaryIO):
+        """Streams the content of the remote file into a local file, chunk by chunk."""
+        pass
+
+
+def download_files(files: List[_RemoteFile], max_workers: int = DEFAULT_DOWNLOAD_MAX_WORKERS,
+                   desc: str = "Downloading result files: ", prune_dir: Optional[str] = None) -> int:
+    """Downloads files on a thread pool of up to `max_workers` threads.
+
+    A file already present at its local path is skipped if it has the same size and modification time as the remote
+    file, so running a download again resumes it. Downloaded files get the modification time of the remote file.
+    If the storage doesn't keep modification times, the MD5 digest is compared instead, or only the size if there
+    is no digest either. Each file is streamed into a hidden temporary file next to it and moved into place once
+    complete, so a partial file is never taken for a complete one, nor read as a part file of the result.
+
+    Args:
+        files: the files to download.
+        max_workers (optional): maximum number of files downloaded concurrently.
+        desc (optional): description of the progress bar.
+        prune_dir (optional): local directory of the download. Files in it which are not in `files` are removed
+            after the download, e.g. the part files of a previous version of the result. Hidden files are kept.
+
+    Returns:
+        int: number of files downloaded, not counting the skipped ones.
+
+    Raises:
+        RuntimeError: if any file fails to download. The other files are downloaded first.
+    """
+    if not files and prune_dir is None:
+        return 0
+    downloaded = 0
+    failed = []
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(files)))) as executor:
+        futures = {executor.submit(_download_file, file): file for file in files}
+        for future in tqdm(as_completed(futures), total=len(futures), desc=desc):
+            try:
+                downloaded += future.result()
+            except Exception as e:
+                logger.error("Failed to download {}: {}", futures[future].local_path, e)
+                failed.append(futures[future].local_path)
+    if failed:
+        raise RuntimeError(f"Failed to download {len(failed)} of {len(files)} files: {', '.join(sorted(failed))}")
+    if prune_dir is not None:
+        _prune(prune_dir, {os.path.abspath(file.local_path) for file in files})
+    return downloaded
+
+
+def _prune(directory: str, keep: Set[str]):
+    for root, dirs, file_names in os.walk(directory):
+        dirs[:] = [d for d in dirs if not d.startswith(".")]
+        for file_name in file_names:
+            path = os.path.abspath(os.path.join(root, file_name))
+            if not file_name.startswith(".") and path not in keep:
+                logger.debug("Remove {} as it's not in the result anymore", path)
+                os.remove(path)
+
+
+def _download_file(file: _RemoteFile) -> bool:
+    """Downloads a file unless it's already complete. Returns whether it's downloaded."""
+    size, md5, modified_time = file.stat()
+    if _is_downloaded(file.local_path, size, md5, modified_time):
+        logger.debug("Skip downloading {} as it's already downloaded", file.local_path)
+        return False
+    directory, file_name = os.path.split(file.local_path)
+    os.makedirs(directory or ".", exist_ok=True)
+    tmp_path = os.path.join(directory, f".{file_name}.download")
+    try:
+        with open(tmp_path, "wb") as f:
+            file.write_to(f)
+        if modified_time is not None:
+            os.utime(tmp_path, (modified_time, modified_time))
+        os.replace(tmp_path, file.local_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return True
+
+
+def _is_downloaded(local_path: str, size: int, md5: Optional[bytes], modified_time: Optional[float]) -> bool:
+    if not os.path.isfile(local_path) or os.path.getsize(local_path) != size:
+        return False
+    if modified_time is not None:
+        # remote modification times have a precision of a millisecond at best
+        return abs(os.path.getmtime(local_path) - modified_time) < 0.001
+    if not md5:
+        return True
+    digest = hashlib.md5()
+    with open(local_path, "rb") as f:
+        for chunk in iter(lambda: f.read(MB_BYTES), b""):
+            digest.update(chunk)
+    return digest.digest() == bytes(md5)
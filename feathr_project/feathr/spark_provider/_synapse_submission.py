@@ -14,14 +14,15 @@ import tempfile
 from azure.identity import (ChainedTokenCredential, DefaultAzureCredential,
                             DeviceCodeCredential, EnvironmentCredential,
                             ManagedIdentityCredential)
-from azure.storage.filedatalake import DataLakeServiceClient, DataLakeDirectoryClient
+from azure.storage.filedatalake import DataLakeServiceClient, DataLakeDirectoryClient, DataLakeFileClient
 from azure.synapse.spark import SparkClient
 from azure.synapse.spark.models import SparkBatchJobOptions
 from loguru import logger
 from requests import request
-from tqdm import tqdm
 
 from feathr.spark_provider._abc import SparkJobLauncher
+from feathr.spark_provider._job_handle import SparkJobHandle
+from feathr.spark_provider._result_downloader import _RemoteFile, download_files
 from feathr.constants import *
 from feathr.version import get_maven_artifact_fullname
 
@@ -67,7 +68,10 @@ class _FeathrSynapseJobLauncher(SparkJobLauncher):
         or copying files from a source datalake directory to a target datalake directory
         """
         if local_path_or_cloud_src_path.startswith('abfs') or local_path_or_cloud_src_path.startswith('wasb'):
-            if tar_dir_path is None or not (tar_dir_path.startswith('abfs') or tar_dir_path.startswith('wasb')):
+            if tar_dir_path is None:
+                # passed a cloud path, which doesn't need to be uploaded
+                return local_path_or_cloud_src_path
+            if not (tar_dir_path.startswith('abfs') or tar_dir_path.startswith('wasb')):
                 raise RuntimeError(
                 f"Failed to copy files from dbfs directory: {local_path_or_cloud_src_path}. {tar_dir_path} is not a valid target directory path"
             )
@@ -94,16 +98,17 @@ class _FeathrSynapseJobLauncher(SparkJobLauncher):
                     local_path_or_cloud_src_path, res_path)
         return res_path
 
-    def download_result(self, result_path: str, local_folder: str, is_file_path: bool = False):
+    def download_result(self, result_path: str, local_folder: str, is_file_path: bool = False, prune: bool = False):
         """
-        Supports downloading files from the result folder
+        Supports downloading files from the result folder. If `prune` is True, the files in the local folder which
+        are not in the result are removed.
         """
         if is_file_path:
             paths = result_path.rsplit('/',1)
             if len(paths) != 2:
                 raise RuntimeError(f"Invalid single file path: {result_path}")
-            return self._datalake.download_file(paths[0]+'/', local_folder, paths[1])
-        return self._datalake.download_file(result_path, local_folder, None)
+            return self._datalake.download_file(paths[0]+'/', local_folder, paths[1], prune=prune)
+        return self._datalake.download_file(result_path, local_folder, None, prune=prune)
     
     
     def cloud_dir_exists(self, dir_path: str) -> bool:
@@ -116,7 +121,7 @@ class _FeathrSynapseJobLauncher(SparkJobLauncher):
 
     def submit_feathr_job(self, job_name: str, main_jar_path: str = None,  main_class_name: str = None, arguments: List[str] = None,
                           python_files: List[str]= None, reference_files_path: List[str] = None, job_tags: Dict[str, str] = None,
-                          configuration: Dict[str, str] = {}, properties: Dict[str, str] = {}):
+                          configuration: Dict[str, str] = {}, properties: Dict[str, str] = {}) -> SparkJobHandle:
         """
         Submits the feathr job
         Refer to the Apache Livy doc for more details on the meaning of the parameters:
@@ -138,6 +143,9 @@ class _FeathrSynapseJobLauncher(SparkJobLauncher):
             job_tags (str): tags of the job, for example you might want to put your user ID, or a tag with a certain information
             configuration (Dict[str, str]): Additional configs for the spark job
             properties (Dict[str, str]): Additional System Properties for the spark job
+
+        Returns:
+            SparkJobHandle: handle of the submitted job
         """
 
         if properties:
@@ -171,7 +179,7 @@ class _FeathrSynapseJobLauncher(SparkJobLauncher):
         main_jar_cloud_path = None
         if main_jar_path:
             # Now we have a main jar, either feathr or noop
-            if main_jar_path.startswith('abfs'):
+            if main_jar_path.startswith(('abfs', 'wasb')):
                 main_jar_cloud_path = main_jar_path
                 logger.info(
                     'Cloud path {} is used for running the job: {}', main_jar_path, job_name)
@@ -191,7 +199,7 @@ class _FeathrSynapseJobLauncher(SparkJobLauncher):
             reference_file_paths.append(
                 self._datalake.upload_file_to_workdir(file_path))
 
-        self.current_job_info = self._api.create_spark_batch_job(job_name=job_name,
+        job_info = self._api.create_spark_batch_job(job_name=job_name,
                                                                  main_file=main_jar_cloud_path,
                                                                  class_name=main_class_name,
                                                                  python_files=python_files,
@@ -199,28 +207,18 @@ class _FeathrSynapseJobLauncher(SparkJobLauncher):
                                                                  reference_files=reference_files_path,
                                                                  tags=job_tags,
                                                                  configuration=cfg)
+        self.current_job_info = job_info
         logger.info('See submitted job here: https://web.azuresynapse.net/en-us/monitoring/sparkapplication')
-        return self.current_job_info
+        # the handle is built from the local job info, since other jobs may be submitted concurrently
+        return _SynapseJobHandle(self._api, job_info.id, job_info.name)
 
     def wait_for_completion(self, timeout_seconds: Optional[float]) -> bool:
         """
         Returns true if the job completed successfully
-        """          
-        start_time = time.time()
-        while (timeout_seconds is None) or (time.time() - start_time < timeout_seconds):
-            status = self.get_status()
-            logger.info('Current Spark job status: {}', status)
-            if status in {LivyStates.SUCCESS.value}:
-                return True
-            elif status in {LivyStates.ERROR.value, LivyStates.DEAD.value, LivyStates.KILLED.value}:
-                logger.error("Feathr job has failed.")
-                error_msg = self._api.get_driver_log(self.current_job_info.id).decode('utf-8')
-                logger.error(error_msg)
-                logger.error("The size of the whole error log is: {}. The logs might be truncated in some cases (such as in Visual Studio Code) so only the top a few lines of the error message is displayed. If you cannot see the whole log, you may want to extend the setting for output size limit.", len(error_msg))
-                return False
-            else:
-                time.sleep(30)
-        else:
+        """
+        try:
+            return self._current_job().wait(timeout_seconds)
+        except TimeoutError:
             raise TimeoutError('Timeout waiting for job to complete')
 
     def get_status(self) -> str:
@@ -229,9 +227,7 @@ class _FeathrSynapseJobLauncher(SparkJobLauncher):
         Returns:
             str: Status of the current job
         """
-        job = self._api.get_spark_batch_job(self.current_job_info.id)
-        assert job is not None
-        return job.state
+        return self._current_job().get_status()
 
     def get_job_result_uri(self) -> str:
         """Get job output uri
@@ -239,9 +235,7 @@ class _FeathrSynapseJobLauncher(SparkJobLauncher):
         Returns:
             str: `output_path` field in the job tags
         """
-        tags = self._api.get_spark_batch_job(self.current_job_info.id).tags
-        # in case users call this API even when there's no tags available
-        return None if tags is None else tags[OUTPUT_PATH_TAG]
+        return self._current_job().get_job_result_uri()
 
     def get_job_tags(self) -> Dict[str, str]:
         """Get job tags
@@ -249,7 +243,40 @@ class _FeathrSynapseJobLauncher(SparkJobLauncher):
         Returns:
             Dict[str, str]: a dict of job tags
         """
-        return self._api.get_spark_batch_job(self.current_job_info.id).tags
+        return self._current_job().get_job_tags()
+
+    def _current_job(self) -> "_SynapseJobHandle":
+        return _SynapseJobHandle(self._api, self.current_job_info.id, self.current_job_info.name)
+
+
+class _SynapseJobHandle(SparkJobHandle):
+    """
+    Handle of a Synapse Spark batch job. Its status is the Livy state of the job.
+    """
+    def __init__(self, api: "_SynapseJobRunner", job_id: int, job_name: str = None):
+        super().__init__(job_id, job_name)
+        self._api = api
+
+    def get_status(self) -> str:
+        job = self._api.get_spark_batch_job(self.job_id)
+        assert job is not None
+        return job.state
+
+    def get_job_tags(self) -> Dict[str, str]:
+        return self._api.get_spark_batch_job(self.job_id).tags
+
+    def _poll(self) -> Optional[bool]:
+        status = self.get_status()
+        logger.info('Current Spark job status: {}', status)
+        if status in {LivyStates.SUCCESS.value}:
+            return True
+        elif status in {LivyStates.ERROR.value, LivyStates.DEAD.value, LivyStates.KILLED.value}:
+            logger.error("Feathr job has failed.")
+            error_msg = self._api.get_driver_log(self.job_id).decode('utf-8')
+            logger.error(error_msg)
+            logger.error("The size of the whole error log is: {}. The logs might be truncated in some cases (such as in Visual Studio Code) so only the top a few lines of the error message is displayed. If you cannot see the whole log, you may want to extend the setting for output size limit.", len(error_msg))
+            return False
+        return None
 
 class _SynapseJobRunner(object):
     """
@@ -370,6 +397,23 @@ class _SynapseJobRunner(object):
         return resp.read()
 
 
+class _DataLakeFile(_RemoteFile):
+    """
+    Result file in Azure Data Lake Storage.
+    """
+    def __init__(self, local_path: str, file_client: DataLakeFileClient):
+        super().__init__(local_path)
+        self.file_client = file_client
+
+    def stat(self) -> Tuple[int, Optional[bytes], Optional[float]]:
+        properties = self.file_client.get_file_properties()
+        last_modified = properties.last_modified.timestamp() if properties.last_modified else None
+        return properties.size, properties.content_settings.content_md5, last_modified
+
+    def write_to(self, f):
+        self.file_client.download_file().readinto(f)
+
+
 class _DataLakeFiler(object):
     """
     Class to interact with Azure Data Lake Storage.
@@ -461,7 +505,7 @@ class _DataLakeFiler(object):
         return returned_path
         
 
-    def download_file(self, target_adls_directory: str, local_dir_cache: str, file_name: str = None):
+    def download_file(self, target_adls_directory: str, local_dir_cache: str, file_name: str = None, prune: bool = False):
         """
         Download file to a local cache. Supporting download a folder and the content in its subfolder.
         Note that the code will just download the content in the root folder, and the folder in the next level (rather than recursively for all layers of folders)
@@ -470,6 +514,7 @@ class _DataLakeFiler(object):
             target_adls_directory (str): target ADLS directory
             local_dir_cache (str): local cache to store local results
             file_name (str): only download the file with name 'file_name' under the target directory if it's provided (default as None)
+            prune (bool): remove the files in the local cache which are not downloaded (default as False)
         """
         logger.info('Beginning reading of results from {}',
                     target_adls_directory)
@@ -481,7 +526,7 @@ class _DataLakeFiler(object):
         
         if file_name is not None:
             local_paths = [os.path.join(local_dir_cache, file_name)]
-            self._download_file_list(local_paths, [file_name], directory_client)
+            self._download_file_list(local_paths, [file_name], directory_client, local_dir_cache if prune else None)
             logger.info('Finish downloading file {} from {} to {}.',
                     file_name, target_adls_directory, local_dir_cache)
             return
@@ -498,36 +543,24 @@ class _DataLakeFiler(object):
         # list all the files under the certain folder, and download them preserving the hierarchy
         for folder in result_folders:
             folder_name = basename(folder)
-            file_in_folder = [os.path.join(folder_name, basename(file_path.name)) for file_path in self.file_system_client.get_paths(
-                path=folder, recursive=False) if not file_path.is_directory]
-            local_paths = [os.path.join(local_dir_cache, file_name)
-                       for file_name in file_in_folder]
-            self._download_file_list(local_paths, file_in_folder, directory_client)
+            result_paths.extend([os.path.join(folder_name, basename(file_path.name)) for file_path in self.file_system_client.get_paths(
+                path=folder, recursive=False) if not file_path.is_directory])
 
-        # download files that are in the result folder
+        # download the files of the result folder and its sub folders together
         local_paths = [os.path.join(local_dir_cache, file_name)
                        for file_name in result_paths]
-        self._download_file_list(local_paths, result_paths, directory_client)
+        self._download_file_list(local_paths, result_paths, directory_client, local_dir_cache if prune else None)
 
         logger.info('Finish downloading files from {} to {}.',
                     target_adls_directory, local_dir_cache)
         
-    def _download_file_list(self, local_paths: List[str], result_paths, directory_client):
+    def _download_file_list(self, local_paths: List[str], result_paths, directory_client, prune_dir: Optional[str] = None):
         '''
-        Download filelist to local
+        Download filelist to local, skipping the files which are already downloaded
         '''
-        for idx, file_to_write in enumerate(tqdm(result_paths,desc="Downloading result files: ")):
-            try:
-                os.makedirs(os.path.dirname(local_paths[idx]), exist_ok=True)
-                local_file = open(local_paths[idx], 'wb')
-                file_client = directory_client.get_file_client(file_to_write)
-                download = file_client.download_file()
-                downloaded_bytes = download.readall()
-                local_file.write(downloaded_bytes)
-                local_file.close()               
-            except Exception as e:
-                logger.error(e)       
-                
+        download_files([_DataLakeFile(local_path, directory_client.get_file_client(file_to_write))
+                        for local_path, file_to_write in zip(local_paths, result_paths)], prune_dir=prune_dir)
+
     def _dir_exists(self, dir_path:str):
         '''
         Check if a directory in datalake already exists. Will also return the directory client
@@ -0,0 +1,340 @@
+import base64
+import binascii
+import struct
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from loguru import logger
+
+from feathr.definition.dtype import FeatureType, ValueType
+from feathr.protobuf.featureValue_pb2 import FeatureValue
+
+# Name of the oneof field in the FeatureValue protobuf
+FEATURE_VALUE_ONEOF = 'FeatureValueOneOf'
+
+# Dispatch table from the oneof field name to the function that extracts the typed value. Dense arrays are returned as
+# the protobuf repeated field (a Python sequence) and sparse arrays as a tuple of index array and value array.
+FEATURE_VALUE_GETTERS: Dict[str, Callable[[FeatureValue], Any]] = {
+    'boolean_value': lambda fv: fv.boolean_value,
+    'string_value': lambda fv: fv.string_value,
+    'float_value': lambda fv: fv.float_value,
+    'double_value': lambda fv: fv.double_value,
+    'int_value': lambda fv: fv.int_value,
+    'long_value': lambda fv: fv.long_value,
+    'boolean_array': lambda fv: fv.boolean_array.booleans,
+    'string_array': lambda fv: fv.string_array.strings,
+    'float_array': lambda fv: fv.float_array.floats,
+    'double_array': lambda fv: fv.double_array.doubles,
+    'int_array': lambda fv: fv.int_array.integers,
+    'long_array': lambda fv: fv.long_array.longs,
+    'byte_array': lambda fv: fv.byte_array.bytes,
+    'sparse_string_array': lambda fv: (fv.sparse_string_array.index_integers, fv.sparse_string_array.value_strings),
+    'sparse_bool_array': lambda fv: (fv.sparse_bool_array.index_integers, fv.sparse_bool_array.value_booleans),
+    'sparse_integer_array': lambda fv: (fv.sparse_integer_array.index_integers, fv.sparse_integer_array.value_integers),
+    'sparse_long_array': lambda fv: (fv.sparse_long_array.index_integers, fv.sparse_long_array.value_longs),
+    'sparse_double_array': lambda fv: (fv.sparse_double_array.index_integers, fv.sparse_double_array.value_doubles),
+    'sparse_float_array': lambda fv: (fv.sparse_float_array.index_integers, fv.sparse_float_array.value_floats),
+}
+
+
+# Oneof field name written by the Redis sink for each feature value type, for scalars, dense vectors and sparse vectors.
+_SCALAR_VALUE_TYPES = {
+    ValueType.BOOL: 'boolean_value',
+    ValueType.STRING: 'string_value',
+    ValueType.FLOAT: 'float_value',
+    ValueType.DOUBLE: 'double_value',
+    ValueType.INT32: 'int_value',
+    ValueType.INT64: 'long_value',
+}
+_DENSE_VALUE_TYPES = {
+    ValueType.BOOL: 'boolean_array',
+    ValueType.STRING: 'string_array',
+    ValueType.FLOAT: 'float_array',
+    ValueType.DOUBLE: 'double_array',
+    ValueType.INT32: 'int_array',
+    ValueType.INT64: 'long_array',
+    ValueType.BYTES: 'byte_array',
+}
+_SPARSE_VALUE_TYPES = {
+    ValueType.BOOL: 'sparse_bool_array',
+    ValueType.STRING: 'sparse_string_array',
+    ValueType.FLOAT: 'sparse_float_array',
+    ValueType.DOUBLE: 'sparse_double_array',
+    ValueType.INT32: 'sparse_integer_array',
+    ValueType.INT64: 'sparse_long_array',
+}
+
+# Binary online encoding. Instead of base64 text, values are stored as raw bytes prefixed by an encoding version byte.
+# Neither version byte is a base64 character nor a valid protobuf tag, so binary and base64 values can be told apart
+# and the tables written with the old encoding are still readable.
+# Version 1: the serialized FeatureValue protobuf follows.
+BINARY_PROTOBUF_VERSION = 0x01
+# Version 2: a dense numeric vector, one type code byte followed by the packed little-endian items.
+BINARY_PACKED_VERSION = 0x02
+# Packed vector type code -> (oneof field name, struct item format)
+_PACKED_TYPES: Dict[int, Tuple[str, str]] = {
+    ord('f'): ('float_array', 'f'),
+    ord('d'): ('double_array', 'd'),
+    ord('i'): ('int_array', 'i'),
+    ord('q'): ('long_array', 'q'),
+}
+_PACKED_TYPE_CODES: Dict[str, Tuple[int, str]] = {value_type: (code, item_format) for code, (value_type, item_format) in _PACKED_TYPES.items()}
+
+# Marker returned by the fast decoders if the serialized value doesn't have the expected layout.
+_NOT_DECODED = object()
+
+
+def _read_varint(buffer: bytes, pos: int):
+    result = 0
+    shift = 0
+    while True:
+        b = buffer[pos]
+        pos += 1
+        result |= (b & 0x7f) << shift
+        if not b & 0x80:
+            return result, pos
+        shift += 7
+
+
+def _decode_signed_varint(serialized: bytes) -> Any:
+    value, pos = _read_varint(serialized, 1)
+    if pos != len(serialized):
+        return _NOT_DECODED
+    # negative values are encoded as 64-bit two's complement
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+
+def _decode_string(serialized: bytes) -> Any:
+    size, pos = _read_varint(serialized, 1)
+    if pos + size != len(serialized):
+        return _NOT_DECODED
+    return serialized[pos:].decode('utf-8')
+
+
+# Decoders working on the protobuf wire format directly, keyed by the tag byte of the oneof field, along with the name
+# of that oneof field. They cover the scalar types, which is where most of the protobuf parsing time goes. Arrays and
+# values with any other layout are parsed by protobuf.
+_FAST_DECODERS: Dict[int, Tuple[str, Callable[[bytes], Any]]] = {
+    # boolean_value, field 1, varint
+    0x08: ('boolean_value', lambda serialized: bool(serialized[1]) if len(serialized) == 2 else _NOT_DECODED),
+    # string_value, field 2, length delimited
+    0x12: ('string_value', _decode_string),
+    # float_value, field 3, fixed32
+    0x1d: ('float_value', lambda serialized: struct.unpack_from('<f', serialized, 1)[0] if len(serialized) == 5 else _NOT_DECODED),
+    # double_value, field 4, fixed64
+    0x21: ('double_value', lambda serialized: struct.unpack_from('<d', serialized, 1)[0] if len(serialized) == 9 else _NOT_DECODED),
+    # int_value and long_value, field 5 and 6, varint
+    0x28: ('int_value', _decode_signed_varint),
+    0x30: ('long_value', _decode_signed_varint),
+}
+
+
+def _decode_packed_vector(serialized: bytes) -> Tuple[str, List[Any]]:
+    value_type, item_format = _PACKED_TYPES[serialized[1]]
+    return value_type, list(struct.unpack_from(f'<{(len(serialized) - 2) // struct.calcsize(item_format)}{item_format}', serialized, 2))
+
+
+def decode_serialized(serialized: bytes, with_type: bool = False) -> Any:
+    """Decodes a serialized FeatureValue. The common types are decoded from the wire format directly, and the rest
+    are parsed by protobuf and dispatched by their oneof field. Packed vectors of the binary encoding are decoded as
+    well.
+
+    If `with_type` is set, a tuple of the oneof field name and the value is returned, so that callers can build typed
+    arrays out of the values.
+    """
+    fast_decoder = _FAST_DECODERS.get(serialized[0]) if serialized else None
+    if fast_decoder is not None:
+        value_type, decode = fast_decoder
+        value = decode(serialized)
+        if value is not _NOT_DECODED:
+            return (value_type, value) if with_type else value
+    if serialized and serialized[0] == BINARY_PACKED_VERSION:
+        value_type, value = _decode_packed_vector(serialized)
+        return (value_type, value) if with_type else value
+    feature_value = FeatureValue()
+    feature_value.ParseFromString(serialized)
+    value_type, value = _decode_typed_feature_value(feature_value)
+    return (value_type, value) if with_type else value
+
+
+def decode_feature_value(feature_value: FeatureValue) -> Any:
+    """Extracts the typed value from a parsed FeatureValue with a single oneof lookup.
+    Returns None if the value type is not supported by this client version.
+    """
+    return _decode_typed_feature_value(feature_value)[1]
+
+
+def _decode_typed_feature_value(feature_value: FeatureValue) -> Tuple[Optional[str], Any]:
+    value_type = feature_value.WhichOneof(FEATURE_VALUE_ONEOF)
+    getter = FEATURE_VALUE_GETTERS.get(value_type)
+    if getter is None:
+        logger.debug("Fail to load the feature type. Maybe a new type that is not supported by this client version")
+        logger.debug(f"The loaded feature is {feature_value}")
+        return value_type, None
+    return value_type, getter(feature_value)
+
+
+def feature_type_to_value_type(feature_type: FeatureType) -> Optional[str]:
+    """Returns the FeatureValue oneof field name of the values of a feature type, or None if the feature type has no
+    specific encoding.
+    """
+    if feature_type.tensor_category == "SPARSE":
+        return _SPARSE_VALUE_TYPES.get(feature_type.val_type)
+    if feature_type.dimension_type:
+        return _DENSE_VALUE_TYPES.get(feature_type.val_type)
+    return _SCALAR_VALUE_TYPES.get(feature_type.val_type)
+
+
+def typed_decoder(value_type: str, validate: bool = False) -> Callable[[bytes], Tuple[Optional[str], Any]]:
+    """Returns a decoder specialized for serialized FeatureValues of the given oneof field, which returns the same
+    (oneof field name, value) tuples as `decode_serialized` with `with_type`.
+
+    The expected value type is decoded without looking up the decoder by the tag byte. Values of any other type are
+    decoded by `decode_serialized`, or raise ValueError if `validate` is set.
+    """
+    fast_decoder = next(((tag, decode) for tag, (fast_value_type, decode) in _FAST_DECODERS.items() if fast_value_type == value_type), None)
+    getter = FEATURE_VALUE_GETTERS[value_type]
+
+    def decode_fallback(serialized: bytes) -> Tuple[Optional[str], Any]:
+        decoded = decode_serialized(serialized, with_type=True)
+        if validate and decoded[0] != value_type:
+            raise ValueError(f"Expect a feature value of type {value_type}, but got {decoded[0]}.")
+        return decoded
+
+    if fast_decoder is not None:
+        tag, decode = fast_decoder
+
+        def decode_fast(serialized: bytes) -> Tuple[Optional[str], Any]:
+            if serialized[0] == tag:
+                value = decode(serialized)
+                if value is not _NOT_DECODED:
+                    return value_type, value
+            return decode_fallback(serialized)
+        return decode_fast
+
+    def decode_parsed(serialized: bytes) -> Tuple[Optional[str], Any]:
+        if serialized[0] == BINARY_PACKED_VERSION:
+            return decode_fallback(serialized)
+        feature_value = FeatureValue()
+        feature_value.ParseFromString(serialized)
+        if feature_value.WhichOneof(FEATURE_VALUE_ONEOF) == value_type:
+            return value_type, getter(feature_value)
+        return decode_fallback(serialized)
+    return decode_parsed
+
+
+def b64decode_batch(raw_values: List[Union[bytes, str]]) -> List[bytes]:
+    """Base64-decodes a list of values with a single call into the decoder.
+
+    All the values are concatenated and decoded at once, then sliced back by their decoded lengths. Since a padding
+    character would stop the decoder, the padding is replaced by 'A' (zero bits) before decoding and the resulting
+    extra bytes are dropped when slicing. Falls back to decoding the values one by one if any of them is not
+    canonically padded.
+    """
+    raw_values = [raw.encode() if isinstance(raw, str) else raw for raw in raw_values]
+    if any(len(raw) % 4 for raw in raw_values):
+        return [base64.b64decode(raw) for raw in raw_values]
+
+    decoded = binascii.a2b_base64(b''.join(raw_values).replace(b'=', b'A'))
+    result = []
+    offset = 0
+    for raw in raw_values:
+        size = len(raw) // 4 * 3
+        padding = raw.count(b'=', -2)
+        result.append(decoded[offset:offset + size - padding])
+        offset += size
+    return result
+
+
+def unwrap_batch(raw_values: List[Union[bytes, str]]) -> List[bytes]:
+    """Turns a list of encoded values into serialized values as taken by `decode_serialized`, where binary values are
+    unwrapped from their version byte and base64 values are decoded by `b64decode_batch`. Both encodings can be mixed,
+    e.g. while a feature table is rewritten with the binary encoding.
+    """
+    result: List[Optional[bytes]] = [None] * len(raw_values)
+    base64_indices = []
+    for i, raw in enumerate(raw_values):
+        version = raw[0] if isinstance(raw, bytes) else None
+        if version == BINARY_PROTOBUF_VERSION:
+            result[i] = raw[1:]
+        elif version == BINARY_PACKED_VERSION:
+            # decoded by decode_serialized as it is
+            result[i] = raw
+        else:
+            base64_indices.append(i)
+    if len(base64_indices) == len(raw_values):
+        return b64decode_batch(raw_values)
+    for i, serialized in zip(base64_indices, b64decode_batch([raw_values[i] for i in base64_indices])):
+        result[i] = serialized
+    return result
+
+
+def encode_serialized(serialized: bytes, encoding: str = "base64") -> bytes:
+    """Encodes a serialized FeatureValue for the online store, the inverse of `unwrap_batch`.
+
+    Args:
+        serialized: the serialized FeatureValue protobuf.
+        encoding: "base64", the default encoding of the Redis sink, or "binary", which stores dense numeric vectors
+            packed and the other values as raw protobuf bytes.
+    """
+    if encoding == "base64":
+        return base64.b64encode(serialized)
+    if encoding != "binary":
+        raise ValueError(f"Unsupported online encoding {encoding}, must be one of base64, binary.")
+    value_type, value = decode_serialized(serialized, with_type=True)
+    if value_type in _PACKED_TYPE_CODES:
+        code, item_format = _PACKED_TYPE_CODES[value_type]
+        return bytes([BINARY_PACKED_VERSION, code]) + struct.pack(f'<{len(value)}{item_format}', *value)
+    return bytes([BINARY_PROTOBUF_VERSION]) + serialized
+
+
+def decode_flat(raw_features: List[Optional[Union[bytes, str]]], with_type: bool = False) -> List[Any]:
+    """Decodes a flat list of encoded FeatureValues, in either the base64 or the binary encoding. Missing values (None
+    or empty) are returned as they are. See `decode_serialized` for `with_type`.
+    """
+    indices = [i for i, raw in enumerate(raw_features) if raw]
+    result = list(raw_features)
+    for i, serialized in zip(indices, unwrap_batch([raw_features[i] for i in indices])):
+        result[i] = decode_serialized(serialized, with_type)
+    return result
+
+
+def decode_rows(pipeline_result: List[List[Any]], with_type: bool = False) -> List[List[Any]]:
+    """Decodes the result of a `multi_get_online_features` pipeline, i.e. one list of encoded features per key,
+    into one list of typed features per key. See `decode_serialized` for `with_type`.
+    """
+    decoded = decode_flat([raw for row in pipeline_result for raw in row], with_type)
+    result = []
+    offset = 0
+    for row in pipeline_result:
+        result.append(decoded[offset:offset + len(row)])
+        offset += len(row)
+    return result
+
+
+def decode_rows_with_decoders(pipeline_result: List[List[Any]], feature_names: List[List[str]],
+                              decoders: Dict[str, Callable[[bytes], Tuple[Optional[str], Any]]]) -> List[List[Any]]:
+    """Decodes the result of a `multi_get_online_features` pipeline as `decode_rows` with `with_type`, where the
+    features with a decoder in `decoders` (see `typed_decoder`) are decoded by it, and the rest by `decode_serialized`.
+
+    Args:
+        pipeline_result: one list of encoded features per key.
+        feature_names: the feature names of the encoded features of each key.
+        decoders: feature name to its specialized decoder.
+    """
+    cells = [(raw, decoders.get(feature_name)) for row, names in zip(pipeline_result, feature_names) for raw, feature_name in zip(row, names)]
+    indices = [i for i, (raw, _) in enumerate(cells) if raw]
+    decoded = [raw for raw, _ in cells]
+    for i, serialized in zip(indices, unwrap_batch([cells[i][0] for i in indices])):
+        decoder = cells[i][1]
+        decoded[i] = decoder(serialized) if decoder is not None else decode_serialized(serialized, True)
+    result = []
+    offset = 0
+    for row in pipeline_result:
+        result.append(decoded[offset:offset + len(row)])
+        offset += len(row)
+    return result
+
+
+def strip_types(row: List[Any]) -> List[Any]:
+    """Drops the oneof field names from a row decoded with `with_type`. Missing values are returned as they are."""
+    return [cell[1] if type(cell) is tuple else cell for cell in row]
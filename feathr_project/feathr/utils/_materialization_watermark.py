@@ -0,0 +1,53 @@
+from datetime import datetime
+import json
+import os
+import threading
+from typing import Dict, Optional
+
+from feathr.definition.sink import Sink
+from feathr.utils._result_cache import _file_lock
+
+
+def _sink_key(sink: Sink) -> str:
+    """Identifies a sink by its type and its feature config, e.g. the output path and the features of an HdfsSink."""
+    return f"{type(sink).__name__}:{' '.join(sink.to_feature_config().split())}"
+
+
+class _MaterializationWatermarks(object):
+    """Watermarks of incremental materialization, i.e. the latest backfill cutoff time materialized successfully, up to
+    which all the earlier cutoff times are materialized too, per project, materialization name and sink.
+
+    The watermarks are kept in a JSON file, rewritten atomically on each update. Updates are serialized across
+    processes by a file lock next to it, so that concurrent materializations don't lose each other's watermarks.
+
+    Attributes:
+        path: path of the JSON file.
+    """
+    _lock = threading.Lock()
+
+    def __init__(self, path: str):
+        self.path = os.path.expanduser(path)
+
+    def get(self, project_name: str, name: str, sink: Sink) -> Optional[datetime]:
+        """Returns the watermark of a sink, or None if nothing was materialized to it yet."""
+        watermark = self._read().get(project_name, {}).get(name, {}).get(_sink_key(sink))
+        return None if watermark is None else datetime.fromisoformat(watermark)
+
+    def set(self, project_name: str, name: str, sink: Sink, watermark: datetime):
+        """Sets the watermark of a sink."""
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory or ".", exist_ok=True)
+        lock_path = os.path.join(directory, f".{os.path.basename(self.path)}.lock")
+        with self._lock, _file_lock(lock_path):
+            watermarks = self._read()
+            watermarks.setdefault(project_name, {}).setdefault(name, {})[_sink_key(sink)] = watermark.isoformat()
+            tmp_path = os.path.join(directory, f".{os.path.basename(self.path)}.{os.getpid()}.tmp")
+            with open(tmp_path, "w") as f:
+                json.dump(watermarks, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+
+    def _read(self) -> Dict[str, Dict[str, Dict[str, str]]]:
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path) as f:
+            return json.load(f)
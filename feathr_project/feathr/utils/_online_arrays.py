@@ -0,0 +1,197 @@
+import itertools
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pyarrow as pa
+
+# NumPy dtype of the values of each FeatureValue oneof field. For dense and sparse arrays, it's the dtype of the items.
+NUMPY_DTYPES: Dict[str, Any] = {
+    'boolean_value': np.bool_,
+    'string_value': object,
+    'float_value': np.float32,
+    'double_value': np.float64,
+    'int_value': np.int32,
+    'long_value': np.int64,
+    'boolean_array': np.bool_,
+    'string_array': object,
+    'float_array': np.float32,
+    'double_array': np.float64,
+    'int_array': np.int32,
+    'long_array': np.int64,
+    'byte_array': object,
+    'sparse_string_array': object,
+    'sparse_bool_array': np.bool_,
+    'sparse_integer_array': np.int32,
+    'sparse_long_array': np.int64,
+    'sparse_double_array': np.float64,
+    'sparse_float_array': np.float32,
+}
+
+# Arrow type of the values of each FeatureValue oneof field. For dense and sparse arrays, it's the type of the items.
+ARROW_TYPES: Dict[str, pa.DataType] = {
+    'boolean_value': pa.bool_(),
+    'string_value': pa.string(),
+    'float_value': pa.float32(),
+    'double_value': pa.float64(),
+    'int_value': pa.int32(),
+    'long_value': pa.int64(),
+    'boolean_array': pa.bool_(),
+    'string_array': pa.string(),
+    'float_array': pa.float32(),
+    'double_array': pa.float64(),
+    'int_array': pa.int32(),
+    'long_array': pa.int64(),
+    'byte_array': pa.binary(),
+    'sparse_string_array': pa.string(),
+    'sparse_bool_array': pa.bool_(),
+    'sparse_integer_array': pa.int32(),
+    'sparse_long_array': pa.int64(),
+    'sparse_double_array': pa.float64(),
+    'sparse_float_array': pa.float32(),
+}
+
+
+class SparseFeatureBatch(NamedTuple):
+    """A sparse feature of a batch of keys in CSR layout, i.e. the indices and values of row `i` are
+    `indices[indptr[i]:indptr[i + 1]]` and `data[indptr[i]:indptr[i + 1]]`. Keys without the feature are empty rows
+    and are flagged by `mask`.
+    """
+    indptr: np.ndarray
+    indices: np.ndarray
+    data: np.ndarray
+    shape: Tuple[int, int]
+    mask: np.ndarray
+
+    def to_scipy(self):
+        """Returns the batch as a `scipy.sparse.csr_matrix` without copying the arrays. Requires scipy."""
+        try:
+            from scipy.sparse import csr_matrix
+        except ImportError:
+            raise RuntimeError("scipy is required to convert sparse features to scipy matrices. Please install it by `pip install scipy`.")
+        return csr_matrix((self.data, self.indices, self.indptr), shape=self.shape)
+
+
+def _is_present(cell: Any) -> bool:
+    # cells are (oneof field name, value) tuples, missing features are kept as they are returned by the online store
+    return type(cell) is tuple and cell[1] is not None
+
+
+def _value_type(feature_name: str, cells: List[Any], present: List[int]) -> Optional[str]:
+    value_types = {cells[i][0] for i in present}
+    if len(value_types) > 1:
+        raise ValueError(f"Feature {feature_name} has values of different types {sorted(value_types)}, which can't be put into one array.")
+    return value_types.pop() if value_types else None
+
+
+def _flatten(cells: List[Any], present: List[int], item_count: int) -> Tuple[np.ndarray, List[Any]]:
+    """Concatenates the arrays of the present cells. Returns the offsets of each row, where missing rows are empty,
+    and the concatenated items.
+    """
+    lengths = np.zeros(item_count, dtype=np.int64)
+    lengths[present] = [len(cells[i][1]) for i in present]
+    offsets = np.zeros(item_count + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    return offsets, list(itertools.chain.from_iterable(cells[i][1] for i in present))
+
+
+def _sparse_parts(cells: List[Any], present: List[int]) -> Tuple[List[Any], List[Any]]:
+    index_cells = [(None, cells[i][1][0]) if i in present else None for i in range(len(cells))]
+    value_cells = [(None, cells[i][1][1]) if i in present else None for i in range(len(cells))]
+    return index_cells, value_cells
+
+
+def _column_to_numpy(feature_name: str, cells: List[Any]):
+    item_count = len(cells)
+    present = [i for i, cell in enumerate(cells) if _is_present(cell)]
+    value_type = _value_type(feature_name, cells, present)
+    if value_type is None:
+        return np.ma.masked_all(item_count, dtype=object)
+    dtype = NUMPY_DTYPES[value_type]
+    row_mask = np.ones(item_count, dtype=np.bool_)
+    row_mask[present] = False
+
+    if value_type.startswith('sparse_'):
+        present_set = set(present)
+        index_cells, value_cells = _sparse_parts(cells, present_set)
+        indptr, indices = _flatten(index_cells, present, item_count)
+        _, values = _flatten(value_cells, present, item_count)
+        indices = np.array(indices, dtype=np.int32)
+        shape = (item_count, int(indices.max()) + 1 if len(indices) else 0)
+        return SparseFeatureBatch(indptr, indices, np.array(values, dtype=dtype), shape, row_mask)
+
+    if value_type.endswith('_array'):
+        lengths = {len(cells[i][1]) for i in present}
+        if len(lengths) > 1:
+            # ragged arrays can't be stacked, so each row is an array of its own
+            data = np.empty(item_count, dtype=object)
+            for i in present:
+                data[i] = np.array(cells[i][1], dtype=dtype)
+            return np.ma.MaskedArray(data, mask=row_mask)
+        dim = lengths.pop()
+        data = np.zeros((item_count, dim), dtype=dtype) if dtype is not object else np.empty((item_count, dim), dtype=object)
+        _, items = _flatten(cells, present, item_count)
+        data[present] = np.array(items, dtype=dtype).reshape(len(present), dim)
+        return np.ma.MaskedArray(data, mask=np.repeat(row_mask[:, np.newaxis], dim, axis=1))
+
+    data = np.zeros(item_count, dtype=dtype) if dtype is not object else np.empty(item_count, dtype=object)
+    data[present] = [cells[i][1] for i in present]
+    return np.ma.MaskedArray(data, mask=row_mask)
+
+
+def _list_array(cells: List[Any], present: List[int], row_mask: np.ndarray, arrow_type: pa.DataType) -> pa.Array:
+    offsets, items = _flatten(cells, present, len(cells))
+    # null offsets make null lists, the last offset is always valid
+    offsets_mask = np.append(row_mask, False)
+    return pa.ListArray.from_arrays(pa.array(offsets.astype(np.int32), mask=offsets_mask), pa.array(items, type=arrow_type))
+
+
+def _column_to_arrow(feature_name: str, cells: List[Any]) -> pa.Array:
+    item_count = len(cells)
+    present = [i for i, cell in enumerate(cells) if _is_present(cell)]
+    value_type = _value_type(feature_name, cells, present)
+    if value_type is None:
+        return pa.nulls(item_count)
+    arrow_type = ARROW_TYPES[value_type]
+    row_mask = np.ones(item_count, dtype=np.bool_)
+    row_mask[present] = False
+
+    if value_type.startswith('sparse_'):
+        index_cells, value_cells = _sparse_parts(cells, set(present))
+        return pa.StructArray.from_arrays(
+            [_list_array(index_cells, present, row_mask, pa.int32()), _list_array(value_cells, present, row_mask, arrow_type)],
+            names=['indices', 'values'])
+    if value_type.endswith('_array'):
+        return _list_array(cells, present, row_mask, arrow_type)
+    values = [None] * item_count
+    for i in present:
+        values[i] = cells[i][1]
+    return pa.array(values, type=arrow_type)
+
+
+def rows_to_numpy(feature_names: List[str], rows: List[List[Any]]) -> Dict[str, Any]:
+    """Assembles the typed features of a batch of keys into one array per feature, ordered by the keys.
+
+    Scalars become 1-D masked arrays and dense arrays 2-D masked arrays, typed from the FeatureValue oneof field, where
+    the keys without the feature are masked. Dense arrays of different lengths become 1-D masked arrays of arrays.
+    Sparse arrays become `SparseFeatureBatch` in CSR layout.
+
+    Args:
+        feature_names: the requested feature names.
+        rows: features of each key as (oneof field name, value) tuples, ordered by the feature names.
+    """
+    return {feature_name: _column_to_numpy(feature_name, [row[i] for row in rows]) for i, feature_name in enumerate(feature_names)}
+
+
+def rows_to_arrow(keys: List[str], feature_names: List[str], rows: List[List[Any]]) -> pa.RecordBatch:
+    """Assembles the typed features of a batch of keys into an Arrow RecordBatch with a "key" column and one column per
+    feature. Dense arrays become list columns and sparse arrays struct columns of "indices" and "values" lists. Keys
+    without the feature are null.
+
+    Args:
+        keys: the requested keys, where composite keys are already joined.
+        feature_names: the requested feature names.
+        rows: features of each key as (oneof field name, value) tuples, ordered by the feature names.
+    """
+    columns = [pa.array(keys, type=pa.string())]
+    columns += [_column_to_arrow(feature_name, [row[i] for row in rows]) for i, feature_name in enumerate(feature_names)]
+    return pa.RecordBatch.from_arrays(columns, names=['key'] + list(feature_names))
@@ -0,0 +1,179 @@
+from collections import OrderedDict
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+# Marker for the features which are not found in the cache. `None` can't be used since missing features are cached as
+# `None` as well.
+CACHE_MISS = object()
+
+# Rough per-entry overhead in bytes of the cache bookkeeping, used to bound the memory of the cache.
+_ENTRY_OVERHEAD_BYTES = 64
+
+
+def _estimate_size(value: Any) -> int:
+    """Estimates the size of a decoded feature value in bytes."""
+    if value is None:
+        return 0
+    if isinstance(value, (bytes, str)):
+        return len(value)
+    if isinstance(value, (bool, int, float)):
+        return 8
+    if isinstance(value, tuple):
+        # sparse arrays are tuples of index array and value array
+        return sum(_estimate_size(v) for v in value)
+    try:
+        # dense arrays
+        return 8 * len(value)
+    except TypeError:
+        return 8
+
+
+class OnlineFeatureCache(object):
+    """In-process cache of decoded online feature values, keyed by (feature_table, key, feature_name).
+
+    The cache is bounded by the number of entries and optionally by the estimated size of the cached values. The least
+    recently used entries are evicted first. Each entry expires after the TTL of its feature table. Missing features are
+    cached as well, so that hot keys without values don't hit the online store either.
+
+    Note that the cached values are returned as they are, so callers should not modify them in place.
+
+    Attributes:
+        max_entries: maximum number of cached feature values.
+        max_bytes: maximum estimated size of the cached feature values in bytes. No limit if None.
+        ttl_sec: default time to live of the cached feature values in seconds. Never expire if None.
+        table_ttl_sec: time to live per feature table, which overrides `ttl_sec`.
+    """
+    def __init__(self, max_entries: int = 100000, max_bytes: Optional[int] = None, ttl_sec: Optional[float] = 60,
+                 table_ttl_sec: Optional[Dict[str, float]] = None):
+        if max_entries <= 0:
+            raise ValueError(f"max_entries should be greater than 0, but got {max_entries}")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_sec = ttl_sec
+        self.table_ttl_sec = table_ttl_sec or {}
+        # (feature_table, key, feature_name) -> (value, expire time, size)
+        self._entries: "OrderedDict[Tuple[str, str, str], Tuple[Any, float, int]]" = OrderedDict()
+        # feature_table -> key -> cached feature names, so that invalidation doesn't scan all the entries
+        self._index: Dict[str, Dict[str, Set[str]]] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._hits: Dict[str, int] = {}
+        self._misses: Dict[str, int] = {}
+        self._evictions = 0
+
+    def get_many(self, feature_table: str, key: str, feature_names: List[str]) -> List[Any]:
+        """Gets the cached values of the features of a key. `CACHE_MISS` is returned for the features which are not
+        cached or have expired.
+        """
+        now = time.monotonic()
+        result = []
+        hits = 0
+        with self._lock:
+            for feature_name in feature_names:
+                cache_key = (feature_table, key, feature_name)
+                entry = self._entries.get(cache_key)
+                if entry is None:
+                    result.append(CACHE_MISS)
+                elif entry[1] <= now:
+                    self._remove(cache_key)
+                    result.append(CACHE_MISS)
+                else:
+                    self._entries.move_to_end(cache_key)
+                    result.append(entry[0])
+                    hits += 1
+            self._hits[feature_table] = self._hits.get(feature_table, 0) + hits
+            self._misses[feature_table] = self._misses.get(feature_table, 0) + len(feature_names) - hits
+        return result
+
+    def put_many(self, feature_table: str, key: str, feature_names: List[str], values: List[Any]):
+        """Caches the values of the features of a key, evicting the least recently used entries if needed."""
+        ttl_sec = self.table_ttl_sec.get(feature_table, self.ttl_sec)
+        expire_time = time.monotonic() + ttl_sec if ttl_sec is not None else float("inf")
+        with self._lock:
+            for feature_name, value in zip(feature_names, values):
+                cache_key = (feature_table, key, feature_name)
+                if cache_key in self._entries:
+                    self._remove(cache_key)
+                size = _estimate_size(value) + len(key) + len(feature_name) + _ENTRY_OVERHEAD_BYTES
+                self._entries[cache_key] = (value, expire_time, size)
+                self._index.setdefault(feature_table, {}).setdefault(key, set()).add(feature_name)
+                self._bytes += size
+            while len(self._entries) > self.max_entries or (self.max_bytes is not None and self._bytes > self.max_bytes and self._entries):
+                self._remove(next(iter(self._entries)))
+                self._evictions += 1
+
+    def invalidate(self, feature_table: str, key: Optional[str] = None, feature_name: Optional[str] = None):
+        """Removes the cached values of a feature table. If key and/or feature name are set, only the matching
+        entries are removed.
+        """
+        with self._lock:
+            for cache_key in self._matching(feature_table, key, feature_name):
+                self._remove(cache_key)
+
+    def expire(self, feature_table: str, ttl_sec: float, key: Optional[str] = None, feature_name: Optional[str] = None):
+        """Makes the cached values of a feature table expire in `ttl_sec` at the latest, the same as their time to live
+        in the online store. If key and/or feature name are set, only the matching entries are expired.
+        """
+        expire_time = time.monotonic() + ttl_sec
+        with self._lock:
+            for cache_key in self._matching(feature_table, key, feature_name):
+                value, entry_expire_time, size = self._entries[cache_key]
+                if ttl_sec <= 0:
+                    self._remove(cache_key)
+                elif expire_time < entry_expire_time:
+                    self._entries[cache_key] = (value, expire_time, size)
+
+    def clear(self):
+        """Removes all the cached values and resets the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._index.clear()
+            self._bytes = 0
+            self._hits.clear()
+            self._misses.clear()
+            self._evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns the hit/miss counters in total and per feature table, as well as the current size of the cache."""
+        with self._lock:
+            tables = set(self._hits) | set(self._misses)
+            return {
+                "hits": sum(self._hits.values()),
+                "misses": sum(self._misses.values()),
+                "evictions": self._evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "tables": {table: {"hits": self._hits.get(table, 0), "misses": self._misses.get(table, 0)} for table in tables},
+            }
+
+    def _matching(self, feature_table: str, key: Optional[str], feature_name: Optional[str]) -> List[Tuple[str, str, str]]:
+        """Returns the cache keys of the entries matching a feature table and optionally a key and a feature name. Must
+        be called with the lock held.
+        """
+        table_index = self._index.get(feature_table)
+        if table_index is None:
+            return []
+        cache_keys = []
+        for k in ([key] if key is not None else list(table_index)):
+            feature_names = table_index.get(k)
+            if feature_names is None:
+                continue
+            if feature_name is not None:
+                if feature_name in feature_names:
+                    cache_keys.append((feature_table, k, feature_name))
+            else:
+                cache_keys.extend((feature_table, k, name) for name in feature_names)
+        return cache_keys
+
+    def _remove(self, cache_key: Tuple[str, str, str]):
+        _, _, size = self._entries.pop(cache_key)
+        self._bytes -= size
+        feature_table, key, feature_name = cache_key
+        table_index = self._index[feature_table]
+        feature_names = table_index[key]
+        feature_names.discard(feature_name)
+        if not feature_names:
+            del table_index[key]
+            if not table_index:
+                del self._index[feature_table]
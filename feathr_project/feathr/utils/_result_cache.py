@@ -0,0 +1,140 @@
+from contextlib import contextmanager
+import hashlib
+import os
+import shutil
+from pathlib import Path
+from typing import Iterator, List, Tuple
+
+from loguru import logger
+
+try:
+    import fcntl
+except ImportError:
+    # no file locks on Windows, where the cache is meant to be used by a single process at a time
+    fcntl = None
+
+# Hidden file in each cache entry, whose modification time is the last time the entry was used
+_LAST_ACCESS_FILE = ".last_access"
+# Hidden file in each cache entry with the result URL, to make the cache directory easier to inspect
+_URL_FILE = ".url"
+# Hidden directory of the lock files of the entries. The lock files are kept outside the entries, so that removing an
+# entry never removes a lock file another process is waiting on.
+_LOCKS_DIR = ".locks"
+
+
+@contextmanager
+def _file_lock(path: str, shared: bool = False, blocking: bool = True) -> Iterator[bool]:
+    """Locks a file across processes, and yields whether the lock is acquired, which can only be False if not
+    `blocking`.
+    """
+    if fcntl is None:
+        yield True
+        return
+    with open(path, "a") as f:
+        operation = fcntl.LOCK_SH if shared else fcntl.LOCK_EX
+        try:
+            fcntl.flock(f, operation if blocking else operation | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class _ResultCache(object):
+    """Local cache of the downloaded job results, so that reading the same result again doesn't download it again.
+
+    Each result URL gets its own directory under `cache_dir`, named by the hash of the URL. Results are downloaded
+    into it by the Spark job launchers, which skip the files that are unchanged since the last download, i.e. with
+    the same size and modification time in the cloud, and remove the local files which are not in the result
+    anymore. So an entry is always validated against the current result files, and a rewritten result is downloaded
+    again.
+
+    Once the cache exceeds `max_size_bytes`, the least recently used entries are removed.
+
+    The cache can be shared by processes. Each entry has two file locks: a use lock, held in shared mode while the
+    entry is downloaded into or read and in exclusive mode while it's removed, so that entries in use are never
+    removed, and a download lock, which serializes the downloads into the same entry.
+
+    Attributes:
+        cache_dir: the root directory of the cache.
+        max_size_bytes: maximum total size of the cached results.
+    """
+    def __init__(self, cache_dir: str, max_size_bytes: int):
+        self.cache_dir = os.path.expanduser(cache_dir)
+        self.max_size_bytes = max_size_bytes
+
+    @contextmanager
+    def use_entry(self, res_url: str) -> Iterator[str]:
+        """Yields the directory of the cached result of a URL, marks it as used, and keeps it from being removed until
+        the context exits.
+        """
+        name = hashlib.sha256(res_url.encode("utf-8")).hexdigest()[:32]
+        with _file_lock(self._lock_path(name, "use"), shared=True):
+            path = os.path.join(self.cache_dir, name)
+            os.makedirs(path, exist_ok=True)
+            Path(path, _URL_FILE).write_text(res_url)
+            Path(path, _LAST_ACCESS_FILE).touch()
+            yield path
+
+    @contextmanager
+    def download_lock(self, path: str) -> Iterator[None]:
+        """Keeps other processes from downloading into the entry at `path` until the context exits."""
+        with _file_lock(self._lock_path(os.path.basename(path), "download")):
+            yield
+
+    def evict(self, keep: str = None) -> int:
+        """Removes the least recently used entries until the cache fits in `max_size_bytes`. The entry at `keep` and
+        the entries in use are never removed, even if they are larger than the limit.
+
+        Returns:
+            int: number of removed entries.
+        """
+        entries = self._entries()
+        total_size = sum(size for _, _, size in entries)
+        evicted = 0
+        for path, _, size in sorted(entries, key=lambda entry: entry[1]):
+            if total_size <= self.max_size_bytes:
+                break
+            if keep is not None and os.path.abspath(path) == os.path.abspath(keep):
+                continue
+            if self._remove(path):
+                logger.info("Removed {} from the result cache", path)
+                total_size -= size
+                evicted += 1
+        if total_size > self.max_size_bytes:
+            logger.warning(f"The result cache at {self.cache_dir} is larger than its limit of {self.max_size_bytes} bytes.")
+        return evicted
+
+    def clear(self):
+        """Removes all the cached results, except the ones in use."""
+        for path, _, _ in self._entries():
+            self._remove(path)
+
+    def _remove(self, path: str) -> bool:
+        """Removes an entry unless it's in use, and returns whether it's removed."""
+        with _file_lock(self._lock_path(os.path.basename(path), "use"), blocking=False) as locked:
+            if locked:
+                shutil.rmtree(path, ignore_errors=True)
+            return locked
+
+    def _lock_path(self, name: str, kind: str) -> str:
+        locks_dir = os.path.join(self.cache_dir, _LOCKS_DIR)
+        os.makedirs(locks_dir, exist_ok=True)
+        return os.path.join(locks_dir, f"{name}.{kind}")
+
+    def _entries(self) -> List[Tuple[str, float, int]]:
+        """Returns the path, last access time and size of each entry."""
+        if not os.path.isdir(self.cache_dir):
+            return []
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if not entry.is_dir() or entry.name == _LOCKS_DIR:
+                continue
+            last_access_path = os.path.join(entry.path, _LAST_ACCESS_FILE)
+            last_access = os.path.getmtime(last_access_path) if os.path.exists(last_access_path) else 0
+            size = sum(f.stat().st_size for f in Path(entry.path).rglob("*") if f.is_file())
+            entries.append((entry.path, last_access, size))
+        return entries
@@ -1,14 +1,26 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from itertools import islice
+import os
 from pathlib import Path
 from tempfile import TemporaryDirectory
-from typing import Union, Set
+from typing import Callable, Iterator, List, Optional, Union, Set, Tuple
 
 from loguru import logger
 import pandas as pd
+import pyarrow as pa
 import re
 from pyspark.sql import DataFrame, SparkSession
 
 from feathr.client import FeathrClient
-from feathr.constants import OUTPUT_FORMAT
+from feathr.constants import (
+    DEFAULT_RESULT_BATCH_SIZE,
+    DEFAULT_RESULT_CACHE_DIR,
+    DEFAULT_RESULT_CACHE_MAX_SIZE_MB,
+    MB_BYTES,
+    OUTPUT_FORMAT,
+)
+from feathr.utils._result_cache import _ResultCache
 from feathr.utils.platform import is_databricks
 from feathr.spark_provider._synapse_submission import _DataLakeFiler
 
@@ -27,7 +39,7 @@ def get_result_pandas_df(
         res_url: Result URL to download files from. Note that this will not block the job so you need to make sure
             the job is finished and the result URL contains actual data. Default to use client's job tags if exists.
         local_cache_path (optional): Specify the absolute download path. if the user does not provide this,
-            the function will create a temporary directory.
+            the result is downloaded into the local result cache, or a temporary directory if the cache is disabled.
 
     Returns:
         pandas DataFrame
@@ -52,7 +64,7 @@ def get_result_spark_df(
         res_url: Result URL to download files from. Note that this will not block the job so you need to make sure
             the job is finished and the result URL contains actual data. Default to use client's job tags if exists.
         local_cache_path (optional): Specify the absolute download path. if the user does not provide this,
-            the function will create a temporary directory.
+            the result is downloaded into the local result cache, or a temporary directory if the cache is disabled.
 
     Returns:
         Spark DataFrame
@@ -73,9 +85,14 @@ def get_result_df(
     local_cache_path: str = None,
     spark: SparkSession = None,
     format: str = None,
-    is_file_path: bool = False
-) -> Union[DataFrame, pd.DataFrame]:
-    """Download the job result dataset from cloud as a Spark DataFrame or pandas DataFrame.
+    is_file_path: bool = False,
+    num_workers: int = None,
+    use_processes: bool = False,
+    output: str = "pandas",
+    columns: List[str] = None,
+    filter: "pyarrow.compute.Expression" = None,
+) -> Union[DataFrame, pd.DataFrame, pa.Table]:
+    """Download the job result dataset from cloud as a Spark DataFrame, pandas DataFrame or pyarrow Table.
 
     Args:
         client: Feathr client
@@ -84,18 +101,93 @@ def get_result_df(
         res_url: Result URL to download files from. Note that this will not block the job so you need to make sure
             the job is finished and the result URL contains actual data. Default to use client's job tags if exists.
         local_cache_path (optional): Specify the absolute download directory. if the user does not provide this,
-            the function will create a temporary directory.
+            the result is downloaded into the local result cache, or a temporary directory if the cache is disabled.
         spark (optional): Spark session. If provided, the function returns spark Dataframe.
-            Otherwise, it returns pd.DataFrame.
+            Otherwise, it returns pd.DataFrame. Spark reads the files lazily, so the result is then downloaded into a
+            temporary directory rather than the result cache, whose entries can be evicted by other processes.
         format: An alias for `data_format` (for backward compatibility).
         is_file: If 'res_url' is a single file or a directory. Default as False
+        num_workers (optional): Number of workers to read the part files into pandas DataFrame. Default to the
+            number of CPUs. Set it to 1 to read the files one after another.
+        use_processes (optional): Read the avro and csv part files on a process pool instead of a thread pool,
+            which scales better with the number of CPUs when decoding is the bottleneck. Default as False
+        output (optional): "pandas" to return a pandas DataFrame, or "arrow" to return a pyarrow Table, which skips
+            the conversion to pandas. Ignored if `spark` is provided.
+        columns (optional): Names of the columns to read. Default to read all the columns.
+        filter (optional): pyarrow expression of the rows to read, e.g. `pyarrow.compute.field("x") > 0`. Not
+            supported with `spark`.
 
     Returns:
-        Either Spark or pandas DataFrame.
+        Either Spark or pandas DataFrame, or pyarrow Table.
     """
     if format is not None:
         data_format = format
+    if output not in ("pandas", "arrow"):
+        raise ValueError(f"Unsupported output {output}, must be one of pandas, arrow.")
+    if spark is not None and filter is not None:
+        raise ValueError("`filter` is not supported when loading the result into a Spark DataFrame. Please use DataFrame.filter instead.")
 
+    with _download_result(
+        client=client,
+        data_format=data_format,
+        res_url=res_url,
+        local_cache_path=local_cache_path,
+        to_pandas=spark is None,
+        is_file_path=is_file_path,
+        use_cache=spark is None,
+    ) as (local_cache_path, data_format):
+        result_df = None
+        try:
+            if spark is not None:
+                if data_format == "csv":
+                    result_df = spark.read.option("header", True).csv(local_cache_path)
+                else:
+                    result_df = spark.read.format(data_format).load(local_cache_path)
+                if columns is not None:
+                    result_df = result_df.select(columns)
+            elif output == "arrow" or columns is not None or filter is not None:
+                result_df = _load_files_to_arrow_table(
+                    dir_path=local_cache_path.replace("dbfs:", "/dbfs"),
+                    data_format=data_format,
+                    columns=columns,
+                    filter=filter,
+                    num_workers=num_workers,
+                )
+                if output == "pandas":
+                    # the table is not used afterwards, so its buffers are released while converting
+                    result_df = result_df.to_pandas(split_blocks=True, self_destruct=True)
+            else:
+                result_df = _load_files_to_pandas_df(
+                    dir_path=local_cache_path.replace("dbfs:", "/dbfs"),  # replace to python path if spark path is provided.
+                    data_format=data_format,
+                    num_workers=num_workers,
+                    use_processes=use_processes,
+                )
+        except Exception as e:
+            logger.error(f"Failed to load result files from {local_cache_path} with format {data_format}.")
+            raise e
+
+        return result_df
+
+
+@contextmanager
+def _download_result(
+    client: FeathrClient,
+    data_format: str,
+    res_url: str,
+    local_cache_path: str,
+    to_pandas: bool,
+    is_file_path: bool,
+    use_cache: bool = True,
+) -> Iterator[Tuple[str, str]]:
+    """Resolves the data format and downloads the job result files if they are not local. A result downloaded into
+    the result cache is kept from being evicted by other processes until the context exits, so the files must be read
+    within it. Results read lazily after the context exits must not `use_cache`, so that they are downloaded into a
+    temporary directory instead.
+
+    Returns:
+        Context of the tuple of the path of the result files and the lower cased data format.
+    """
     if data_format is None:
         # May use data format from the job tags
         if client.get_job_tags() and client.get_job_tags().get(OUTPUT_FORMAT):
@@ -109,7 +201,7 @@ def get_result_df(
         raise RuntimeError(f"The function is called from Databricks but the client.spark_runtime is {client.spark_runtime}.")
 
     # TODO Loading Synapse Delta table result into pandas has a bug: https://github.com/delta-io/delta-rs/issues/582
-    if not spark and client.spark_runtime == "azure_synapse" and data_format == "delta":
+    if to_pandas and client.spark_runtime == "azure_synapse" and data_format == "delta":
         raise RuntimeError(f"Loading Delta table result from Azure Synapse into pandas DataFrame is not supported. You maybe able to use spark DataFrame to load the result instead.")
 
     # use a result url if it's provided by the user, otherwise use the one provided by the job
@@ -140,30 +232,136 @@ def get_result_df(
                 )
             local_cache_path = res_url
 
+    result_cache = _get_result_cache(client) if local_cache_path is None and use_cache else None
+    if result_cache:
+        with result_cache.use_entry(res_url) as local_cache_path:
+            logger.info(f"{res_url} files will be downloaded into {local_cache_path}")
+            with result_cache.download_lock(local_cache_path):
+                # files of a previous version of the result are removed from the cache entry
+                client.feathr_spark_launcher.download_result(result_path=res_url, local_folder=local_cache_path, is_file_path=is_file_path, prune=True)
+            result_cache.evict(keep=local_cache_path)
+            yield local_cache_path, data_format
+        return
+
     if local_cache_path is None:
         local_cache_path = TemporaryDirectory().name
-
     if local_cache_path != res_url:
         logger.info(f"{res_url} files will be downloaded into {local_cache_path}")
         client.feathr_spark_launcher.download_result(result_path=res_url, local_folder=local_cache_path, is_file_path = is_file_path)
 
-    result_df = None
-    try:
-        if spark is not None:
-            if data_format == "csv":
-                result_df = spark.read.option("header", True).csv(local_cache_path)
+    yield local_cache_path, data_format
+
+
+def _get_result_cache(client: FeathrClient) -> Optional[_ResultCache]:
+    """Returns the local cache of the downloaded results, or None if it's disabled by a size limit of 0."""
+    max_size_mb = float(client.env_config.get("spark_config__result_cache_max_size_mb") or DEFAULT_RESULT_CACHE_MAX_SIZE_MB)
+    if max_size_mb <= 0:
+        return None
+    cache_dir = client.env_config.get("spark_config__result_cache_dir") or DEFAULT_RESULT_CACHE_DIR
+    return _ResultCache(cache_dir=cache_dir, max_size_bytes=int(max_size_mb * MB_BYTES))
+
+
+def clear_result_cache(client: FeathrClient):
+    """Removes all the job results cached by `get_result_df` and `iter_result_batches`.
+
+    Args:
+        client: Feathr client
+    """
+    result_cache = _get_result_cache(client)
+    if result_cache:
+        result_cache.clear()
+
+
+def iter_result_batches(
+    client: FeathrClient,
+    data_format: str = None,
+    res_url: str = None,
+    local_cache_path: str = None,
+    batch_size: int = DEFAULT_RESULT_BATCH_SIZE,
+    output: str = "pandas",
+    is_file_path: bool = False,
+) -> Iterator[Union[pd.DataFrame, pa.RecordBatch]]:
+    """Download the job result dataset from cloud and iterate over it in batches, instead of loading it as a whole like
+    `get_result_df` does. Part files are read one after another, and each of them is read in batches of up to
+    `batch_size` rows, so results larger than the memory can be streamed, e.g. into a training loop.
+
+    Args:
+        client: Feathr client
+        data_format: Format to read the downloaded files. Currently support `parquet`, `delta`, `avro`, and `csv`.
+            Default to use client's job tags if exists.
+        res_url: Result URL to download files from. Note that this will not block the job so you need to make sure
+            the job is finished and the result URL contains actual data. Default to use client's job tags if exists.
+        local_cache_path (optional): Specify the absolute download directory. if the user does not provide this,
+            the result is downloaded into the local result cache, or a temporary directory if the cache is disabled.
+        batch_size (optional): Maximum number of rows per batch.
+        output (optional): "pandas" to yield pandas DataFrames, or "arrow" to yield pyarrow RecordBatches.
+        is_file_path: If 'res_url' is a single file or a directory. Default as False
+
+    Returns:
+        Iterator of pandas DataFrames or pyarrow RecordBatches.
+    """
+    if output not in ("pandas", "arrow"):
+        raise ValueError(f"Unsupported output {output}, must be one of pandas, arrow.")
+    with _download_result(
+        client=client,
+        data_format=data_format,
+        res_url=res_url,
+        local_cache_path=local_cache_path,
+        to_pandas=True,
+        is_file_path=is_file_path,
+    ) as (local_cache_path, data_format):
+        for batch in _iter_files_batches(
+            path=local_cache_path.replace("dbfs:", "/dbfs"),  # replace to python path if spark path is provided.
+            data_format=data_format,
+            batch_size=batch_size,
+        ):
+            if output == "arrow":
+                yield batch if isinstance(batch, pa.RecordBatch) else pa.RecordBatch.from_pandas(batch, preserve_index=False)
             else:
-                result_df = spark.read.format(data_format).load(local_cache_path)
-        else:
-            result_df = _load_files_to_pandas_df(
-                dir_path=local_cache_path.replace("dbfs:", "/dbfs"),  # replace to python path if spark path is provided.
-                data_format=data_format,
-            )
-    except Exception as e:
-        logger.error(f"Failed to load result files from {local_cache_path} with format {data_format}.")
-        raise e
-    
-    return result_df
+                yield batch.to_pandas() if isinstance(batch, pa.RecordBatch) else batch
+
+
+def _list_part_files(path: str, suffix: str) -> List[Path]:
+    """Lists the part files of a result in a deterministic order."""
+    if Path(path).is_file():
+        return [Path(path)]
+    return sorted(Path(path).glob(f"*{suffix}"))
+
+
+def _iter_files_batches(path: str, data_format: str, batch_size: int) -> Iterator[Union[pd.DataFrame, pa.RecordBatch]]:
+    """Reads the result files in batches, either as pyarrow RecordBatches or pandas DataFrames, whichever is native to
+    the reader of the data format.
+    """
+    if data_format == "parquet":
+        import pyarrow.dataset as ds
+        yield from ds.dataset(path, format="parquet").to_batches(batch_size=batch_size)
+
+    elif data_format == "delta":
+        from deltalake import DeltaTable
+        yield from DeltaTable(path).to_pyarrow_dataset().to_batches(batch_size=batch_size)
+
+    elif data_format == "avro":
+        import fastavro
+        for file_path in _list_part_files(path, ".avro"):
+            with open(file_path, "rb") as f:
+                records = []
+                for record in fastavro.reader(f):
+                    records.append(record)
+                    if len(records) >= batch_size:
+                        yield pd.DataFrame.from_records(records)
+                        records = []
+                if records:
+                    yield pd.DataFrame.from_records(records)
+
+    elif data_format == "csv":
+        for file_path in _list_part_files(path, ".csv"):
+            yield from pd.read_csv(file_path, chunksize=batch_size)
+
+    else:
+        raise ValueError(
+            f"{data_format} is currently not supported in iter_result_batches. Currently only parquet, delta, avro, and csv are supported, please consider writing a customized function to read the result."
+        )
+
 
 def copy_cloud_dir(client: FeathrClient, source_url: str, target_url: str = None):
     source_url: str = source_url or client.get_job_result_uri(block=True, timeout_sec=1200)
@@ -177,10 +375,14 @@ def copy_cloud_dir(client: FeathrClient, source_url: str, target_url: str = None
 def cloud_dir_exists(client: FeathrClient, dir_path: str) -> bool:
     return client.feathr_spark_launcher.cloud_dir_exists(dir_path)
 
-def _load_files_to_pandas_df(dir_path: str, data_format: str = "avro") -> pd.DataFrame:
+def _load_files_to_pandas_df(dir_path: str, data_format: str = "avro", num_workers: int = None,
+                             use_processes: bool = False) -> pd.DataFrame:
 
     if data_format == "parquet":
-        return pd.read_parquet(dir_path)
+        import pyarrow.parquet as pq
+        # Arrow reads the row groups of all the part files on its own thread pool
+        use_threads = num_workers != 1
+        return pq.read_table(dir_path, use_threads=use_threads).to_pandas(use_threads=use_threads)
 
     elif data_format == "delta":
         from deltalake import DeltaTable
@@ -189,28 +391,105 @@ def _load_files_to_pandas_df(dir_path: str, data_format: str = "avro") -> pd.Dat
 
     elif data_format == "avro":
         import pandavro as pdx
-        if Path(dir_path).is_file():
-            return pdx.read_avro(dir_path)
-        else:
-            try:
-                return pd.concat([pdx.read_avro(f) for f in Path(dir_path).glob("*.avro")]).reset_index(drop=True)
-            except ValueError:  # No object to concat when the dir is empty
-                return pd.DataFrame()
+        return _load_part_files(dir_path, ".avro", pdx.read_avro, num_workers, use_processes)
 
     elif data_format == "csv":
-        if Path(dir_path).is_file():
-            return pd.read_csv(dir_path)
-        else:
-            try:
-                return pd.concat([pd.read_csv(f) for f in Path(dir_path).glob("*.csv")]).reset_index(drop=True)
-            except ValueError:  # No object to concat when the dir is empty
-                return pd.DataFrame()
+        return _load_part_files(dir_path, ".csv", pd.read_csv, num_workers, use_processes)
 
     else:
         raise ValueError(
             f"{data_format} is currently not supported in get_result_df. Currently only parquet, delta, avro, and csv are supported, please consider writing a customized function to read the result."
         )
-            
+
+
+def _load_files_to_arrow_table(dir_path: str, data_format: str = "avro", columns: List[str] = None,
+                               filter: "pyarrow.compute.Expression" = None, num_workers: int = None) -> pa.Table:
+    """Reads the result files as a pyarrow dataset and materializes only the given columns and rows. Projection and
+    filter are pushed down to the readers of parquet, delta and csv, and the local files are memory-mapped. Avro records
+    are projected and filtered in batches while they are decoded.
+    """
+    import pyarrow.dataset as ds
+    from pyarrow.fs import LocalFileSystem, SubTreeFileSystem
+
+    filesystem = LocalFileSystem(use_mmap=True)
+    if data_format in ("parquet", "csv"):
+        dataset = ds.dataset(str(Path(dir_path).absolute()), format=data_format, filesystem=filesystem)
+
+    elif data_format == "delta":
+        from deltalake import DeltaTable
+        dataset = DeltaTable(dir_path).to_pyarrow_dataset(
+            filesystem=SubTreeFileSystem(str(Path(dir_path).absolute()), filesystem),
+        )
+
+    elif data_format == "avro":
+        # there is no avro reader in pyarrow, so the records are decoded by fastavro, and only the selected columns and
+        # rows of each batch of records are kept
+        import fastavro
+
+        def read_tables(file_path: Path) -> List[pa.Table]:
+            tables = []
+            with open(file_path, "rb") as f:
+                records = fastavro.reader(f)
+                while True:
+                    batch = list(islice(records, DEFAULT_RESULT_BATCH_SIZE))
+                    if not batch:
+                        return tables
+                    if columns is not None and filter is None:
+                        # the other columns are not even converted to arrow
+                        missing_columns = [column for column in columns if column not in batch[0]]
+                        if missing_columns:
+                            raise ValueError(f"Columns {missing_columns} are not in the result {file_path}.")
+                        batch = [{column: record[column] for column in columns} for record in batch]
+                    tables.append(ds.dataset(pa.Table.from_pylist(batch)).to_table(columns=columns, filter=filter))
+
+        part_files = _list_part_files(dir_path, ".avro")
+        with ThreadPoolExecutor(max_workers=num_workers or os.cpu_count() or 1) as executor:
+            tables = [table for file_tables in executor.map(read_tables, part_files) for table in file_tables]
+        return _concat_inferred_tables(tables)
+
+    else:
+        raise ValueError(
+            f"{data_format} is currently not supported in get_result_df. Currently only parquet, delta, avro, and csv are supported, please consider writing a customized function to read the result."
+        )
+
+    return dataset.to_table(columns=columns, filter=filter, use_threads=num_workers != 1)
+
+
+def _concat_inferred_tables(tables: List[pa.Table]) -> pa.Table:
+    """Concatenates tables whose types are inferred separately, where a column which is all null in some of them is
+    inferred as the null type, so that they are cast to the first non-null type of each column first.
+    """
+    if not tables:
+        return pa.table({})
+    fields = {}
+    for table in tables:
+        for field in table.schema:
+            if field.name not in fields or pa.types.is_null(fields[field.name].type):
+                fields[field.name] = field
+    schema = pa.schema([fields[name] for name in tables[0].schema.names])
+    return pa.concat_tables([table if table.schema == schema else table.cast(schema) for table in tables])
+
+
+def _load_part_files(dir_path: str, suffix: str, read_file: Callable[[Path], pd.DataFrame], num_workers: int = None,
+                     use_processes: bool = False) -> pd.DataFrame:
+    """Reads the part files of a result on a worker pool and concatenates them in the order of the file names, so
+    that the row order doesn't depend on which worker finishes first.
+    """
+    part_files = _list_part_files(dir_path, suffix)
+    if not part_files:
+        return pd.DataFrame()
+    if len(part_files) == 1:
+        return read_file(part_files[0])
+    num_workers = min(num_workers or os.cpu_count() or 1, len(part_files))
+    if num_workers == 1:
+        dfs = [read_file(f) for f in part_files]
+    else:
+        executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        with executor_class(max_workers=num_workers) as executor:
+            dfs = list(executor.map(read_file, part_files))
+    return pd.concat(dfs).reset_index(drop=True)
+
+
 def get_cloud_file_column_names(client: FeathrClient, path: str, format: str = "csv", is_file_path = True)->Set[str]:
     # Try to load publid cloud files without credential
     if path.startswith(("abfss:","wasbs:")):
@@ -218,6 +218,23 @@ def start():
     run_jar()
 
 
+@cli.command()
+@click.option('--config', default='feathr_config.yaml', help='Path of the Feathr config with the online store settings.')
+@click.option('--host', default='0.0.0.0', help='Host to listen on.')
+@click.option('--port', default=8000, type=int, help='Port to listen on.')
+def serve(config, host, port):
+    """
+    Starts a standalone online feature server, which serves batched online feature reads over HTTP.
+
+    POST /v1/online_features with {"feature_table": ..., "keys": [...], "feature_names": [...]} to read features, and
+    GET /metrics for request counters and p50/p99 latencies.
+    """
+    from feathr.serving import serve as serve_online_features
+
+    click.echo(click.style(f'Starting the Feathr online feature server on {host}:{port} with config: {config}', fg='green'))
+    serve_online_features(config_path=config, host=host, port=port)
+
+
 @cli.command()
 @click.option('--features', prompt='Your feature names, separated by comma', help='The feature name.')
 def test(features):
@@ -50,6 +50,19 @@ def test_feature_materialization_config():
         """
     assert ''.join(config.split()) == ''.join(expected_config.split())
 
+def test_feature_materialization_binary_encoding_config():
+    backfill_time = BackfillTime(start=datetime(2020, 5, 20), end=datetime(2020, 5,20), step=timedelta(days=1))
+    redisSink = RedisSink(table_name="nycTaxiDemoFeature", encoding="binary", packed=True)
+    settings = MaterializationSettings("nycTaxiTable",
+                                        sinks=[redisSink],
+                                        feature_names=["f_location_avg_fare"],
+                                        backfill_time=backfill_time)
+    config = ''.join(_to_materialization_config(settings).split())
+    assert 'encoding:binary' in config
+    assert 'packed:true' in config
+    with pytest.raises(ValueError):
+        RedisSink(table_name="nycTaxiDemoFeature", encoding="hex")
+
 def test_feature_materialization_offline_config():
     backfill_time = BackfillTime(start=datetime(2020, 5, 20), end=datetime(2020, 5,20), step=timedelta(days=1))
     offlineSink = HdfsSink(output_path="abfss://feathrazuretest3fs@feathrazuretest3storage.dfs.core.windows.net/demo_data/output/hdfs_test.avro")
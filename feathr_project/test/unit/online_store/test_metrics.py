@@ -0,0 +1,48 @@
+from feathr.online_store import OnlineReadEvent, OnlineReadMetrics
+
+
+def _event(feature_table: str = "table", network_sec: float = 0.003, fetched_count: int = 4, null_count: int = 1) -> OnlineReadEvent:
+    return OnlineReadEvent(
+        feature_table=feature_table,
+        key_count=2,
+        feature_count=4,
+        cache_hits=4 - fetched_count,
+        fetched_count=fetched_count,
+        null_count=null_count,
+        payload_bytes=30,
+        network_sec=network_sec,
+        decode_sec=0.0001,
+        total_sec=network_sec + 0.0002,
+    )
+
+
+def test__online_read_metrics():
+    metrics = OnlineReadMetrics(buckets_ms=(1, 5, float("inf")))
+    metrics(_event())
+    metrics(_event(network_sec=0.01))
+    # reads fully served from the cache have no network and decode time
+    metrics(_event(fetched_count=0, null_count=0))
+    metrics(_event(feature_table="other"))
+
+    snapshot = metrics.snapshot()
+
+    table = snapshot["table"]
+    assert table["reads"] == 3
+    assert table["keys"] == 6
+    assert table["cache_hits"] == 4
+    assert table["null_rate"] == 0.25
+    assert table["payload_bytes"] == 90
+    assert table["network_latency"]["count"] == 2
+    assert table["network_latency"]["buckets"] == {"1": 0, "5": 1, "inf": 2}
+    assert table["network_latency"]["p50_ms"] == 5
+    assert table["decode_latency"]["p99_ms"] == 1
+    assert table["total_latency"]["count"] == 3
+    assert snapshot["other"]["reads"] == 1
+
+    prometheus = metrics.to_prometheus()
+    assert 'feathr_online_read_reads_total{feature_table="table"} 3' in prometheus
+    assert 'feathr_online_read_network_latency_ms_bucket{feature_table="table",le="+Inf"} 2' in prometheus
+
+    metrics.reset()
+    assert metrics.snapshot() == {}
+    assert metrics.to_prometheus() == ""
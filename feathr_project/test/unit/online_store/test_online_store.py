@@ -0,0 +1,226 @@
+import asyncio
+import base64
+from pathlib import Path
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+from feathr import FeathrClient
+from feathr.online_store import CoalescingOnlineStore, InMemoryOnlineStore, RedisOnlineStore
+from feathr.online_store._packed_row import PACKED_FIELD, pack_row, unpack_all, unpack_row
+from feathr.protobuf.featureValue_pb2 import FeatureValue
+
+
+def _encode(**kwargs) -> bytes:
+    return base64.b64encode(FeatureValue(**kwargs).SerializeToString())
+
+
+def test__in_memory_online_store():
+    store = InMemoryOnlineStore()
+    store.multi_put("table", {"1": {"f1": b"a", "f2": b"b"}, "2": {"f1": b"c"}})
+    store.multi_put("table", {"1": {"f2": b"d"}})
+
+    assert store.multi_get("table", [("1", ["f1", "f2"]), ("2", ["f2"]), ("3", ["f1"])]) == [[b"a", b"d"], [None], [None]]
+    assert store.multi_get("other_table", [("1", ["f1"])]) == [[None]]
+    assert asyncio.run(store.amulti_get("table", [("2", ["f1"])])) == [[b"c"]]
+
+    store.delete_table("table")
+    assert store.multi_get("table", [("1", ["f1"])]) == [[None]]
+
+
+def test__redis_online_store__multi_put():
+    redis_client = MagicMock()
+    pipeline = redis_client.pipeline.return_value.__enter__.return_value
+    store = RedisOnlineStore(redis_client, pipeline_chunk_size=1)
+
+    store.multi_put("table", {"1": {"f1": b"a"}, "2": {"f1": b"b"}})
+
+    assert pipeline.execute.call_count == 2
+    pipeline.hset.assert_any_call("table:2", mapping={"f1": b"b"})
+
+
+def test__redis_online_store__delete_and_expire():
+    redis_client = MagicMock()
+    redis_client.scan_iter = MagicMock(return_value=iter(["ta*ble:1", "ta*ble:2", "ta*ble:3"]))
+    pipeline = redis_client.pipeline.return_value.__enter__.return_value
+    pipeline.execute = MagicMock(side_effect=[[1, 1], [0]])
+    store = RedisOnlineStore(redis_client, pipeline_chunk_size=2, pipeline_parallelism=1)
+
+    # All the keys of the feature table are found by SCAN and unlinked in chunks
+    assert store.delete("ta*ble") == 2
+    redis_client.scan_iter.assert_called_once_with(match="ta\\*ble:*", count=2)
+    assert pipeline.unlink.call_count == 3
+
+    # Deleting or expiring features first checks the keys are not packed
+    pipeline.execute = MagicMock(side_effect=[[False, False], [2, 1]])
+    assert store.delete("table", keys=["1", "2"], feature_names=["f1", "f2"]) == 3
+    pipeline.hexists.assert_any_call("table:2", PACKED_FIELD)
+    pipeline.hdel.assert_any_call("table:2", "f1", "f2")
+
+    pipeline.execute = MagicMock(return_value=[True, False])
+    assert store.expire("table", 60, keys=["1", "2"]) == 1
+    pipeline.expire.assert_any_call("table:1", 60)
+
+    pipeline.execute = MagicMock(side_effect=[[False, False], [[1, -2], [2, 1]]])
+    assert store.expire("table", 60, keys=["1", "2"], feature_names=["f1", "f2"]) == 3
+    pipeline.execute_command.assert_any_call("HEXPIRE", "table:1", 60, "FIELDS", 2, "f1", "f2")
+
+
+def test__redis_online_store__iter_rows():
+    redis_client = MagicMock()
+    redis_client.scan_iter = MagicMock(return_value=iter([b"table:1", b"table:2"]))
+    pipeline = redis_client.pipeline.return_value.__enter__.return_value
+    pipeline.execute = MagicMock(return_value=[{b"f1": b"a"}, {}])
+    store = RedisOnlineStore(redis_client)
+
+    # Keys which don't exist anymore are skipped
+    assert list(store.iter_rows("table")) == [("1", {"f1": b"a"})]
+    pipeline.hgetall.assert_any_call("table:2")
+
+    # Keys in the packed layout are unpacked
+    pipeline.execute = MagicMock(return_value=[{PACKED_FIELD.encode(): pack_row({"f1": b"a"})}])
+    assert list(store.iter_rows("table", keys=["3"])) == [("3", {"f1": b"a"})]
+    pipeline.hgetall.assert_any_call("table:3")
+
+
+def test__pack_row():
+    packed = pack_row({"f1": b"a", "f2": None, "f_特征": "b" * 200})
+    assert unpack_row(packed, ["f_特征", "f3", "f1"]) == [b"b" * 200, None, b"a"]
+    assert unpack_row(None, ["f1"]) == [None]
+    assert unpack_all(packed) == {"f1": b"a", "f_特征": b"b" * 200}
+    with pytest.raises(ValueError):
+        unpack_row(b"\x01", ["f1"])
+
+
+def test__redis_online_store__packed_layout():
+    redis_client = MagicMock()
+    pipeline = redis_client.pipeline.return_value.__enter__.return_value
+    store = RedisOnlineStore(redis_client, packed_feature_tables=["table"])
+
+    # The packed field is requested along with the features, and the features are selected from it on the client side
+    redis_client.hmget = MagicMock(return_value=[pack_row({"f1": b"a", "f2": b"b"}), None, None])
+    assert store.multi_get("table", [("1", ["f2", "f3"])]) == [[b"b", None]]
+    redis_client.hmget.assert_called_once_with("table:1", PACKED_FIELD, "f2", "f3")
+
+    # Keys without the packed field are read from their feature fields, whatever the configured layout
+    pipeline.execute = MagicMock(return_value=[[pack_row({"f1": b"a"}), None], [None, b"c"]])
+    assert store.multi_get("other_table", [("1", ["f1"]), ("2", ["f1"])]) == [[b"a"], [b"c"]]
+    pipeline.hmget.assert_any_call("other_table:2", PACKED_FIELD, "f1")
+
+    # Writes replace the whole packed row, the same as the Redis sink
+    store.multi_put("table", {"1": {"f2": b"c"}})
+    pipeline.hset.assert_called_once_with("table:1", PACKED_FIELD, pack_row({"f2": b"c"}))
+    pipeline.hget.assert_not_called()
+
+    with pytest.raises(ValueError):
+        store.delete("table", keys=["1"], feature_names=["f1"])
+
+
+def test__redis_online_store__packed_keys_not_in_config():
+    """Test features of keys written packed by the Redis sink can't be deleted or expired, even if the table is not
+    configured as packed"""
+    redis_client = MagicMock()
+    pipeline = redis_client.pipeline.return_value.__enter__.return_value
+    store = RedisOnlineStore(redis_client, pipeline_parallelism=1)
+
+    pipeline.execute = MagicMock(return_value=[False, True])
+    with pytest.raises(ValueError, match="table:2"):
+        store.delete("table", keys=["1", "2"], feature_names=["f1"])
+    with pytest.raises(ValueError, match="table:2"):
+        store.expire("table", 0, keys=["1", "2"], feature_names=["f1"])
+    pipeline.hdel.assert_not_called()
+    pipeline.execute_command.assert_not_called()
+
+    # Whole packed keys can still be deleted
+    pipeline.execute = MagicMock(return_value=[1, 1])
+    assert store.delete("table", keys=["1", "2"]) == 2
+    pipeline.hexists.assert_called_with("table:2", PACKED_FIELD)
+    assert pipeline.hexists.call_count == 4
+
+
+def test__in_memory_online_store__delete():
+    store = InMemoryOnlineStore()
+    store.multi_put("table", {"1": {"f1": b"a", "f2": b"b"}, "2": {"f1": b"c"}, "3": {"f2": b"d"}})
+
+    assert store.delete("table", keys=["1", "2", "4"], feature_names=["f1"]) == 2
+    assert store.multi_get("table", [("1", ["f1", "f2"]), ("2", ["f1"])]) == [[None, b"b"], [None]]
+    assert store.delete("table", keys=["3"]) == 1
+    assert store.delete("table") == 1
+    assert store.multi_get("table", [("1", ["f2"])]) == [[None]]
+
+
+def test__in_memory_online_store__expire():
+    store = InMemoryOnlineStore()
+    store.multi_put("table", {"1": {"f1": b"a", "f2": b"b"}, "2": {"f1": b"c"}, "3": {"f2": b"d"}})
+
+    assert store.expire("table", 60) == 3
+    assert store.expire("table", 0, keys=["1", "2", "4"], feature_names=["f1"]) == 2
+    assert store.multi_get("table", [("1", ["f1", "f2"]), ("2", ["f1"]), ("3", ["f2"])]) == [[None, b"b"], [None], [b"d"]]
+    assert dict(store.iter_rows("table")) == {"1": {"f2": b"b"}, "3": {"f2": b"d"}}
+
+    # writing a feature clears its time to live, but not the one of the key
+    store.multi_put("table", {"1": {"f1": b"e"}})
+    assert store.multi_get("table", [("1", ["f1", "f2"])]) == [[b"e", b"b"]]
+    assert store.expire("table", 0, keys=["3"]) == 1
+    assert store.multi_get("table", [("3", ["f2"])]) == [[None]]
+    assert store.delete("table") == 1
+    assert store._expire_times == {}
+
+
+def test__client_with_in_memory_online_store(monkeypatch, workspace_dir):
+    monkeypatch.setenv("SPARK_CONFIG__SPARK_CLUSTER", "local")
+    store = InMemoryOnlineStore()
+    store.multi_put("table", {"1#2": {"f_int": _encode(int_value=1)}, "3#4": {"f_str": _encode(string_value="a")}})
+
+    client = FeathrClient(config_path=str(Path(workspace_dir, "feathr_config.yaml")), online_store=store)
+
+    assert client.online_store is store
+    assert client.get_online_features("table", ["1", "2"], ["f_int", "f_str"]) == [1, None]
+    assert client.multi_get_online_features("table", [["1", "2"], ["3", "4"]], ["f_int", "f_str"]) == {
+        "1#2": [1, None],
+        "3#4": [None, "a"],
+    }
+
+    client.enable_online_cache(max_entries=10)
+    assert client.get_online_features("table", ["1", "2"], ["f_int"]) == [1]
+    assert client.delete_online_features("table", keys=[["1", "2"]], feature_names=["f_int"]) == 1
+    # The deleted feature is not served from the online cache
+    assert client.get_online_features("table", ["1", "2"], ["f_int"]) == [None]
+    client._clean_test_data("table")
+    assert client.get_online_features("table", ["3", "4"], ["f_str"]) == [None]
+
+
+def test__coalescing_online_store():
+    store = InMemoryOnlineStore()
+    store.multi_put("table", {str(i): {"f1": str(i).encode(), "f2": b"x"} for i in range(20)})
+    store.multi_get = MagicMock(side_effect=store.multi_get)
+    coalescing_store = CoalescingOnlineStore(store, window_ms=50)
+    results = {}
+
+    def lookup(i: int):
+        results[i] = coalescing_store.multi_get("table", [(str(i), ["f1"]), ("0", ["f2"])])
+
+    threads = [threading.Thread(target=lookup, args=(i,)) for i in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == {i: [[str(i).encode()], [b"x"]] for i in range(10)}
+    assert coalescing_store.stats()["lookups"] == 10
+    assert store.multi_get.call_count == coalescing_store.stats()["batches"] < 10
+    # each key is requested once per batch
+    for call in store.multi_get.call_args_list:
+        requested_keys = [key for key, _ in call.args[1]]
+        assert len(requested_keys) == len(set(requested_keys))
+
+
+def test__coalescing_online_store__full_batch_and_error():
+    store = MagicMock()
+    store.multi_get.side_effect = RuntimeError("connection error")
+    # a full batch is sent without waiting for the window
+    coalescing_store = CoalescingOnlineStore(store, window_ms=60000, max_batch_keys=1)
+
+    with pytest.raises(RuntimeError):
+        coalescing_store.multi_get("table", [("1", ["f1"])])
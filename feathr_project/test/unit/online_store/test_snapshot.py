@@ -0,0 +1,99 @@
+import asyncio
+import base64
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from feathr import FeathrClient
+from feathr.online_store import InMemoryOnlineStore, OnlineSnapshot, SnapshotOnlineStore, write_snapshot
+from feathr.protobuf.featureValue_pb2 import FeatureValue
+
+
+def _encode(**kwargs) -> bytes:
+    return base64.b64encode(FeatureValue(**kwargs).SerializeToString())
+
+
+def test__online_snapshot(tmp_path: Path):
+    path = str(tmp_path / "table.snapshot")
+    rows = [("1", {"f1": b"a", "f2": b"b"}), ("键", {"f1": b"c" * 300})]
+
+    assert write_snapshot(path, "table", iter(rows)) == 2
+
+    snapshot = OnlineSnapshot(path)
+    assert snapshot.feature_table == "table"
+    assert snapshot.feature_names is None
+    assert len(snapshot) == 2 and "键" in snapshot
+    assert snapshot.get("1", ["f2", "f3"]) == [b"b", None]
+    assert snapshot.get("键", ["f1"]) == [b"c" * 300]
+    assert snapshot.get("2", ["f1"]) is None
+    assert snapshot.covers(["f1", "f3"])
+    snapshot.close()
+
+    # Only the given features are written
+    write_snapshot(path, "table", iter(rows), feature_names=["f2"])
+    snapshot = OnlineSnapshot(path)
+    assert snapshot.covers(["f2"]) and not snapshot.covers(["f1", "f2"])
+    assert snapshot.get("1", ["f2"]) == [b"b"]
+    snapshot.close()
+
+    (tmp_path / "other").write_bytes(b"not a snapshot file")
+    with pytest.raises(ValueError):
+        OnlineSnapshot(str(tmp_path / "other"))
+
+
+def test__snapshot_online_store(tmp_path: Path):
+    path = str(tmp_path / "table.snapshot")
+    write_snapshot(path, "table", iter([("1", {"f1": b"snapshot"}), ("2", {"f1": b"snapshot"})]), feature_names=["f1"])
+    online_store = InMemoryOnlineStore()
+    online_store.multi_put("table", {"1": {"f1": b"store", "f2": b"store"}, "3": {"f1": b"store"}})
+    online_store.multi_get = MagicMock(side_effect=online_store.multi_get)
+    store = SnapshotOnlineStore(online_store, [OnlineSnapshot(path)])
+
+    # Keys and features not in the snapshot fall back to the underlying online store
+    assert store.multi_get("table", [("1", ["f1"]), ("3", ["f1"]), ("1", ["f1", "f2"])]) == [[b"snapshot"], [b"store"], [b"store", b"store"]]
+    online_store.multi_get.assert_called_once_with("table", [("3", ["f1"]), ("1", ["f1", "f2"])])
+    assert store.stats() == {"hits": 1, "misses": 2}
+    assert asyncio.run(store.amulti_get("table", [("2", ["f1"])])) == [[b"snapshot"]]
+    assert store.multi_get("other_table", [("1", ["f1"])]) == [[None]]
+
+    # Keys written through the store are not served from the snapshot anymore
+    store.multi_put("table", {"2": {"f1": b"new"}})
+    assert store.multi_get("table", [("2", ["f1"])]) == [[b"new"]]
+    # Expired keys are not served from the snapshot either
+    store.expire("table", 0, keys=["1"])
+    assert store.multi_get("table", [("1", ["f1"])]) == [[None]]
+    store.expire("table", 60)
+    assert store.snapshots() == []
+    store.add_snapshot(OnlineSnapshot(path))
+    store.delete("table")
+    assert store.snapshots() == []
+    store.close()
+
+
+def test__client_online_snapshot(monkeypatch, workspace_dir, tmp_path: Path):
+    monkeypatch.setenv("SPARK_CONFIG__SPARK_CLUSTER", "local")
+    online_store = InMemoryOnlineStore()
+    online_store.multi_put("table", {"1#2": {"f_int": _encode(int_value=1)}, "3#4": {"f_int": _encode(int_value=2)}})
+    client = FeathrClient(config_path=str(Path(workspace_dir, "feathr_config.yaml")), online_store=online_store)
+    path = str(tmp_path / "table.snapshot")
+
+    assert client.export_online_snapshot("table", path, keys=[["1", "2"]]) == 1
+    coalescing_store = client.enable_online_coalescing()
+    snapshot_store = client.load_online_snapshot(path)
+    assert client.online_store is snapshot_store and snapshot_store.online_store is coalescing_store
+
+    online_store.multi_put("table", {"1#2": {"f_int": _encode(int_value=3)}})
+    assert client.multi_get_online_features("table", [["1", "2"], ["3", "4"]], ["f_int"]) == {"1#2": [1], "3#4": [2]}
+    assert snapshot_store.stats() == {"hits": 1, "misses": 1}
+
+    client.disable_online_coalescing()
+    assert snapshot_store.online_store is online_store
+    client.unload_online_snapshots()
+    assert client.online_store is online_store
+    assert client.get_online_features("table", ["1", "2"], ["f_int"]) == [3]
+
+    # Snapshots in the config are loaded when the client is created
+    monkeypatch.setenv("ONLINE_STORE__SNAPSHOT_PATHS", path)
+    client = FeathrClient(config_path=str(Path(workspace_dir, "feathr_config.yaml")), online_store=online_store)
+    assert client.get_online_features("table", ["1", "2"], ["f_int"]) == [1]
@@ -0,0 +1,88 @@
+import base64
+import json
+from pathlib import Path
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from feathr import FeathrClient, InMemoryOnlineStore
+from feathr.protobuf.featureValue_pb2 import FeatureValue, FloatArray
+from feathr.serving import OnlineFeatureServer, OnlineServingMetrics
+
+
+def _encode(feature_value: FeatureValue) -> bytes:
+    return base64.b64encode(feature_value.SerializeToString())
+
+
+@pytest.fixture(scope="function")
+def server_url(monkeypatch, workspace_dir):
+    monkeypatch.setenv("SPARK_CONFIG__SPARK_CLUSTER", "local")
+    store = InMemoryOnlineStore()
+    store.multi_put("table", {
+        "1": {"f_int": _encode(FeatureValue(int_value=1)), "f_dense": _encode(FeatureValue(float_array=FloatArray(floats=[0.5])))},
+        "2#3": {"f_int": _encode(FeatureValue(int_value=2))},
+        "5": {"f_int": _encode(FeatureValue(double_value=float("nan"))), "f_dense": _encode(FeatureValue(float_array=FloatArray(floats=[float("inf")])))},
+    })
+    client = FeathrClient(config_path=str(Path(workspace_dir, "feathr_config.yaml")), online_store=store)
+    server = OnlineFeatureServer(client, host="127.0.0.1", port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def _post(url: str, body: dict):
+    request = urllib.request.Request(url, data=json.dumps(body).encode(), headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())
+
+
+def test__online_feature_server(server_url: str):
+    res = _post(f"{server_url}/v1/online_features", {
+        "feature_table": "table",
+        "keys": ["1", ["2", "3"], "4"],
+        "feature_names": ["f_int", "f_dense"],
+    })
+    assert res == {"features": {"1": [1, [0.5]], "2#3": [2, None], "4": [None, None]}}
+
+    with pytest.raises(urllib.error.HTTPError) as e:
+        _post(f"{server_url}/v1/online_features", {"feature_table": "table"})
+    assert e.value.code == 400
+
+    # NaN and infinity are not valid JSON, so they are returned as null
+    with urllib.request.urlopen(urllib.request.Request(
+            f"{server_url}/v1/online_features",
+            data=json.dumps({"feature_table": "table", "keys": ["5"], "feature_names": ["f_int", "f_dense"]}).encode())) as response:
+        payload = response.read().decode()
+    assert json.loads(payload, parse_constant=lambda constant: pytest.fail(f"invalid JSON constant {constant}")) == {"features": {"5": [None, [None]]}}
+
+    # Keys which are neither strings nor lists of strings are rejected as a bad request
+    for keys in [[1], [{"id": "1"}], [[]], [["2", 3]]]:
+        with pytest.raises(urllib.error.HTTPError) as e:
+            _post(f"{server_url}/v1/online_features", {"feature_table": "table", "keys": keys, "feature_names": ["f_int"]})
+        assert e.value.code == 400
+        assert "Invalid key" in json.loads(e.value.read())["error"]
+
+    with urllib.request.urlopen(f"{server_url}/metrics") as response:
+        metrics = json.loads(response.read())
+    assert metrics["requests"] == 7
+    assert metrics["errors"] == 5
+    assert metrics["keys"] == 4
+    assert metrics["latency_ms"]["p99"] >= metrics["latency_ms"]["p50"] > 0
+    assert metrics["tables"]["table"]["keys"] == 4
+
+
+def test__online_serving_metrics__window():
+    metrics = OnlineServingMetrics(window=100)
+    for i in range(200):
+        metrics.record(i / 1000)
+
+    snapshot = metrics.snapshot()
+
+    assert snapshot["requests"] == 200
+    assert snapshot["latency_ms"]["p50"] == pytest.approx(150)
+    assert snapshot["latency_ms"]["p99"] == pytest.approx(199)
+    assert OnlineServingMetrics().snapshot()["latency_ms"] == {"p50": None, "p99": None}
@@ -0,0 +1,52 @@
+from typing import List, Optional
+from unittest.mock import MagicMock
+
+import pytest
+
+from feathr import SparkJobHandle, as_completed, wait_all
+
+
+class _FakeJobHandle(SparkJobHandle):
+    poll_interval_sec = 0.01
+
+    def __init__(self, job_id: int, statuses: List[Optional[bool]]):
+        super().__init__(job_id)
+        self.statuses = statuses
+        self.polls = 0
+
+    def get_status(self) -> str:
+        return str(self.statuses[min(self.polls, len(self.statuses) - 1)])
+
+    def get_job_tags(self):
+        return {"output_path": f"output_{self.job_id}"}
+
+    def _poll(self) -> Optional[bool]:
+        self.polls += 1
+        return self.statuses[min(self.polls, len(self.statuses)) - 1]
+
+
+def test__as_completed():
+    jobs = [_FakeJobHandle(0, [None, None, True]), _FakeJobHandle(1, [False]), _FakeJobHandle(2, [None, True])]
+
+    assert [job.job_id for job in as_completed(jobs)] == [1, 2, 0]
+    # Finished jobs are not polled anymore
+    assert [job.polls for job in jobs] == [3, 1, 2]
+    assert jobs[0].get_job_result_uri() == "output_0"
+
+
+def test__wait_all():
+    jobs = [_FakeJobHandle(0, [None, True]), _FakeJobHandle(1, [None, False])]
+
+    assert wait_all(jobs) == [True, False]
+    assert jobs[0].wait() and jobs[0].done()
+    assert wait_all([]) == []
+
+
+def test__wait_all__timeout():
+    jobs = [_FakeJobHandle(0, [True]), _FakeJobHandle(1, [None])]
+
+    with pytest.raises(TimeoutError):
+        wait_all(jobs, timeout_seconds=0.05)
+    with pytest.raises(TimeoutError):
+        jobs[1].wait(timeout_seconds=0.05)
+    assert jobs[0].done() and not jobs[1].done()
@@ -1,11 +1,16 @@
+from pathlib import Path
+from subprocess import Popen
+import sys
+import time
 from typing import Dict
 from unittest.mock import MagicMock
 
 import pytest
 from pytest_mock import MockerFixture
 
+from feathr import wait_all
 from feathr.constants import OUTPUT_PATH_TAG
-from feathr.spark_provider._localspark_submission import _FeathrLocalSparkJobLauncher
+from feathr.spark_provider._localspark_submission import _FeathrLocalSparkJobLauncher, _LocalSparkJobHandle, _LogTailer
 
 
 @pytest.fixture(scope="function")
@@ -63,3 +68,91 @@ def test__local_spark_job_launcher__init_args(
     # Assert if spark_args contains confs at the end
     for k, v in confs.items():
         assert spark_args[-1] == f"{k}={v}"
+
+
+@pytest.mark.parametrize(
+    "script,expected_result,expected_last_line", [
+        ("print('line 1'); print('line 2')", True, "line 2"),
+        ("print('failed'); import sys; sys.exit(1)", False, "failed"),
+        # spark-submit may not exit after a PySpark job, so the job is terminated once it logs its completion
+        ("import time; print('Feathr Pyspark job completed', flush=True); time.sleep(60)", True, "Feathr Pyspark job completed"),
+    ]
+)
+def test__local_spark_job_launcher__wait_for_completion(
+    local_spark_job_launcher: _FeathrLocalSparkJobLauncher,
+    tmp_path: Path,
+    script: str,
+    expected_result: bool,
+    expected_last_line: str,
+):
+    """Test the launcher returns as soon as the job finishes, and reports the progress from the job logs"""
+    local_spark_job_launcher.cmd_file, local_spark_job_launcher.log_path = str(tmp_path / "command.sh"), str(tmp_path / "log")
+    local_spark_job_launcher.spark_job_num = 1
+    with open(tmp_path / "log_0.txt", "a") as log:
+        proc = Popen([sys.executable, "-c", script], stdout=log)
+    local_spark_job_launcher.latest_job = _LocalSparkJobHandle(proc, "unit-test", log.name, None)
+    progress = []
+
+    start_time = time.time()
+    assert local_spark_job_launcher.wait_for_completion(timeout_seconds=30, progress_callback=progress.append) == expected_result
+
+    assert time.time() - start_time < 10
+    assert progress[-1].last_line == expected_last_line
+    assert progress[-1].pid == proc.pid
+
+
+def test__local_spark_job_launcher__wait_for_completion__hang(
+    local_spark_job_launcher: _FeathrLocalSparkJobLauncher,
+    tmp_path: Path,
+):
+    """Test a job which doesn't log anything for retry * retry_sec seconds is terminated"""
+    local_spark_job_launcher.cmd_file, local_spark_job_launcher.log_path = str(tmp_path / "command.sh"), str(tmp_path / "log")
+    local_spark_job_launcher.spark_job_num = 1
+    local_spark_job_launcher.retry, local_spark_job_launcher.retry_sec = 2, 0.5
+    with open(tmp_path / "log_0.txt", "a") as log:
+        proc = Popen([sys.executable, "-c", "import time; time.sleep(60)"], stdout=log)
+    local_spark_job_launcher.latest_job = _LocalSparkJobHandle(proc, "unit-test", log.name, None)
+
+    start_time = time.time()
+    local_spark_job_launcher.wait_for_completion(timeout_seconds=30)
+
+    assert time.time() - start_time < 10
+    assert proc.returncode is not None
+
+
+def test__log_tailer(tmp_path: Path):
+    path = tmp_path / "log.txt"
+    tailer = _LogTailer(str(path))
+    assert tailer.read_lines() == []
+
+    with open(path, "a") as f:
+        f.write("line 1\nline")
+        f.flush()
+        assert tailer.read_lines() == ["line 1"]
+        f.write(" 2\nline 3\n")
+        f.flush()
+        assert tailer.read_lines() == ["line 2", "line 3"]
+        assert tailer.read_lines() == []
+    assert tailer.num_lines == 3 and tailer.last_line == "line 3"
+    tailer.close()
+
+
+def test__local_spark_job_launcher__job_handles(
+    mocker: MockerFixture,
+    local_spark_job_launcher: _FeathrLocalSparkJobLauncher,
+):
+    """Test each submitted job has its own handle, so that they can be waited on together"""
+    local_spark_job_launcher._init_args = MagicMock(return_value=[])
+    scripts = iter(["import sys; sys.exit(1)", "print('done')"])
+    mocker.patch(
+        "feathr.spark_provider._localspark_submission.Popen",
+        side_effect=lambda args, shell, stdout: Popen([sys.executable, "-c", next(scripts)], stdout=stdout),
+    )
+
+    jobs = [
+        local_spark_job_launcher.submit_feathr_job(job_name=f"unit-test-{i}", main_jar_path="", main_class_name="", job_tags={OUTPUT_PATH_TAG: f"output_{i}"})
+        for i in range(2)
+    ]
+
+    assert wait_all(jobs, timeout_seconds=30) == [False, True]
+    assert [job.get_job_result_uri() for job in jobs] == ["output_0", "output_1"]
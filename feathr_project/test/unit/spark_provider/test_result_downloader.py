@@ -0,0 +1,109 @@
+import base64
+import hashlib
+import os
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from feathr.spark_provider._databricks_submission import _FeathrDatabricksJobLauncher
+from feathr.spark_provider._result_downloader import _RemoteFile, download_files
+
+
+class _FakeFile(_RemoteFile):
+    def __init__(self, local_path: str, content: bytes, with_md5: bool = True, modified_time: float = None,
+                 fail: bool = False):
+        super().__init__(local_path)
+        self.content = content
+        self.with_md5 = with_md5
+        self.modified_time = modified_time
+        self.fail = fail
+        self.downloads = 0
+
+    def stat(self):
+        return len(self.content), hashlib.md5(self.content).digest() if self.with_md5 else None, self.modified_time
+
+    def write_to(self, f):
+        self.downloads += 1
+        f.write(self.content[:2])
+        if self.fail:
+            raise IOError("connection reset")
+        f.write(self.content[2:])
+
+
+def test__download_files(tmp_path: Path):
+    files = [_FakeFile(str(tmp_path / "sub" / f"part-{i}.avro"), f"content {i}".encode()) for i in range(10)]
+
+    assert download_files(files, max_workers=4) == 10
+    assert all(Path(f.local_path).read_bytes() == f.content for f in files)
+
+    # Complete files are skipped, files with another size or checksum are downloaded again
+    files[0].content = b"new content"
+    files[1].content = b"CONTENT 1"
+    files[2].with_md5 = False
+    assert download_files(files, max_workers=4) == 2
+    assert [f.downloads for f in files[:4]] == [2, 2, 1, 1]
+    assert Path(files[1].local_path).read_bytes() == b"CONTENT 1"
+
+
+def test__download_files__modified_time(tmp_path: Path):
+    """Test files are compared by modification time instead of checksum if the storage keeps it"""
+    file = _FakeFile(str(tmp_path / "part-0.avro"), b"content", with_md5=False, modified_time=1600000000.123)
+    assert download_files([file]) == 1
+    assert os.path.getmtime(file.local_path) == pytest.approx(1600000000.123)
+    assert download_files([file]) == 0
+
+    # Same size, but rewritten in the cloud
+    file.content = b"CONTENT"
+    file.modified_time += 60
+    assert download_files([file]) == 1
+    assert Path(file.local_path).read_bytes() == b"CONTENT"
+
+
+def test__download_files__prune(tmp_path: Path):
+    """Test local files which are not in the result anymore are removed"""
+    (tmp_path / "sub").mkdir()
+    for name in ["part-old.avro", "sub/part-old.avro", ".last_access"]:
+        (tmp_path / name).write_bytes(b"old")
+    files = [_FakeFile(str(tmp_path / "part-new.avro"), b"new"), _FakeFile(str(tmp_path / "sub" / "part-new.avro"), b"new")]
+
+    download_files(files, prune_dir=str(tmp_path))
+
+    assert sorted(str(p.relative_to(tmp_path)) for p in tmp_path.rglob("*") if p.is_file()) == [".last_access", "part-new.avro", "sub/part-new.avro"]
+
+
+def test__download_files__failure(tmp_path: Path):
+    files = [_FakeFile(str(tmp_path / "part-0.avro"), b"content 0", fail=True), _FakeFile(str(tmp_path / "part-1.avro"), b"content 1")]
+
+    with pytest.raises(RuntimeError, match="part-0.avro"):
+        download_files(files)
+    # The other files are downloaded, and no partial file is left behind
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["part-1.avro"]
+
+    files[0].fail = False
+    assert download_files(files) == 1
+    assert files[1].downloads == 1
+
+
+def test__databricks_download_result(tmp_path: Path):
+    """Test the files of a DBFS folder and its sub folders are downloaded in chunks, preserving the hierarchy"""
+    contents = {"dbfs:/result/part-0.avro": b"a" * 10, "dbfs:/result/sub/part-1.avro": b"b" * 5}
+    listing = {
+        "dbfs:/result": [{"path": "/result/part-0.avro", "is_dir": False, "file_size": 10}, {"path": "/result/sub", "is_dir": True, "file_size": 0}],
+        "dbfs:/result/sub": [{"path": "/result/sub/part-1.avro", "is_dir": False, "file_size": 5}],
+    }
+
+    def perform_query(method, path, data, headers=None):
+        if path == "/dbfs/list":
+            return {"files": listing[data["path"]]}
+        chunk = contents[data["path"]][data["offset"]:data["offset"] + 4]
+        return {"bytes_read": len(chunk), "data": base64.b64encode(chunk).decode()}
+
+    launcher = _FeathrDatabricksJobLauncher.__new__(_FeathrDatabricksJobLauncher)
+    launcher.api_client = MagicMock()
+    launcher.api_client.perform_query.side_effect = perform_query
+
+    launcher.download_result("dbfs:/result", str(tmp_path))
+
+    assert (tmp_path / "part-0.avro").read_bytes() == b"a" * 10
+    assert (tmp_path / "sub" / "part-1.avro").read_bytes() == b"b" * 5
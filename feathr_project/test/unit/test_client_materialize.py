@@ -0,0 +1,152 @@
+from datetime import datetime, timedelta
+import os
+from pathlib import Path
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+from pyhocon import ConfigFactory
+
+from feathr import BackfillTime, FeathrClient, HdfsSink, MaterializationSettings, RedisSink
+from feathr.spark_provider._job_handle import SparkJobHandle
+
+
+@pytest.fixture(scope="function")
+def materialize_client(monkeypatch, workspace_dir, tmp_path: Path) -> FeathrClient:
+    """Feathr client with built (empty) features and a mocked Spark launcher, using `tmp_path` as workspace."""
+    monkeypatch.setenv("SPARK_CONFIG__SPARK_CLUSTER", "local")
+    monkeypatch.setenv("SPARK_CONFIG__MATERIALIZATION_WATERMARK_PATH", str(tmp_path / "watermarks.json"))
+    client = FeathrClient(config_path=str(Path(workspace_dir, "feathr_config.yaml")))
+    client.local_workspace_dir = str(tmp_path)
+    client.anchor_list, client.derived_feature_list = [], []
+    client.config_helper = MagicMock()
+    client.feathr_spark_launcher = MagicMock()
+    client.feathr_spark_launcher.upload_or_get_cloud_path.side_effect = lambda path: f"cloud://{Path(path).name}"
+    return client
+
+
+class _FakeJobHandle(SparkJobHandle):
+    def __init__(self, job_id: str, succeeded: bool):
+        super().__init__(job_id)
+        self.succeeded = succeeded
+
+    def get_status(self):
+        return "SUCCESS" if self.succeeded else "FAILED"
+
+    def get_job_tags(self):
+        return None
+
+    def _poll(self):
+        return self.succeeded
+
+
+def _settings(end_day: int = 5, sinks: list = None) -> MaterializationSettings:
+    backfill_time = BackfillTime(start=datetime(2022, 3, 1), end=datetime(2022, 3, end_day), step=timedelta(days=1))
+    sinks = sinks or [HdfsSink(output_path="abfss://result")]
+    return MaterializationSettings("backfill", sinks=sinks, feature_names=[], backfill_time=backfill_time)
+
+
+@pytest.mark.parametrize("submission_parallelism", [1, 3])
+def test__materialize_features__parallel_backfill(materialize_client: FeathrClient, submission_parallelism: int):
+    launcher = materialize_client.feathr_spark_launcher
+    materialize_client._FEATHR_JOB_JAR_PATH = "feathr.jar"
+    lock = threading.Lock()
+    running = [0, 0]
+
+    def submit_feathr_job(arguments, main_jar_path, **kwargs):
+        assert main_jar_path == "cloud://feathr.jar"
+        with lock:
+            running[0] += 1
+            running[1] = max(running)
+        threading.Event().wait(0.05)
+        with lock:
+            running[0] -= 1
+        return arguments[arguments.index("--generation-config") + 1]
+
+    launcher.submit_feathr_job.side_effect = submit_feathr_job
+
+    handles = materialize_client.materialize_features(_settings(), submission_parallelism=submission_parallelism)
+
+    # One job per cutoff time, in order, with the shared feature config and main jar uploaded once
+    assert handles == [f"cloud://auto_gen_config_{datetime(2022, 3, day).timestamp()}.conf" for day in range(1, 6)]
+    uploaded_paths = [c.args[0] for c in launcher.upload_or_get_cloud_path.call_args_list]
+    assert uploaded_paths.count(os.path.join(materialize_client.local_workspace_dir, "feature_conf/")) == 1
+    assert uploaded_paths.count("feathr.jar") == 1
+    materialize_client.config_helper.save_to_feature_config_from_context.assert_called_once()
+    assert launcher.submit_feathr_job.call_count == 5
+    assert 1 <= running[1] <= submission_parallelism
+
+
+def test__materialize_features__parallel_backfill_failure(materialize_client: FeathrClient):
+    def submit_feathr_job(arguments, **kwargs):
+        if str(datetime(2022, 3, 2).timestamp()) in arguments[arguments.index("--generation-config") + 1]:
+            raise RuntimeError("quota exceeded")
+        return "handle"
+
+    materialize_client.feathr_spark_launcher.submit_feathr_job.side_effect = submit_feathr_job
+
+    with pytest.raises(RuntimeError, match="1 of 5 .* 2022-03-02"):
+        materialize_client.materialize_features(_settings(), submission_parallelism=4)
+    # The other jobs are still submitted
+    assert materialize_client.feathr_spark_launcher.submit_feathr_job.call_count == 5
+
+
+def test__materialize_features__single_job_backfill(materialize_client: FeathrClient):
+    launcher = materialize_client.feathr_spark_launcher
+    launcher.submit_feathr_job.return_value = "handle"
+
+    assert materialize_client.materialize_features(_settings(), single_job_backfill=True) == ["handle"]
+
+    # The generation config of the single job is of the last cutoff time, and the job gets all the cutoff times as an
+    # argument, which older job jars reject
+    config_paths = list(Path(materialize_client.local_workspace_dir, "feature_gen_conf").iterdir())
+    assert len(config_paths) == 1
+    config = ConfigFactory.parse_file(str(config_paths[0]))
+    assert config["operational.endTime"] == "2022-03-05 00:00:00"
+    assert "endTimes" not in config["operational"]
+    arguments = launcher.submit_feathr_job.call_args.kwargs["arguments"]
+    assert arguments[arguments.index("--backfill-end-times") + 1] == ",".join(f"2022-03-0{day} 00:00:00" for day in range(1, 6))
+
+
+def test__materialize_features__backfill_end_times_only_for_single_job(materialize_client: FeathrClient):
+    launcher = materialize_client.feathr_spark_launcher
+    launcher.submit_feathr_job.return_value = "handle"
+
+    materialize_client.materialize_features(_settings())
+
+    assert all("--backfill-end-times" not in call.kwargs["arguments"] for call in launcher.submit_feathr_job.call_args_list)
+
+
+def test__materialize_features__incremental(materialize_client: FeathrClient):
+    launcher = materialize_client.feathr_spark_launcher
+    submitted = []
+    failed_day = [None]
+
+    def submit_feathr_job(arguments, **kwargs):
+        config = ConfigFactory.parse_file(arguments[arguments.index("--generation-config") + 1].replace("cloud://", f"{materialize_client.local_workspace_dir}/feature_gen_conf/"))
+        submitted.append(config["operational.endTime"][:10])
+        return _FakeJobHandle(submitted[-1], succeeded=submitted[-1] != failed_day[0])
+
+    launcher.submit_feathr_job.side_effect = submit_feathr_job
+
+    assert len(materialize_client.materialize_features(_settings(end_day=3), incremental=True)) == 3
+    assert submitted == ["2022-03-01", "2022-03-02", "2022-03-03"]
+
+    # Only the cutoff times after the watermark are materialized
+    submitted.clear()
+    failed_day[0] = "2022-03-05"
+    with pytest.raises(RuntimeError, match="2022-03-05"):
+        materialize_client.materialize_features(_settings(end_day=6), incremental=True)
+    assert submitted == ["2022-03-04", "2022-03-05", "2022-03-06"]
+
+    # The watermark only advanced up to the failed cutoff time
+    submitted.clear()
+    failed_day[0] = None
+    materialize_client.materialize_features(_settings(end_day=6), incremental=True)
+    assert submitted == ["2022-03-05", "2022-03-06"]
+    assert materialize_client.materialize_features(_settings(end_day=6), incremental=True) == []
+
+    # A new sink has no watermark yet, so all the cutoff times are materialized again
+    submitted.clear()
+    materialize_client.materialize_features(_settings(end_day=6, sinks=[HdfsSink(output_path="abfss://result"), RedisSink(table_name="table")]), incremental=True)
+    assert len(submitted) == 6
@@ -0,0 +1,300 @@
+import asyncio
+import base64
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+
+import numpy as np
+import pyarrow as pa
+import pytest
+from pytest_mock import MockerFixture
+
+from feathr import FLOAT, FeathrClient
+from feathr.protobuf.featureValue_pb2 import FeatureValue
+from feathr.online_store._packed_row import PACKED_FIELD, pack_row
+from feathr.utils._online_cache import CACHE_MISS
+
+
+def _encode(**kwargs) -> bytes:
+    """Encodes a FeatureValue the same way the Redis sink does, i.e. base64 wrapped protobuf"""
+    feature_value = FeatureValue(**kwargs)
+    return base64.b64encode(feature_value.SerializeToString())
+
+
+def _mock_redis_client(online_client: FeathrClient) -> MagicMock:
+    """Replaces the Redis client of the client and its Redis online store with a mock"""
+    online_client.redis_client = online_client.online_store.redis_client = MagicMock()
+    return online_client.redis_client
+
+
+@pytest.fixture(scope="function")
+def online_client(monkeypatch, workspace_dir) -> FeathrClient:
+    """Feathr client using local spark so that no cloud resources are required. Redis is mocked per test."""
+    monkeypatch.setenv("SPARK_CONFIG__SPARK_CLUSTER", "local")
+    return FeathrClient(config_path=str(Path(workspace_dir, "feathr_config.yaml")))
+
+
+def test__aget_online_features(online_client: FeathrClient):
+    async_redis_client = MagicMock()
+    async_redis_client.hmget = AsyncMock(return_value=[None, _encode(float_value=1.5), None])
+    online_client.online_store._async_client = async_redis_client
+
+    res = asyncio.run(online_client.aget_online_features("table", ["1", "2"], ["f_float", "f_missing"]))
+
+    async_redis_client.hmget.assert_called_once_with("table:1#2", PACKED_FIELD, "f_float", "f_missing")
+    assert res == [1.5, None]
+
+
+def test__amulti_get_online_features(online_client: FeathrClient):
+    pipeline = MagicMock()
+    pipeline.execute = AsyncMock(return_value=[
+        [None, _encode(int_value=1), _encode(string_value="a")],
+        [None, None, None],
+    ])
+    pipeline.__aenter__ = AsyncMock(return_value=pipeline)
+    pipeline.__aexit__ = AsyncMock(return_value=None)
+    async_redis_client = MagicMock()
+    async_redis_client.pipeline = MagicMock(return_value=pipeline)
+    online_client.online_store._async_client = async_redis_client
+
+    res = asyncio.run(online_client.amulti_get_online_features("table", ["1", ["2", "3"]], ["f_int", "f_str"]))
+
+    assert pipeline.hmget.call_count == 2
+    pipeline.hmget.assert_any_call("table:2#3", PACKED_FIELD, "f_int", "f_str")
+    assert res == {"1": [1, "a"], "2#3": [None, None]}
+
+
+def test__get_async_client__is_lazy(mocker: MockerFixture, online_client: FeathrClient):
+    mocked_async_redis = mocker.patch("feathr.client.redis.asyncio.Redis")
+
+    assert online_client.online_store._async_client is None
+    first = online_client.online_store.get_async_client()
+    second = online_client.online_store.get_async_client()
+
+    mocked_async_redis.assert_called_once()
+    assert first is second
+
+
+def test__multi_get_online_features__output_format(online_client: FeathrClient):
+    pipeline = MagicMock()
+    pipeline.execute = MagicMock(return_value=[
+        [None, _encode(int_value=1), _encode(string_value="a")],
+        [None, None, _encode(string_value="b")],
+    ])
+    _mock_redis_client(online_client)
+    online_client.redis_client.pipeline.return_value.__enter__.return_value = pipeline
+
+    res = online_client.multi_get_online_features("table", ["1", "2"], ["f_int", "f_str"], output_format="columnar")
+    assert res == {"f_int": [1, None], "f_str": ["a", "b"]}
+
+    res = online_client.multi_get_online_features("table", ["1", "2"], ["f_int", "f_str"])
+    assert res == {"1": [1, "a"], "2": [None, "b"]}
+
+    with pytest.raises(ValueError):
+        online_client.multi_get_online_features("table", ["1", "2"], ["f_int", "f_str"], output_format="unknown")
+
+
+def test__online_cache(online_client: FeathrClient):
+    _mock_redis_client(online_client)
+    online_client.redis_client.hmget = MagicMock(return_value=[None, _encode(int_value=1), None])
+    pipeline = MagicMock()
+    pipeline.execute = MagicMock(return_value=[[None, _encode(int_value=3)], [None, _encode(int_value=2), None]])
+    online_client.redis_client.pipeline.return_value.__enter__.return_value = pipeline
+    online_client.enable_online_cache(max_entries=10)
+
+    assert online_client.get_online_features("table", "1", ["f1", "f2"]) == [1, None]
+    # Served from the cache
+    assert online_client.get_online_features("table", "1", ["f1", "f2"]) == [1, None]
+    online_client.redis_client.hmget.assert_called_once_with("table:1", PACKED_FIELD, "f1", "f2")
+
+    # Only the missing feature of the missing key is fetched
+    res = online_client.multi_get_online_features("table", ["1", "2"], ["f1", "f3"])
+    assert res == {"1": [1, 3], "2": [2, None]}
+    assert pipeline.hmget.call_count == 2
+    pipeline.hmget.assert_any_call("table:1", PACKED_FIELD, "f3")
+    pipeline.hmget.assert_any_call("table:2", PACKED_FIELD, "f1", "f3")
+    assert online_client.get_online_cache_stats()["hits"] == 3
+
+    # Deleting the feature invalidates the cached entity
+    online_client.redis_client.hexists = MagicMock(return_value=True)
+    online_client.delete_feature_from_redis("table", "1", "f1")
+    assert online_client.online_cache.get_many("table", "1", ["f1", "f2"]) == [CACHE_MISS, CACHE_MISS]
+
+
+def test__expire_online_features__online_cache(mocker: MockerFixture, online_client: FeathrClient):
+    online_store = mocker.patch.object(online_client, "_get_online_store").return_value
+    online_store.expire.return_value = 1
+    online_client.enable_online_cache(max_entries=10)
+    online_client.online_cache.put_many("table", "1", ["f1", "f2"], [1, 2])
+    online_client.online_cache.put_many("table", "2", ["f1"], [3])
+
+    # Features expired right away in the online store are not served from the cache anymore
+    assert online_client.expire_online_features("table", 0, keys=["1"], feature_names=["f1"]) == 1
+    online_store.expire.assert_called_once_with("table", 0, ["1"], ["f1"], False)
+    assert online_client.online_cache.get_many("table", "1", ["f1", "f2"]) == [CACHE_MISS, 2]
+
+    online_client.expire_online_features("table", 0)
+    assert online_client.online_cache.get_many("table", "2", ["f1"]) == [CACHE_MISS]
+
+
+def test__multi_get_online_features__numpy_and_arrow(online_client: FeathrClient):
+    pipeline = MagicMock()
+    pipeline.execute = MagicMock(return_value=[
+        [None, _encode(float_value=1.5), _encode(long_value=7)],
+        [None, None, _encode(long_value=8)],
+    ])
+    _mock_redis_client(online_client)
+    online_client.redis_client.pipeline.return_value.__enter__.return_value = pipeline
+
+    res = online_client.multi_get_online_features("table", ["1", ["2", "3"]], ["f_float", "f_long"], output_format="numpy")
+    assert res["f_float"].dtype == np.float32
+    assert res["f_float"].mask.tolist() == [False, True]
+    assert res["f_long"].tolist() == [7, 8]
+
+    res = online_client.multi_get_online_features("table", ["1", ["2", "3"]], ["f_float", "f_long"], output_format="arrow")
+    assert res.schema.field("f_float").type == pa.float32()
+    assert res.to_pydict() == {"key": ["1", "2#3"], "f_float": [1.5, None], "f_long": [7, 8]}
+
+
+def test__multi_get_online_features__chunked(online_client: FeathrClient):
+    online_client.online_store.pipeline_chunk_size = 2
+    pipelines = []
+
+    def new_pipeline(transaction=True):
+        pipeline = MagicMock()
+        pipeline.__enter__.return_value = pipeline
+        pipeline.execute.side_effect = lambda: [[None, _encode(string_value=call.args[0])] for call in pipeline.hmget.call_args_list]
+        pipelines.append(pipeline)
+        return pipeline
+
+    _mock_redis_client(online_client)
+    online_client.redis_client.pipeline.side_effect = new_pipeline
+    keys = [str(i) for i in range(5)]
+
+    res = online_client.multi_get_online_features("table", keys, ["f_str"])
+
+    assert len(pipelines) == 3
+    assert sorted(len(pipeline.hmget.call_args_list) for pipeline in pipelines) == [1, 2, 2]
+    assert res == {key: [f"table:{key}"] for key in keys}
+
+
+def test__amulti_get_online_features__chunked(online_client: FeathrClient):
+    online_client.online_store.pipeline_chunk_size = 2
+
+    def new_pipeline(transaction=True):
+        pipeline = MagicMock()
+        pipeline.__aenter__ = AsyncMock(return_value=pipeline)
+        pipeline.__aexit__ = AsyncMock(return_value=None)
+        pipeline.execute = AsyncMock(side_effect=lambda: [[None, _encode(string_value=call.args[0])] for call in pipeline.hmget.call_args_list])
+        return pipeline
+
+    async_redis_client = MagicMock()
+    async_redis_client.pipeline.side_effect = new_pipeline
+    online_client.online_store._async_client = async_redis_client
+    keys = [str(i) for i in range(5)]
+
+    res = asyncio.run(online_client.amulti_get_online_features("table", keys, ["f_str"]))
+
+    assert async_redis_client.pipeline.call_count == 3
+    assert res == {key: [f"table:{key}"] for key in keys}
+
+
+def test__construct_redis_client__cluster(mocker: MockerFixture, monkeypatch, workspace_dir):
+    monkeypatch.setenv("SPARK_CONFIG__SPARK_CLUSTER", "local")
+    monkeypatch.setenv("ONLINE_STORE__REDIS__CLUSTER_ENABLED", "True")
+    monkeypatch.setenv("ONLINE_STORE__REDIS__READ_FROM_REPLICAS", "True")
+    mocked_cluster = mocker.patch("feathr.client.redis.cluster.RedisCluster")
+
+    client = FeathrClient(config_path=str(Path(workspace_dir, "feathr_config.yaml")))
+
+    mocked_cluster.assert_called_once()
+    assert mocked_cluster.call_args.kwargs["read_from_replicas"] is True
+    assert client.online_store._get_read_client() is client.redis_client
+
+
+def test__get_online_features__replica_host(mocker: MockerFixture, monkeypatch, workspace_dir):
+    monkeypatch.setenv("SPARK_CONFIG__SPARK_CLUSTER", "local")
+    monkeypatch.setenv("ONLINE_STORE__REDIS__REPLICA_HOST", "replica.redis.cache.windows.net")
+    mocked_redis = mocker.patch("feathr.client.redis.Redis")
+    primary, replica = MagicMock(), MagicMock()
+    mocked_redis.side_effect = [primary, replica]
+    replica.hmget.return_value = [None, _encode(int_value=1)]
+
+    client = FeathrClient(config_path=str(Path(workspace_dir, "feathr_config.yaml")))
+
+    assert mocked_redis.call_args_list[1].kwargs["host"] == "replica.redis.cache.windows.net"
+    assert client.get_online_features("table", "1", ["f_int"]) == [1]
+    primary.hmget.assert_not_called()
+
+
+def test__get_online_features__packed_tables(mocker: MockerFixture, monkeypatch, workspace_dir):
+    monkeypatch.setenv("SPARK_CONFIG__SPARK_CLUSTER", "local")
+    monkeypatch.setenv("ONLINE_STORE__REDIS__PACKED_TABLES", "wide_table, other_table")
+    mocked_redis = mocker.patch("feathr.client.redis.Redis")
+    mocked_redis.return_value.hmget.return_value = [pack_row({"f_int": _encode(int_value=1), "f_str": _encode(string_value="a")}), None, None]
+
+    client = FeathrClient(config_path=str(Path(workspace_dir, "feathr_config.yaml")))
+
+    # The packed tables are written in the packed layout, and the layout is detected on read for any table
+    assert client.online_store.packed_feature_tables == {"wide_table", "other_table"}
+    assert client.get_online_features("wide_table", "1", ["f_str", "f_int"]) == ["a", 1]
+    assert client.get_online_features("unlisted_table", "1", ["f_int"]) == [1]
+
+
+def test__enable_online_coalescing(online_client: FeathrClient):
+    redis_client = _mock_redis_client(online_client)
+    redis_client.hmget.return_value = [None, _encode(int_value=1)]
+    redis_store = online_client.online_store
+
+    coalescing_store = online_client.enable_online_coalescing(window_ms=0)
+    assert coalescing_store.online_store is redis_store
+    # enabling again doesn't wrap the coalescing store
+    assert online_client.enable_online_coalescing(window_ms=0).online_store is redis_store
+
+    assert online_client.get_online_features("table", "1", ["f_int"]) == [1]
+    assert online_client.online_store.stats() == {"lookups": 1, "batches": 1}
+
+    online_client.disable_online_coalescing()
+    assert online_client.online_store is redis_store
+
+
+def test__enable_typed_online_reads(mocker: MockerFixture, online_client: FeathrClient):
+    redis_client = _mock_redis_client(online_client)
+    redis_client.hmget.return_value = [None, _encode(float_value=0.5), _encode(double_value=1.5)]
+    feature = MagicMock()
+    feature.feature_type = FLOAT
+    mocker.patch.object(online_client, "get_features_from_registry", return_value={"f_float": feature, "f_other": feature})
+
+    online_client.enable_typed_online_reads(validate=True)
+    online_client.get_features_from_registry.assert_called_once_with(online_client.project_name)
+    assert online_client.get_online_features("table", "1", ["f_float", "f_double"]) == [0.5, 1.5]
+
+    redis_client.hmget.return_value = [None, _encode(double_value=0.5)]
+    with pytest.raises(ValueError):
+        online_client.get_online_features("table", "1", ["f_float"])
+
+    online_client.disable_typed_online_reads()
+    assert online_client.get_online_features("table", "1", ["f_float"]) == [0.5]
+
+
+def test__add_online_read_listener(online_client: FeathrClient):
+    pipeline = MagicMock()
+    pipeline.execute = MagicMock(return_value=[[None, _encode(int_value=1), None], [None, None, None]])
+    _mock_redis_client(online_client).pipeline.return_value.__enter__.return_value = pipeline
+    events = []
+    online_client.add_online_read_listener(events.append)
+    metrics = online_client.add_online_read_listener()
+    # failing listeners don't fail the reads
+    online_client.add_online_read_listener(MagicMock(side_effect=RuntimeError("listener error")))
+
+    online_client.multi_get_online_features("table", ["1", "2"], ["f1", "f2"])
+
+    assert len(events) == 1
+    event = events[0]
+    assert (event.feature_table, event.key_count, event.fetched_count, event.null_count) == ("table", 2, 4, 3)
+    assert event.payload_bytes == len(_encode(int_value=1))
+    assert event.total_sec >= event.network_sec + event.decode_sec
+    assert metrics.snapshot()["table"]["null_rate"] == 0.75
+
+    online_client.remove_online_read_listener(events.append)
+    online_client.multi_get_online_features("table", ["1", "2"], ["f1", "f2"])
+    assert len(events) == 1
@@ -0,0 +1,211 @@
+import base64
+
+import pytest
+
+from feathr.definition.dtype import (
+    BYTES,
+    FLOAT,
+    FLOAT_VECTOR,
+    INT32,
+    INT32_VECTOR,
+    INT64,
+    STRING,
+    FeatureType,
+    ValueType,
+)
+from feathr.protobuf.featureValue_pb2 import (
+    DoubleArray,
+    FeatureValue,
+    FloatArray,
+    IntegerArray,
+    SparseIntegerArray,
+)
+from feathr.utils._feature_value_decoder import (
+    b64decode_batch,
+    decode_feature_value,
+    decode_flat,
+    decode_rows,
+    decode_rows_with_decoders,
+    decode_serialized,
+    encode_serialized,
+    feature_type_to_value_type,
+    typed_decoder,
+)
+
+
+def _encode(feature_value: FeatureValue) -> bytes:
+    return base64.b64encode(feature_value.SerializeToString())
+
+
+@pytest.mark.parametrize(
+    "raw_values,expected", [
+        ([], []),
+        ([b"YQ==", b"YWI=", b"YWJj"], [b"a", b"ab", b"abc"]),
+        (["YQ==", "YWJjZA=="], [b"a", b"abcd"]),
+        # Not canonically padded values fall back to one by one decoding
+        ([b"YWI=", b"YW\nI="], [b"ab", b"ab"]),
+    ]
+)
+def test__b64decode_batch(raw_values, expected):
+    assert b64decode_batch(raw_values) == expected
+
+
+def test__decode_flat():
+    raw_features = [
+        _encode(FeatureValue(boolean_value=True)),
+        None,
+        _encode(FeatureValue(string_value="abc")),
+        _encode(FeatureValue(long_value=2**40)),
+        _encode(FeatureValue(float_array=FloatArray(floats=[1.0, 2.5]))),
+        _encode(FeatureValue(sparse_integer_array=SparseIntegerArray(index_integers=[0, 3], value_integers=[7, 9]))),
+        b"",
+    ]
+
+    decoded = decode_flat(raw_features)
+
+    assert decoded[:4] == [True, None, "abc", 2**40]
+    assert list(decoded[4]) == [1.0, 2.5]
+    assert [list(arr) for arr in decoded[5]] == [[0, 3], [7, 9]]
+    assert decoded[6] == b""
+
+
+def test__decode_rows():
+    pipeline_result = [
+        [_encode(FeatureValue(int_value=1)), _encode(FeatureValue(double_value=0.5))],
+        [None, None],
+        [_encode(FeatureValue(int_value=3)), None],
+    ]
+
+    assert decode_rows(pipeline_result) == [[1, 0.5], [None, None], [3, None]]
+
+
+def test__decode_flat__with_type():
+    raw_features = [
+        _encode(FeatureValue(int_value=1)),
+        _encode(FeatureValue(long_value=1)),
+        _encode(FeatureValue(sparse_integer_array=SparseIntegerArray(index_integers=[1], value_integers=[2]))),
+        None,
+    ]
+
+    decoded = decode_flat(raw_features, with_type=True)
+
+    assert decoded[:2] == [("int_value", 1), ("long_value", 1)]
+    assert decoded[2][0] == "sparse_integer_array"
+    assert decoded[3] is None
+
+
+@pytest.mark.parametrize(
+    "feature_value", [
+        FeatureValue(boolean_value=False),
+        FeatureValue(boolean_value=True),
+        FeatureValue(string_value=""),
+        FeatureValue(string_value="feathr 特征"),
+        FeatureValue(float_value=0.0),
+        FeatureValue(float_value=-1.25),
+        FeatureValue(double_value=3.141592653589793),
+        FeatureValue(int_value=-1),
+        FeatureValue(int_value=2**31 - 1),
+        FeatureValue(long_value=-(2**63)),
+        FeatureValue(long_value=300),
+        FeatureValue(float_array=FloatArray(floats=[])),
+        FeatureValue(float_array=FloatArray(floats=[0.5, -2.0, 3.25])),
+        FeatureValue(double_array=DoubleArray(doubles=[1e-300, 2.0])),
+        FeatureValue(int_array=IntegerArray(integers=[-5, 0, 5])),
+    ]
+)
+@pytest.mark.parametrize("encoding", ["base64", "binary"])
+def test__decode_flat__same_as_protobuf(feature_value: FeatureValue, encoding: str):
+    """Values decoded from the wire format directly should be the same as the ones parsed by protobuf"""
+    parsed = FeatureValue()
+    parsed.ParseFromString(feature_value.SerializeToString())
+    expected = decode_feature_value(parsed)
+
+    decoded = decode_flat([encode_serialized(feature_value.SerializeToString(), encoding)])[0]
+
+    if isinstance(expected, (bool, int, float, str)):
+        assert type(decoded) == type(expected)
+        assert decoded == expected
+    else:
+        assert list(decoded) == list(expected)
+
+
+@pytest.mark.parametrize(
+    "feature_type,value_type", [
+        (INT32, "int_value"),
+        (INT64, "long_value"),
+        (FLOAT, "float_value"),
+        (STRING, "string_value"),
+        (FLOAT_VECTOR, "float_array"),
+        (INT32_VECTOR, "int_array"),
+        (FeatureType(ValueType.FLOAT, [ValueType.INT32], tensor_category="SPARSE"), "sparse_float_array"),
+        (BYTES, None),
+    ]
+)
+def test__feature_type_to_value_type(feature_type, value_type):
+    assert feature_type_to_value_type(feature_type) == value_type
+
+
+@pytest.mark.parametrize(
+    "value_type,feature_value", [
+        ("float_array", FeatureValue(float_array=FloatArray(floats=[0.5, 1.5]))),
+        ("int_array", FeatureValue(int_array=IntegerArray(integers=[1, 2]))),
+        ("sparse_integer_array", FeatureValue(sparse_integer_array=SparseIntegerArray(index_integers=[1], value_integers=[2]))),
+        ("long_value", FeatureValue(long_value=-3)),
+    ]
+)
+def test__typed_decoder(value_type, feature_value):
+    serialized = feature_value.SerializeToString()
+    expected_type, expected_value = decode_serialized(serialized, with_type=True)
+
+    decoded_type, decoded_value = typed_decoder(value_type)(serialized)
+
+    assert decoded_type == expected_type == value_type
+    assert repr(decoded_value) == repr(expected_value)
+
+
+def test__typed_decoder__other_type():
+    serialized = FeatureValue(double_value=0.5).SerializeToString()
+
+    assert typed_decoder("float_value")(serialized) == ("double_value", 0.5)
+    with pytest.raises(ValueError):
+        typed_decoder("float_value", validate=True)(serialized)
+
+
+def test__decode_rows_with_decoders():
+    pipeline_result = [
+        [_encode(FeatureValue(float_value=0.5)), _encode(FeatureValue(string_value="a"))],
+        [None],
+    ]
+
+    decoded = decode_rows_with_decoders(pipeline_result, [["f_float", "f_str"], ["f_float"]], {"f_float": typed_decoder("float_value")})
+
+    assert decoded == [[("float_value", 0.5), ("string_value", "a")], [None]]
+
+
+def test__binary_encoding():
+    float_array = FeatureValue(float_array=FloatArray(floats=[0.5, -2.0])).SerializeToString()
+    packed = encode_serialized(float_array, "binary")
+    # version byte, type code and 2 little-endian floats
+    assert packed[:2] == b"\x02f" and len(packed) == 10
+    assert encode_serialized(FeatureValue(long_value=3).SerializeToString(), "binary")[:1] == b"\x01"
+    with pytest.raises(ValueError):
+        encode_serialized(float_array, "hex")
+
+    # Both encodings can be mixed in one batch
+    raw_features = [
+        packed,
+        _encode(FeatureValue(long_value=3)),
+        encode_serialized(FeatureValue(string_value="a").SerializeToString(), "binary"),
+        encode_serialized(FeatureValue().SerializeToString(), "binary"),
+        None,
+    ]
+    assert decode_flat(raw_features, with_type=True) == [
+        ("float_array", [0.5, -2.0]), ("long_value", 3), ("string_value", "a"), (None, None), None,
+    ]
+
+    # Packed vectors go through the typed decoders as well
+    int_array = encode_serialized(FeatureValue(int_array=IntegerArray(integers=[1, -1])).SerializeToString(), "binary")
+    assert decode_rows_with_decoders([[int_array, packed]], [["f_int", "f_float"]], {
+        "f_int": typed_decoder("int_array", validate=True),
+        "f_float": typed_decoder("float_array", validate=True),
+    }) == [[("int_array", [1, -1]), ("float_array", [0.5, -2.0])]]
@@ -1,20 +1,25 @@
 # TODO with, without optional args
 # TODO test with no data files exception and unsupported format exception
 from pathlib import Path
-from typing import Type
+from typing import List, Type
 from unittest.mock import MagicMock
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 import pytest
 from pytest_mock import MockerFixture
 from pyspark.sql import DataFrame, SparkSession
 
 from feathr import FeathrClient
 from feathr.constants import OUTPUT_FORMAT, OUTPUT_PATH_TAG
+from feathr.utils._result_cache import _ResultCache
 from feathr.utils.job_utils import (
+    clear_result_cache,
     get_result_df,
     get_result_pandas_df,
     get_result_spark_df,
+    iter_result_batches,
 )
 
 
@@ -78,6 +83,8 @@ def test__get_result_df__with_local_cache_path(
     client = MagicMock()
     client.spark_runtime = spark_runtime
     client.feathr_spark_launcher.download_result = MagicMock()
+    # Disable the result cache, so that a temporary directory is used
+    client.env_config.get.side_effect = lambda key: "0" if key == "spark_config__result_cache_max_size_mb" else None
     mocked_load_files_to_pandas_df = mocker.patch("feathr.utils.job_utils._load_files_to_pandas_df")
 
     # Mock is_databricks
@@ -94,6 +101,8 @@ def test__get_result_df__with_local_cache_path(
     mocked_load_files_to_pandas_df.assert_called_once_with(
         dir_path=expected_local_cache_path,
         data_format=data_format,
+        num_workers=None,
+        use_processes=False,
     )
 
 
@@ -141,6 +150,8 @@ def test__get_result_df__exceptions(
         client.get_job_result_uri = MagicMock(return_value=res_url)
         client.get_job_tags = MagicMock(return_value=job_tag)
         client.spark_runtime = spark_runtime
+        # Disable the result cache
+        client.env_config.get.side_effect = lambda key: "0" if key == "spark_config__result_cache_max_size_mb" else None
 
         if expected_error is None:
             get_result_df(
@@ -199,6 +210,193 @@ def test__get_result_df(
         assert len(df) == expected_count
 
 
+@pytest.mark.parametrize(
+    "data_format,output_filename,expected_count", [
+        ("csv", "output.csv", 5),
+        ("csv", "output_dir.csv", 4),
+        ("parquet", "output.parquet", 5),
+        ("avro", "output.avro", 5),
+        ("delta", "output-delta", 5),
+    ]
+)
+@pytest.mark.parametrize("output", ["pandas", "arrow"])
+def test__iter_result_batches(
+    workspace_dir: str,
+    data_format: str,
+    output_filename: str,
+    expected_count: int,
+    output: str,
+):
+    """Test iter_result_batches yields batches of at most batch_size rows, which add up to the whole result"""
+    res_url = str(Path(workspace_dir, "mock_results", output_filename))
+    client = MagicMock()
+    client.spark_runtime = "local"
+
+    batches = list(iter_result_batches(client=client, data_format=data_format, res_url=res_url, batch_size=2, output=output))
+
+    expected_type = pa.RecordBatch if output == "arrow" else pd.DataFrame
+    assert all(isinstance(batch, expected_type) and 0 < len(batch) <= 2 for batch in batches)
+    assert sum(len(batch) for batch in batches) == expected_count
+    # Same rows in the same order as get_result_df, except for the directories whose file order is not defined
+    if Path(res_url).is_file():
+        expected_df = get_result_df(client=client, data_format=data_format, res_url=res_url)
+        batches_df = pd.concat([batch.to_pandas() if output == "arrow" else batch for batch in batches]).reset_index(drop=True)
+        pd.testing.assert_frame_equal(batches_df, expected_df, check_dtype=False)
+
+
+@pytest.mark.parametrize(
+    "num_workers,use_processes", [
+        (1, False),
+        (4, False),
+        (2, True),
+    ]
+)
+def test__get_result_df__parallel_part_files(tmp_path: Path, num_workers: int, use_processes: bool):
+    """Test part files read on a worker pool are concatenated in the order of the file names"""
+    for i in range(6):
+        pd.DataFrame({"part": [i] * (i + 1), "row": list(range(i + 1))}).to_csv(tmp_path / f"part-{i:05d}.csv", index=False)
+    client = MagicMock()
+    client.spark_runtime = "local"
+
+    df = get_result_df(client=client, data_format="csv", res_url=str(tmp_path), num_workers=num_workers, use_processes=use_processes)
+
+    assert df["part"].tolist() == [i for i in range(6) for _ in range(i + 1)]
+    assert df.index.tolist() == list(range(len(df)))
+
+
+def _cache_entries(cache_dir: Path) -> List[Path]:
+    return [path for path in cache_dir.iterdir() if not path.name.startswith(".")]
+
+
+def test__get_result_df__result_cache(mocker: MockerFixture, tmp_path: Path):
+    """Test results are downloaded into the result cache, and the least recently used results are evicted"""
+    config = {"spark_config__result_cache_dir": str(tmp_path), "spark_config__result_cache_max_size_mb": "0.001"}
+    client = MagicMock()
+    client.spark_runtime = "databricks"
+    client.env_config.get.side_effect = config.get
+
+    def download_result(result_path: str, local_folder: str, is_file_path: bool, prune: bool):
+        assert prune
+        pd.DataFrame({"res_url": [result_path] * 50}).to_csv(Path(local_folder, "part-00000.csv"), index=False)
+
+    client.feathr_spark_launcher.download_result = MagicMock(side_effect=download_result)
+    mocker.patch("feathr.utils.job_utils.is_databricks", return_value=False)
+
+    df = get_result_df(client, data_format="csv", res_url="dbfs:/res_1")
+    assert df["res_url"].tolist() == ["dbfs:/res_1"] * 50
+    cache_dirs = _cache_entries(tmp_path)
+    assert len(cache_dirs) == 1
+
+    # The same result is downloaded into the same cache entry
+    get_result_df(client, data_format="csv", res_url="dbfs:/res_1")
+    assert _cache_entries(tmp_path) == cache_dirs
+    assert client.feathr_spark_launcher.download_result.call_args.kwargs["local_folder"] == str(cache_dirs[0])
+
+    # The entry of the first result is evicted, since both don't fit in the cache
+    df = get_result_df(client, data_format="csv", res_url="dbfs:/res_2")
+    assert df["res_url"].tolist() == ["dbfs:/res_2"] * 50
+    assert len(_cache_entries(tmp_path)) == 1 and not cache_dirs[0].exists()
+
+    clear_result_cache(client)
+    assert _cache_entries(tmp_path) == []
+
+
+def test__get_result_df__spark_bypasses_result_cache(mocker: MockerFixture, tmp_path: Path):
+    """Test results loaded into lazily read Spark DataFrames are not downloaded into the evictable result cache"""
+    config = {"spark_config__result_cache_dir": str(tmp_path / "cache")}
+    client = MagicMock()
+    client.spark_runtime = "databricks"
+    client.env_config.get.side_effect = config.get
+    mocker.patch("feathr.utils.job_utils.is_databricks", return_value=False)
+    spark = MagicMock()
+
+    get_result_df(client, data_format="parquet", res_url="dbfs:/res_1", spark=spark)
+
+    local_folder = client.feathr_spark_launcher.download_result.call_args.kwargs["local_folder"]
+    assert not local_folder.startswith(str(tmp_path / "cache"))
+    spark.read.format.return_value.load.assert_called_once_with(local_folder)
+    assert not (tmp_path / "cache").exists() or _cache_entries(tmp_path / "cache") == []
+
+
+def test__result_cache__entries_in_use_are_kept(tmp_path: Path):
+    """Test entries used by another process, or another cache instance, are neither evicted nor cleared"""
+    cache = _ResultCache(cache_dir=str(tmp_path), max_size_bytes=0)
+    with cache.use_entry("dbfs:/res_1") as path:
+        Path(path, "part-00000.csv").write_text("a")
+        other_cache = _ResultCache(cache_dir=str(tmp_path), max_size_bytes=0)
+        assert other_cache.evict() == 0
+        other_cache.clear()
+        assert Path(path, "part-00000.csv").exists()
+
+    assert other_cache.evict() == 1
+    assert _cache_entries(tmp_path) == []
+
+
+def test__get_result_df__avro_batches(mocker: MockerFixture, tmp_path: Path):
+    """Test avro records are projected and filtered in batches, whose inferred types are made consistent"""
+    import fastavro
+
+    schema = {"type": "record", "name": "r", "fields": [
+        {"name": "id", "type": "long"}, {"name": "x", "type": ["null", "double"]}, {"name": "s", "type": "string"}]}
+    with open(tmp_path / "part-00000.avro", "wb") as f:
+        fastavro.writer(f, schema, [{"id": i, "x": None if i < 2 else float(i), "s": "s"} for i in range(5)])
+    mocker.patch("feathr.utils.job_utils.DEFAULT_RESULT_BATCH_SIZE", 2)
+    client = MagicMock()
+    client.spark_runtime = "local"
+
+    table = get_result_df(client=client, data_format="avro", res_url=str(tmp_path), output="arrow", columns=["id", "x"])
+    assert table.column_names == ["id", "x"]
+    assert table.schema.field("x").type == pa.float64()
+    assert table["x"].to_pylist() == [None, None, 2.0, 3.0, 4.0]
+
+    table = get_result_df(client=client, data_format="avro", res_url=str(tmp_path), output="arrow", columns=["s"],
+                          filter=pc.field("id") >= 3)
+    assert table.to_pydict() == {"s": ["s", "s"]}
+
+    with pytest.raises(ValueError, match="not in the result"):
+        get_result_df(client=client, data_format="avro", res_url=str(tmp_path), output="arrow", columns=["y"])
+
+
+@pytest.mark.parametrize(
+    "data_format,output_filename,trip_ids", [
+        ("csv", "output.csv", [1, 3]),
+        ("parquet", "output.parquet", ["1", "3"]),
+        ("avro", "output.avro", ["1", "3"]),
+        ("delta", "output-delta", ["1", "3"]),
+    ]
+)
+def test__get_result_df__arrow_output(workspace_dir: str, data_format: str, output_filename: str, trip_ids: list):
+    """Test get_result_df returns pyarrow Table, and reads only the given columns and rows"""
+    res_url = str(Path(workspace_dir, "mock_results", output_filename))
+    client = MagicMock()
+    client.spark_runtime = "local"
+
+    table = get_result_df(client=client, data_format=data_format, res_url=res_url, output="arrow")
+    assert isinstance(table, pa.Table)
+    assert table.num_rows == 5
+
+    kwargs = dict(columns=["trip_id", "fare_amount"], filter=pc.field("trip_id").isin(trip_ids))
+    table = get_result_df(client=client, data_format=data_format, res_url=res_url, output="arrow", **kwargs)
+    assert table.column_names == ["trip_id", "fare_amount"]
+    assert table.column("trip_id").to_pylist() == trip_ids
+
+    df = get_result_df(client=client, data_format=data_format, res_url=res_url, **kwargs)
+    assert isinstance(df, pd.DataFrame)
+    assert df["trip_id"].tolist() == trip_ids
+
+
+def test__get_result_df__unsupported_arrow_args():
+    with pytest.raises(ValueError):
+        get_result_df(client=MagicMock(), data_format="csv", res_url="some_res_url", output="numpy")
+    with pytest.raises(ValueError):
+        get_result_df(client=MagicMock(), data_format="csv", res_url="some_res_url", spark=MagicMock(), filter=pc.field("x") > 0)
+
+
+def test__iter_result_batches__unsupported_output():
+    with pytest.raises(ValueError):
+        next(iter_result_batches(client=MagicMock(), data_format="csv", res_url="some_res_url", output="numpy"))
+
+
 @pytest.mark.parametrize(
     "data_format,output_filename,expected_count", [
         ("csv", "output.csv", 5),
@@ -0,0 +1,23 @@
+from datetime import datetime, timedelta
+from multiprocessing import get_context
+from pathlib import Path
+
+from feathr import RedisSink
+from feathr.utils._materialization_watermark import _MaterializationWatermarks
+
+
+def _set_watermarks(path: str, project_name: str, count: int):
+    watermarks = _MaterializationWatermarks(path)
+    for i in range(count):
+        watermarks.set(project_name, "settings", RedisSink(table_name="table"), datetime(2022, 3, 1) + timedelta(days=i))
+
+
+def test__materialization_watermarks__concurrent_processes(tmp_path: Path):
+    """Test processes updating the watermarks of different projects at the same time don't lose each other's updates"""
+    path = str(tmp_path / "watermarks.json")
+    with get_context("fork").Pool(4) as pool:
+        pool.starmap(_set_watermarks, [(path, f"project_{i}", 20) for i in range(4)])
+
+    watermarks = _MaterializationWatermarks(path)
+    for i in range(4):
+        assert watermarks.get(f"project_{i}", "settings", RedisSink(table_name="table")) == datetime(2022, 3, 20)
@@ -0,0 +1,71 @@
+import numpy as np
+import pyarrow as pa
+import pytest
+
+from feathr.utils._online_arrays import SparseFeatureBatch, rows_to_arrow, rows_to_numpy
+
+
+def test__rows_to_numpy__scalars_and_dense_arrays():
+    rows = [
+        [("int_value", 1), ("float_array", [1.0, 2.0]), ("string_value", "a")],
+        [None, ("float_array", [3.0, 4.0]), None],
+        [("int_value", 3), None, ("string_value", "c")],
+    ]
+
+    res = rows_to_numpy(["f_int", "f_dense", "f_str"], rows)
+
+    assert res["f_int"].dtype == np.int32
+    assert res["f_int"].mask.tolist() == [False, True, False]
+    assert res["f_int"].compressed().tolist() == [1, 3]
+    assert res["f_dense"].dtype == np.float32
+    assert res["f_dense"].shape == (3, 2)
+    assert res["f_dense"].data[:2].tolist() == [[1.0, 2.0], [3.0, 4.0]]
+    assert res["f_dense"].mask[2].all()
+    assert res["f_str"].dtype == object
+    assert res["f_str"].compressed().tolist() == ["a", "c"]
+
+
+def test__rows_to_numpy__ragged_and_missing():
+    rows = [[("long_array", [1, 2]), None], [("long_array", [3]), b""]]
+
+    res = rows_to_numpy(["f_ragged", "f_missing"], rows)
+
+    assert res["f_ragged"].shape == (2,)
+    assert res["f_ragged"][1].tolist() == [3]
+    assert res["f_missing"].mask.all()
+
+
+def test__rows_to_numpy__sparse():
+    rows = [[("sparse_float_array", ([0, 3], [0.5, 1.5]))], [None], [("sparse_float_array", ([1], [2.0]))]]
+
+    res = rows_to_numpy(["f_sparse"], rows)["f_sparse"]
+
+    assert isinstance(res, SparseFeatureBatch)
+    assert res.indptr.tolist() == [0, 2, 2, 3]
+    assert res.indices.tolist() == [0, 3, 1]
+    assert res.data.dtype == np.float32
+    assert res.data.tolist() == [0.5, 1.5, 2.0]
+    assert res.shape == (3, 4)
+    assert res.mask.tolist() == [False, True, False]
+
+
+def test__rows_to_numpy__mixed_types():
+    with pytest.raises(ValueError):
+        rows_to_numpy(["f"], [[("int_value", 1)], [("string_value", "a")]])
+
+
+def test__rows_to_arrow():
+    rows = [
+        [("double_value", 0.5), ("int_array", [1, 2]), ("sparse_long_array", ([2], [9]))],
+        [None, None, None],
+    ]
+
+    res = rows_to_arrow(["1", "2"], ["f_double", "f_dense", "f_sparse"], rows)
+
+    assert res.schema.field("f_dense").type == pa.list_(pa.int32())
+    assert res.to_pydict() == {
+        "key": ["1", "2"],
+        "f_double": [0.5, None],
+        "f_dense": [[1, 2], None],
+        "f_sparse": [{"indices": [2], "values": [9]}, {"indices": None, "values": None}],
+    }
@@ -0,0 +1,109 @@
+import time
+
+from pytest_mock import MockerFixture
+
+from feathr.utils._online_cache import CACHE_MISS, OnlineFeatureCache
+
+
+def test__online_feature_cache__get_and_put():
+    cache = OnlineFeatureCache()
+    assert cache.get_many("table", "1", ["f1", "f2"]) == [CACHE_MISS, CACHE_MISS]
+
+    cache.put_many("table", "1", ["f1", "f2"], [1.0, None])
+
+    assert cache.get_many("table", "1", ["f1", "f2", "f3"]) == [1.0, None, CACHE_MISS]
+    stats = cache.stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 3
+    assert stats["entries"] == 2
+    assert stats["tables"]["table"] == {"hits": 2, "misses": 3}
+
+
+def test__online_feature_cache__lru_eviction():
+    cache = OnlineFeatureCache(max_entries=2)
+    cache.put_many("table", "1", ["f"], [1])
+    cache.put_many("table", "2", ["f"], [2])
+    # touch key 1 so that key 2 becomes the least recently used one
+    cache.get_many("table", "1", ["f"])
+    cache.put_many("table", "3", ["f"], [3])
+
+    assert cache.get_many("table", "1", ["f"]) == [1]
+    assert cache.get_many("table", "2", ["f"]) == [CACHE_MISS]
+    assert cache.get_many("table", "3", ["f"]) == [3]
+    assert cache.stats()["evictions"] == 1
+
+
+def test__online_feature_cache__byte_budget():
+    cache = OnlineFeatureCache(max_bytes=500)
+    for i in range(100):
+        cache.put_many("table", str(i), ["f"], ["x" * 100])
+
+    assert cache.stats()["bytes"] <= 500
+    assert cache.get_many("table", "99", ["f"]) == ["x" * 100]
+    assert cache.get_many("table", "0", ["f"]) == [CACHE_MISS]
+
+
+def test__online_feature_cache__ttl(mocker: MockerFixture):
+    now = time.monotonic()
+    mocked_monotonic = mocker.patch("feathr.utils._online_cache.time.monotonic", return_value=now)
+    cache = OnlineFeatureCache(ttl_sec=10, table_ttl_sec={"short_lived": 1})
+    cache.put_many("table", "1", ["f"], [1])
+    cache.put_many("short_lived", "1", ["f"], [1])
+
+    mocked_monotonic.return_value = now + 5
+
+    assert cache.get_many("table", "1", ["f"]) == [1]
+    assert cache.get_many("short_lived", "1", ["f"]) == [CACHE_MISS]
+    assert cache.stats()["entries"] == 1
+
+
+def test__online_feature_cache__invalidate():
+    cache = OnlineFeatureCache()
+    cache.put_many("table", "1", ["f1", "f2"], [1, 2])
+    cache.put_many("table", "2", ["f1"], [3])
+    cache.put_many("other_table", "1", ["f1"], [4])
+
+    cache.invalidate("table", "1", "f1")
+    assert cache.get_many("table", "1", ["f1", "f2"]) == [CACHE_MISS, 2]
+
+    cache.invalidate("table", "1")
+    assert cache.get_many("table", "1", ["f2"]) == [CACHE_MISS]
+    assert cache.get_many("table", "2", ["f1"]) == [3]
+
+    cache.invalidate("table")
+    assert cache.get_many("table", "2", ["f1"]) == [CACHE_MISS]
+    assert cache.get_many("other_table", "1", ["f1"]) == [4]
+
+
+def test__online_feature_cache__expire(mocker: MockerFixture):
+    now = time.monotonic()
+    mocked_monotonic = mocker.patch("feathr.utils._online_cache.time.monotonic", return_value=now)
+    cache = OnlineFeatureCache(ttl_sec=10)
+    cache.put_many("table", "1", ["f1", "f2"], [1, 2])
+    cache.put_many("table", "2", ["f1"], [3])
+
+    # A zero time to live removes the entries right away
+    cache.expire("table", 0, "1", "f1")
+    assert cache.get_many("table", "1", ["f1", "f2"]) == [CACHE_MISS, 2]
+
+    # Entries expire at the earliest of their own and the given time to live
+    cache.expire("table", 2, "1")
+    cache.expire("table", 20)
+    mocked_monotonic.return_value = now + 5
+    assert cache.get_many("table", "1", ["f2"]) == [CACHE_MISS]
+    assert cache.get_many("table", "2", ["f1"]) == [3]
+
+
+def test__online_feature_cache__invalidate_after_eviction():
+    cache = OnlineFeatureCache(max_entries=2)
+    cache.put_many("table", "1", ["f1", "f2"], [1, 2])
+    cache.put_many("table", "2", ["f1"], [3])
+
+    # the evicted entry of key "1" should not be invalidated again
+    cache.invalidate("table", "1")
+    assert cache.get_many("table", "2", ["f1"]) == [3]
+    assert cache.stats()["entries"] == 1
+
+    cache.invalidate("table", feature_name="f1")
+    assert cache.stats()["entries"] == 0
+    assert cache._index == {}